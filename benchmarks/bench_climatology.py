@@ -0,0 +1,61 @@
+"""Time the climatology cube of a directory of workbooks, serial vs parallel.
+
+Usage::
+
+    python benchmarks/bench_climatology.py [directory]
+
+Without argument, a dozen synthetic 20-year workbooks, four stations at 00,
+06 and 12 UTC, are timed. The cold loads parse every workbook and should
+scale with the number of CPUs; the warm load reads the columnar store.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, os.pardir))
+
+# A private store, emptied before each cold load
+STORE_DIR = os.environ["PIBAL_STORE_DIR"] = tempfile.mkdtemp()
+
+from pibal_climatology import Climatology  # noqa: E402
+from synthetic_workbook import write_workbook  # noqa: E402
+
+WORKBOOKS = 12
+
+
+def main(directory):
+    print(f"{os.cpu_count()} CPUs")
+    for load, jobs in [("cold", 1), ("cold", None), ("warm", None)]:
+        if load == "cold":
+            shutil.rmtree(STORE_DIR, ignore_errors=True)
+        start = time.perf_counter()
+        climatology = Climatology.from_directory(directory, jobs=jobs)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{load} jobs={jobs or os.cpu_count():<3} {elapsed:>7.3f}s  "
+            f"{climatology}"
+        )
+
+
+if __name__ == "__main__":
+    try:
+        if len(sys.argv) > 1:
+            main(sys.argv[1])
+        else:
+            with tempfile.TemporaryDirectory() as tmp:
+                for k in range(WORKBOOKS):
+                    station, hour = divmod(k, 3)
+                    write_workbook(
+                        os.path.join(tmp, f"synthetic_{k}.xlsx"),
+                        20,
+                        seed=k,
+                        station=f"SINTETIS {station + 1}",
+                        hour=hour * 6,
+                    )
+                main(tmp)
+    finally:
+        shutil.rmtree(STORE_DIR, ignore_errors=True)
@@ -0,0 +1,77 @@
+"""Time the windrose figure of one month: px.bar_polar vs go.Barpolar.
+
+Usage::
+
+    python benchmarks/bench_figures.py [workbook]
+
+Times, for every month of ``Pibal 06UTC.xlsx`` by default, the former
+``px.bar_polar`` on the labelled long table, `pibal_figures.barpolar_figure`
+on the coded table, and a month switch served from the figure cache of
+``create_windrose``. Each figure is serialized to JSON, as Streamlit does.
+"""
+
+import os
+import sys
+import time
+
+import plotly.express as px
+import plotly.io as pio
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, os.pardir))
+
+import create_windrose  # noqa: E402
+from pibal_core import SPEED_LABELS, label_table  # noqa: E402
+from pibal_figures import barpolar_figure  # noqa: E402
+
+REPEAT = 5
+
+
+def bar_polar(table):
+    """The former figure of the dashboards"""
+    table = label_table(table, create_windrose.DIRECTIONS, SPEED_LABELS)
+    fig = px.bar_polar(
+        table,
+        r="frequency",
+        theta="wind_direction",
+        color="ff",
+        color_discrete_sequence=px.colors.sequential.Rainbow_r,
+        start_angle=0,
+        direction="clockwise",
+    )
+    fig.update_layout(polar_angularaxis_rotation=90)
+    return fig
+
+
+def barpolar(table):
+    return barpolar_figure(table, create_windrose.DIRECTIONS, SPEED_LABELS)
+
+
+def per_month(build, tables):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for month in tables:
+            pio.to_json(build(month), validate=False)
+        best = min(best, time.perf_counter() - start)
+    return best / len(tables)
+
+
+def main(path):
+    tables = create_windrose.calculate_wind_frequency(path)
+    for month in tables:  # warm the figure cache
+        create_windrose.create_windrose_figure(path, month)
+    for name, build in [
+        ("px.bar_polar", lambda month: bar_polar(tables[month])),
+        ("go.Barpolar", lambda month: barpolar(tables[month])),
+        ("cached", lambda month: create_windrose.create_windrose_figure(path, month)),
+    ]:
+        print(f"{name:<14} {per_month(build, tables) * 1e3:>7.2f} ms / month")
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1]
+        if len(sys.argv) > 1
+        else os.path.join(HERE, os.pardir, "Pibal 06UTC.xlsx")
+    )
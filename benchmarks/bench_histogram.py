@@ -0,0 +1,81 @@
+"""Time windrose.histogram against the former numpy.histogram2d engine.
+
+Usage::
+
+    python benchmarks/bench_histogram.py [nsamples ...]
+
+The default sizes are 10**6 and 10**7; pass 100000000 as well for 10**8
+samples (about 2.4 GB of RAM).
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from windrose import histogram  # noqa: E402
+
+BINS = np.array([0, 5, 10, 15, 20, 25], dtype=float)
+NSECTOR = 16
+
+
+def histogram2d_reference(direction, var, bins, nsector, blowto=False):
+    """The histogram2d based implementation `histogram` replaced."""
+    angle = 360.0 / nsector
+    dir_bins = np.arange(-angle / 2, 360.0 + angle, angle, dtype=float)
+    dir_bins[0] = 0.0
+    var_bins = bins.tolist()
+    var_bins.append(np.inf)
+    if blowto:
+        direction = direction + 180.0
+        direction[direction >= 360.0] = direction[direction >= 360.0] - 360
+    table = np.histogram2d(x=var, y=direction, bins=[var_bins, dir_bins])[0]
+    table[:, 0] = table[:, 0] + table[:, -1]
+    return table[:, :-1]
+
+
+def timeit(func, *args, repeat=3):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(sizes):
+    rng = np.random.default_rng(0)
+    print(
+        f"{'samples':>11} {'ddd dtype':>9} {'blowto':>6} "
+        f"{'histogram2d':>11} {'bincount':>9} {'speedup':>7}"
+    )
+    for n in sizes:
+        # pibal ddd are multiples of 10 degrees, ff integer knots, ~10% missing
+        ddd = (rng.integers(0, 37, n) * 10).astype(np.float32)
+        ff = rng.integers(0, 40, n).astype(np.float32)
+        ddd[rng.random(n) < 0.1] = np.nan
+        cases = [
+            ("float32", ddd),
+            ("float64", rng.uniform(0, 360, n)),
+        ]
+        for name, direction in cases:
+            for blowto in (False, True):
+                t_ref, ref = timeit(
+                    histogram2d_reference, direction, ff, BINS, NSECTOR, blowto
+                )
+                t_new, (_, _, table) = timeit(
+                    histogram, direction, ff, BINS, NSECTOR, False, blowto
+                )
+                if not np.array_equal(ref, table):
+                    raise AssertionError(f"tables differ for {name} blowto={blowto}")
+                print(
+                    f"{n:>11} {name:>9} {blowto!s:>6} {t_ref:>10.3f}s "
+                    f"{t_new:>8.3f}s {t_ref / t_new:>6.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [10**6, 10**7])
@@ -0,0 +1,93 @@
+"""Time the cold import of the windrose core, the libraries and the apps.
+
+Usage::
+
+    python benchmarks/bench_import.py [--repeat N] [module ...]
+
+Each module is imported in a fresh ``python -X importtime`` process and the
+best cumulative import time over `--repeat` runs is printed, with the heavy
+packages it pulled in. The dashboards are imported like Streamlit runs them
+on a cold worker, in bare mode without any upload. The exit status is 1 when
+a module imports one of its `UNWANTED` packages, e.g. matplotlib for the
+windrose histogram core, which should only be loaded on first use.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+HEAVY = (
+    "matplotlib",
+    "matplotlib.pyplot",
+    "pandas",
+    "plotly.express",
+    "scipy",
+    "streamlit",
+    "xlsxwriter",
+    "openpyxl",
+)
+PLOTTING = ("matplotlib", "plotly.express", "scipy", "xlsxwriter")
+# packages each module must not import at startup
+UNWANTED = {
+    "windrose": PLOTTING + ("pandas",),
+    "windrose_plot": ("matplotlib.pyplot", "pandas", "scipy"),
+    "pibal_core": PLOTTING,
+    "pibal_stats": PLOTTING,
+    "pibal_pilot": PLOTTING,
+    "pibal_store": PLOTTING,
+    "pibal_figures": PLOTTING,
+    "create_windrose": PLOTTING,
+    "windrose_master": PLOTTING,
+    "pibalstat": PLOTTING,
+    "windy": PLOTTING,
+}
+LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def import_time(module):
+    """Cumulative import time (s) of `module` and the heavy packages loaded"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    seconds, loaded = None, set()
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match is None:
+            continue
+        name = match.group(3)
+        if name in HEAVY:
+            loaded.add(name)
+        if name == module and not match.group(2):
+            seconds = int(match.group(1)) / 1e6
+    return seconds, loaded
+
+
+def main(modules, repeat):
+    failed = False
+    print(f"{'module':<16} {'import':>9}  heavy packages loaded")
+    for module in modules:
+        runs = [import_time(module) for _ in range(repeat)]
+        best, loaded = min(runs, key=lambda run: run[0])
+        unwanted = sorted(loaded & set(UNWANTED.get(module, ())))
+        failed |= bool(unwanted)
+        note = f"  UNWANTED: {', '.join(unwanted)}" if unwanted else ""
+        heavy = ", ".join(sorted(loaded))
+        print(f"{module:<16} {best * 1e3:>7.0f}ms  {heavy}{note}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=list(UNWANTED))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    sys.exit(main(args.modules, args.repeat))
@@ -0,0 +1,79 @@
+"""Time pibal workbook ingestion: one read_excel per sheet vs read_workbook.
+
+The last column is the time to the first month with a `LazyWorkbook`, which
+only parses the sheet shown.
+
+Usage::
+
+    python benchmarks/bench_ingest.py [workbook ...]
+
+Without arguments, ``Pibal 06UTC.xlsx`` and a synthetic 50-year workbook are
+timed.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, os.pardir))
+
+from pibal_io import LazyWorkbook, read_workbook  # noqa: E402
+from synthetic_workbook import write_workbook  # noqa: E402
+
+REPEAT = 3
+
+
+def read_per_sheet(path, nrows=200000):
+    """The former ingestion: list the sheets, then one read_excel per sheet."""
+    xls = pd.ExcelFile(path)
+    return {
+        sheet_name: pd.read_excel(
+            path, sheet_name=sheet_name, usecols="G:H", skiprows=9, nrows=nrows
+        )
+        for sheet_name in xls.sheet_names
+    }
+
+
+def first_month(path):
+    """Sheet list and first month of a LazyWorkbook, as a dashboard shows it"""
+    workbook = LazyWorkbook(path)
+    return workbook[next(iter(workbook))]
+
+
+def best_of(func, *args):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(paths):
+    print(
+        f"{'workbook':<28} {'rows':>7} {'read_excel':>10} {'read_workbook':>13} "
+        f"{'first month':>11}"
+    )
+    for path in paths:
+        rows = sum(len(df.dropna()) for df in read_workbook(path).values())
+        t_old = best_of(read_per_sheet, path)
+        t_new = best_of(read_workbook, path)
+        t_lazy = best_of(first_month, path)
+        print(
+            f"{os.path.basename(path):<28} {rows:>7} {t_old:>9.3f}s "
+            f"{t_new:>12.3f}s {t_lazy:>10.3f}s  {t_old / t_new:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(sys.argv[1:])
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            synthetic = os.path.join(tmp, "synthetic_50_years.xlsx")
+            write_workbook(synthetic, years=50)
+            main([os.path.join(HERE, os.pardir, "Pibal 06UTC.xlsx"), synthetic])
@@ -0,0 +1,73 @@
+"""Time the FM 32 PILOT decoder on a synthetic bulletin archive.
+
+Usage::
+
+    python benchmarks/bench_pilot.py [megabytes]
+
+A synthetic archive of `megabytes` MB (default 100) is written with
+`synthetic_pilot.write_archive`, then timed: `pibal_pilot.decode` (one
+record per wind), `pibal_pilot.decode_chunks` (column chunks) and
+`pibal_pilot.convert` (chunks written to the store and to the per station
+and level tables in the same pass). The peak resident memory of the process
+is printed after each step: it does not grow with the archive size.
+"""
+
+import os
+import resource
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, os.pardir))
+
+import pibal_pilot  # noqa: E402
+from synthetic_pilot import write_archive  # noqa: E402
+
+
+def peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def timed(label, size, func, *args):
+    start = time.perf_counter()
+    records = func(*args)
+    seconds = time.perf_counter() - start
+    print(
+        f"{label:<14} {records:>10} {seconds:>8.2f}s {size / seconds:>7.1f} MB/s "
+        f"{records / seconds / 1e6:>6.2f} M/s {peak_mb():>7.0f} MB"
+    )
+
+
+def decode(path):
+    with open(path) as lines:
+        return sum(1 for _ in pibal_pilot.decode(lines))
+
+
+def decode_chunks(path):
+    with open(path) as lines:
+        return sum(len(c["ff"]) for c in pibal_pilot.decode_chunks(lines))
+
+
+def convert(path, store):
+    _, tables = pibal_pilot.convert(path, directory=store)
+    return sum(table.total for table in tables.values())
+
+
+def main(megabytes):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pilot.txt")
+        reports = write_archive(path, megabytes)
+        size = os.path.getsize(path) / 2**20
+        print(f"{size:.0f} MB, {reports} reports, start {peak_mb():.0f} MB")
+        print(
+            f"{'step':<14} {'winds':>10} {'time':>9} {'MB/s':>12} {'winds':>8} "
+            f"{'peak RSS':>10}"
+        )
+        timed("decode", size, decode, path)
+        timed("decode_chunks", size, decode_chunks, path)
+        timed("convert", size, convert, path, os.path.join(tmp, "store"))
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,72 @@
+"""Time a cold Excel parse against a warm load from the columnar store.
+
+Usage::
+
+    python benchmarks/bench_store.py [workbook ...]
+
+Without arguments, ``Pibal 06UTC.xlsx`` and a synthetic 50-year archive are
+timed: `pibal_io.read_workbook` (what every load used to cost), the one-off
+`pibal_store.convert`, and `pibal_store.load` / `pibal_store.read_workbook`
+once the workbook is stored.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, os.pardir))
+
+import pibal_io  # noqa: E402
+import pibal_store  # noqa: E402
+from synthetic_workbook import write_workbook  # noqa: E402
+
+REPEAT = 3
+
+
+def best_of(func, *args):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def convert_cold(path, store):
+    shutil.rmtree(store, ignore_errors=True)
+    pibal_store.convert(path, store)
+
+
+def main(paths):
+    store = tempfile.mkdtemp()
+    try:
+        print(
+            f"{'workbook':<28} {'rows':>7} {'xlsx parse':>10} {'convert':>8} "
+            f"{'load':>8} {'frames':>8}"
+        )
+        for path in paths:
+            t_parse = best_of(pibal_io.read_workbook, path)
+            t_convert = best_of(convert_cold, path, store)
+            t_load = best_of(pibal_store.load, path, store)
+            t_frames = best_of(pibal_store.read_workbook, path, store)
+            rows = pibal_store.load(path, store)[0]["rows"]
+            print(
+                f"{os.path.basename(path):<28} {rows:>7} {t_parse:>9.3f}s "
+                f"{t_convert:>7.3f}s {t_load * 1e3:>6.1f}ms {t_frames * 1e3:>6.1f}ms"
+                f"  {t_parse / t_frames:.0f}x"
+            )
+    finally:
+        shutil.rmtree(store, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(sys.argv[1:])
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            synthetic = os.path.join(tmp, "synthetic_50_years.xlsx")
+            write_workbook(synthetic, years=50)
+            main([os.path.join(HERE, os.pardir, "Pibal 06UTC.xlsx"), synthetic])
@@ -0,0 +1,264 @@
+"""Time every stage of the dashboards on synthetic archives of growing size.
+
+Usage::
+
+    python benchmarks/bench_suite.py [--years 1 10 100] [--levels 1 4]
+                                     [-o results.json] [--compare base.json]
+
+For each number of years and of levels a synthetic workbook is written with
+`synthetic_workbook.write_workbook` (kept in ``--workdir`` between runs) and
+the best of ``--repeat`` runs of each stage is timed:
+
+ingest
+    `pibal_io.read_workbook` of the 12 month sheets
+clean
+    `pibal_core.clean` of every month
+histogram
+    `pibal_core.frequency_table` of every month, 16 sectors
+plotly
+    `pibal_figures.barpolar_figure` of every month
+matplotlib
+    `windrose.WindroseAxes.bar` of every month, drawn on an Agg canvas
+levels
+    `pibal_io.read_workbook` of every level of the 12 month sheets, tagged,
+    as the background ingestion reads them
+level_cube
+    `pibal_core.frame_level_counts` of every month, the level x speed bin x
+    sector cube of the altitude slider
+
+The timings are saved as JSON, by default to
+``benchmarks/results/<commit>.json``, together with the commit and the
+library versions. ``--compare`` prints the ratio of each timing to the same
+size and stage of an earlier results file, e.g. of the parent commit.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import openpyxl  # noqa: E402
+import pandas as pd  # noqa: E402
+import plotly  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, os.pardir))
+
+from pibal_core import (  # noqa: E402
+    SPEED_BINS,
+    SPEED_LABELS,
+    clean,
+    direction_labels,
+    frame_level_counts,
+    frequency_table,
+)
+from pibal_figures import barpolar_figure  # noqa: E402
+from pibal_io import read_workbook  # noqa: E402
+from synthetic_workbook import write_workbook  # noqa: E402
+from windrose import WindroseAxes  # noqa: E402
+
+NSECTOR = 16
+STAGES = (
+    "ingest",
+    "clean",
+    "histogram",
+    "plotly",
+    "matplotlib",
+    "levels",
+    "level_cube",
+)
+
+
+def best_of(repeat, func, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def clean_all(frames):
+    return {sheet_name: clean(df) for sheet_name, df in frames.items()}
+
+
+def histogram_all(frames):
+    return {
+        sheet_name: frequency_table(df, NSECTOR, SPEED_BINS)
+        for sheet_name, df in frames.items()
+    }
+
+
+def plotly_all(tables):
+    return [
+        barpolar_figure(table, direction_labels(NSECTOR), SPEED_LABELS)
+        for table in tables.values()
+    ]
+
+
+def matplotlib_all(frames):
+    edges = np.nextafter(np.asarray(SPEED_BINS[:-1], dtype=float), np.inf)
+    for df in frames.values():
+        ax = WindroseAxes.from_ax(pyplot=False)
+        ax.bar(
+            np.mod(df["ddd"].to_numpy(dtype=float), 360),
+            df["ff"].to_numpy(dtype=float),
+            bins=edges,
+            nsector=NSECTOR,
+            calm_limit=0,
+            normed=True,
+            collection=True,
+        )
+        ax.set_legend()
+        ax.figure.canvas.draw()
+        plt.close(ax.figure)
+
+
+def read_levels(path):
+    return read_workbook(path, tags=True, levels=True)
+
+
+def level_cube_all(frames):
+    return {
+        sheet_name: frame_level_counts(df, NSECTOR, SPEED_BINS)
+        for sheet_name, df in frames.items()
+    }
+
+
+def workbook(workdir, years, levels):
+    path = os.path.join(workdir, f"synthetic_{years}y_{levels}l.xlsx")
+    if not os.path.exists(path):
+        write_workbook(path + ".tmp", years=years, levels=levels)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def run(path, repeat):
+    """Timing of each stage of `STAGES` on the workbook `path`"""
+    timings = {}
+    timings["ingest"], frames = best_of(repeat, read_workbook, path)
+    timings["clean"], frames = best_of(repeat, clean_all, frames)
+    timings["histogram"], tables = best_of(repeat, histogram_all, frames)
+    timings["plotly"], _ = best_of(repeat, plotly_all, tables)
+    timings["matplotlib"], _ = best_of(repeat, matplotlib_all, frames)
+    timings["levels"], level_frames = best_of(repeat, read_levels, path)
+    timings["level_cube"], _ = best_of(repeat, level_cube_all, level_frames)
+    rows = sum(len(df) for df in frames.values())
+    return rows, timings
+
+
+def commit():
+    """Short hash of HEAD, with ``-dirty`` if the tree has changes"""
+
+    def git(*args):
+        return subprocess.run(
+            ["git", *args], cwd=HERE, capture_output=True, text=True
+        ).stdout.strip()
+
+    head = git("rev-parse", "--short", "HEAD") or "unknown"
+    return head + (
+        "-dirty" if git("status", "--porcelain", "--untracked-files=no") else ""
+    )
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "openpyxl": openpyxl.__version__,
+        "matplotlib": matplotlib.__version__,
+        "plotly": plotly.__version__,
+    }
+
+
+def compare(results, base):
+    """Print the ratio of each timing of `results` to the one of `base`"""
+    before = {
+        (result["years"], result["levels"]): result["seconds"]
+        for result in base["results"]
+    }
+    print(f"\nratio to {base['commit']} (< 1 is faster)")
+    print(f"{'years':>5} {'levels':>6} " + " ".join(f"{s:>10}" for s in STAGES))
+    for result in results:
+        old = before.get((result["years"], result["levels"]))
+        if old is None:
+            continue
+        ratios = [
+            result["seconds"][stage] / old[stage] if old.get(stage) else float("nan")
+            for stage in STAGES
+        ]
+        print(
+            f"{result['years']:>5} {result['levels']:>6} "
+            + " ".join(f"{ratio:>9.2f}x" for ratio in ratios)
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--workdir",
+        default=os.path.join(HERE, "results", "workbooks"),
+        help="where the synthetic workbooks are kept",
+    )
+    parser.add_argument("-o", "--output", help="results file")
+    parser.add_argument("--compare", help="earlier results file")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.workdir, exist_ok=True)
+    print(
+        f"{'years':>5} {'levels':>6} {'rows':>8} "
+        + " ".join(f"{stage:>10}" for stage in STAGES)
+    )
+    results = []
+    for levels in args.levels:
+        for years in args.years:
+            path = workbook(args.workdir, years, levels)
+            rows, timings = run(path, args.repeat)
+            results.append(
+                {"years": years, "levels": levels, "rows": rows, "seconds": timings}
+            )
+            print(
+                f"{years:>5} {levels:>6} {rows:>8} "
+                + " ".join(f"{timings[stage]:>9.3f}s" for stage in STAGES)
+            )
+
+    head = commit()
+    output = args.output or os.path.join(HERE, "results", f"{head}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(
+            {
+                "commit": head,
+                "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                "repeat": args.repeat,
+                "environment": environment(),
+                "results": results,
+            },
+            f,
+            indent=1,
+        )
+    print(f"results saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
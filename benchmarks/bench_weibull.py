@@ -0,0 +1,69 @@
+"""Time windrose.weibull_fit against scipy.stats.exponweib.fit.
+
+Usage::
+
+    python benchmarks/bench_weibull.py [ngroups ...]
+
+Speeds are drawn for `ngroups` groups (default 16 sectors x 12 months x 8
+levels = 1536) of 50 to 500 samples each, from random Weibull factors, and
+fitted all at once by `weibull_fit`. scipy fits the first 100 groups one by
+one, its time is extrapolated to every group and its factors are compared.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from windrose import weibull_fit  # noqa: E402
+
+SCIPY_GROUPS = 100
+
+
+def samples(ngroups, seed=0):
+    rng = np.random.default_rng(seed)
+    shape = rng.uniform(0.8, 4, ngroups)
+    scale = rng.uniform(2, 30, ngroups)
+    sizes = rng.integers(50, 500, ngroups)
+    group = np.repeat(np.arange(ngroups), sizes)
+    var = np.repeat(scale, sizes) * rng.weibull(np.repeat(shape, sizes))
+    return var, group
+
+
+def main(sizes):
+    import scipy.stats
+
+    print(
+        f"{'groups':>7} {'samples':>9} {'batched':>9} {'scipy':>9} "
+        f"{'speedup':>8} {'max rel diff':>12}"
+    )
+    for ngroups in sizes:
+        var, group = samples(ngroups)
+        start = time.perf_counter()
+        shape, scale = weibull_fit(var, group, ngroups)
+        t_batched = time.perf_counter() - start
+
+        nscipy = min(ngroups, SCIPY_GROUPS)
+        start = time.perf_counter()
+        reference = np.array(
+            [
+                scipy.stats.exponweib.fit(var[group == i], floc=0, f0=1)
+                for i in range(nscipy)
+            ]
+        )
+        t_scipy = (time.perf_counter() - start) * ngroups / nscipy
+        diff = max(
+            np.max(np.abs(shape[:nscipy] / reference[:, 1] - 1)),
+            np.max(np.abs(scale[:nscipy] / reference[:, 3] - 1)),
+        )
+        print(
+            f"{ngroups:>7} {len(var):>9} {t_batched:>8.3f}s {t_scipy:>8.2f}s "
+            f"{t_scipy / t_batched:>7.0f}x {diff:>12.1e}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [16 * 12 * 8, 10000])
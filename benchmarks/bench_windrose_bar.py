@@ -0,0 +1,64 @@
+"""Time WindroseAxes.bar / box with Rectangle patches vs PolyCollections.
+
+Usage::
+
+    python benchmarks/bench_windrose_bar.py
+"""
+
+import os
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from windrose import WindroseAxes  # noqa: E402
+
+NSAMPLES = 100_000
+NSECTORS = (16, 36, 72)
+BINS = np.arange(0, 30, 2.5)  # 12 speed bins
+REPEAT = 5
+
+
+def render(kind, direction, var, nsector, collection):
+    ax = WindroseAxes.from_ax()
+    getattr(ax, kind)(direction, var, nsector=nsector, bins=BINS, collection=collection)
+    ax.set_legend()
+    ax.figure.canvas.draw()
+    plt.close(ax.figure)
+
+
+def best_of(func, *args):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    direction = rng.integers(0, 360, NSAMPLES).astype(float)
+    var = rng.weibull(2.0, NSAMPLES) * 10
+    print(
+        f"{'kind':<5} {'nsector':>7} {'patches':>10} {'collection':>10} {'speedup':>8}"
+    )
+    for kind in ("bar", "box"):
+        for nsector in NSECTORS:
+            t_patch = best_of(render, kind, direction, var, nsector, False)
+            t_coll = best_of(render, kind, direction, var, nsector, True)
+            print(
+                f"{kind:<5} {nsector:>7} {t_patch * 1e3:>8.1f}ms "
+                f"{t_coll * 1e3:>8.1f}ms {t_patch / t_coll:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
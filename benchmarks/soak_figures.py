@@ -0,0 +1,51 @@
+"""Soak test: render many windroses without pyplot and watch the RSS.
+
+Usage::
+
+    python benchmarks/soak_figures.py [renders] [threads]
+
+Each render builds a bare Agg figure with ``pyplot=False``, draws a bar rose
+to PNG in memory and drops the figure, from a pool of worker threads like a
+web server would. The resident set size must stay flat.
+"""
+
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from windrose import wrbar  # noqa: E402
+
+BINS = np.array([0, 5, 10, 15, 20, 25], dtype=float)
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def render(seed):
+    rng = np.random.default_rng(seed)
+    direction = rng.integers(0, 37, 5000) * 10.0
+    var = rng.integers(0, 40, 5000).astype(float)
+    ax = wrbar(direction, var, bins=BINS, collection=True, pyplot=False)
+    buf = io.BytesIO()
+    ax.figure.savefig(buf, format="png")
+    return buf.tell()
+
+
+def main(renders=2000, threads=4):
+    step = max(renders // 10, 1)
+    print(f"{'renders':>8} {'rss MB':>8}")
+    with ThreadPoolExecutor(threads) as pool:
+        for start in range(0, renders, step):
+            list(pool.map(render, range(start, start + step)))
+            print(f"{start + step:>8} {rss_mb():>8.1f}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
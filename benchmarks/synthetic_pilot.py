@@ -0,0 +1,68 @@
+"""Write synthetic archives of WMO FM 32 PILOT bulletins.
+
+Usage::
+
+    python benchmarks/synthetic_pilot.py output.txt [megabytes]
+
+The archive is a sequence of ``UPxx01 WIII DDHH00`` bulletins, one per day
+and sounding hour, each holding the PPBB report of every station: winds from
+the surface to 7800 m, in knots, the balloon being lost at a random altitude.
+"""
+
+import sys
+
+import numpy as np
+
+# altitudes (units of 300 m) of the 9tnu1u2u3 groups of a report
+ALTITUDE_GROUPS = ((0, 1, 2), (3, 4, 6), (8, 9), (10, 13, 16), (20, 23, 26))
+HOURS = (0, 6, 12, 18)
+
+
+def _report(rng, station, day, hour):
+    groups = ["PPBB", f"{day + 50:02d}{hour:02d}3", station]
+    nlevels = sum(len(altitudes) for altitudes in ALTITUDE_GROUPS)
+    reached = rng.integers(4, nlevels + 1)
+    ddd = rng.integers(0, 72, nlevels) * 5
+    ff = np.minimum(rng.weibull(2.0, nlevels) * (10 + np.arange(nlevels)), 199)
+    k = 0
+    for altitudes in ALTITUDE_GROUPS:
+        altitudes = altitudes[: max(reached - k, 0)]
+        if not altitudes:
+            break
+        units = "".join(str(altitude % 10) for altitude in altitudes)
+        groups.append(f"9{altitudes[0] // 10}{units:/<3}")
+        for _ in altitudes:
+            speed = int(ff[k])
+            groups.append(f"{ddd[k] + speed // 100:03d}{speed % 100:02d}")
+            k += 1
+    return " ".join(groups) + "="
+
+
+def write_archive(path, megabytes=10, stations=20, seed=0):
+    """
+    Write about `megabytes` MB of bulletins of `stations` stations to
+    `path`. Returns the number of reports written.
+    """
+    rng = np.random.default_rng(seed)
+    indices = [f"96{k:03d}" for k in range(stations)]
+    size = 0
+    reports = 0
+    with open(path, "w") as f:
+        while size < megabytes * 2**20:
+            for day in range(1, 32):
+                for hour in HOURS:
+                    lines = [
+                        f"ZCZC {reports % 1000:03d}",
+                        f"UPID01 WIII {day:02d}{hour:02d}00",
+                    ]
+                    lines += [_report(rng, station, day, hour) for station in indices]
+                    lines.append("NNNN")
+                    text = "\n".join(lines) + "\n"
+                    f.write(text)
+                    size += len(text)
+                    reports += stations
+    return reports
+
+
+if __name__ == "__main__":
+    write_archive(sys.argv[1], *[float(arg) for arg in sys.argv[2:]])
@@ -0,0 +1,160 @@
+"""Write synthetic pibal workbooks shaped like ``Pibal 06UTC.xlsx``.
+
+Usage::
+
+    python benchmarks/synthetic_workbook.py output.xlsx [years [levels]]
+
+One sheet per month (JANUARI ... DESEMBER). Each sheet has the station
+header, the ``Year / M / D a y / H / 3 0 0 0`` header at row 9, the
+``ddd`` / ``ff`` header at row 10 (G:H) and one row per day of every year
+from row 11, with the Maksimum / Minimum / Modus / Rata-rata summary in
+K:P, or below the data in G:H. Further levels add ``ddd`` / ``ff`` column
+pairs to the right of G:H (I:J, K:L, ...), the side summary moving right
+accordingly.
+"""
+
+import sys
+
+import numpy as np
+from xlsxwriter import Workbook
+
+MONTHS = [
+    "JANUARI",
+    "FEBRUARI",
+    "MARET",
+    "APRIL",
+    "MEI",
+    "JUNI",
+    "JULI",
+    "AGUSTUS",
+    "SEPTEMBER",
+    "OKTOBER",
+    "NOVEMBER",
+    "DESEMBER",
+]
+DAYS = [31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+LEVELS = (3000, 5000, 7000, 9000, 10000, 12000, 15000, 20000)
+
+
+def _summary(label, values):
+    if label == "Maksimum":
+        return (values.max(),)
+    if label == "Minimum":
+        return (values.min(),)
+    if label == "Modus":
+        return (np.bincount(values).argmax(),)
+    return (values.mean(),)
+
+
+def write_workbook(
+    path,
+    years=5,
+    start_year=2018,
+    seed=0,
+    missing=0.25,
+    summary="side",
+    station="SINTETIS",
+    hour=6,
+    levels=(3000,),
+):
+    """
+    Write a workbook of `years` years of `hour` UTC soundings of `station`
+    from `start_year`.
+
+    `missing` is the fraction of days without observation. `summary` is
+    "side" for the summary in K:P, as in Pibal 06UTC.xlsx, or "bottom" for
+    summary rows right below the data. `levels` are the heights (m) of the
+    ``ddd`` / ``ff`` column pairs, or their number, taken from `LEVELS`.
+    Winds strengthen with height and more soundings lose the balloon before
+    reaching the upper levels.
+    """
+    if isinstance(levels, int):
+        levels = LEVELS[:levels]
+    rng = np.random.default_rng(seed)
+    workbook = Workbook(path)
+    for month, (name, ndays) in enumerate(zip(MONTHS, DAYS), start=1):
+        sheet = workbook.add_worksheet(name)
+        nrows = years * ndays
+        ddd = rng.integers(0, 37, nrows) * 10
+        ff = np.minimum(rng.weibull(2.0, nrows) * 10, 40).astype(int)
+        ff[ddd == 0] = 0
+        observed = rng.random(nrows) >= missing
+        data = [(ddd, ff, observed)]
+        for k in range(1, len(levels)):
+            level_ddd = rng.integers(0, 37, nrows) * 10
+            level_ff = np.minimum(
+                rng.weibull(2.0, nrows) * (10 + 2 * k), 40 + 10 * k
+            ).astype(int)
+            level_ff[level_ddd == 0] = 0
+            data.append(
+                (level_ddd, level_ff, observed & (rng.random(nrows) >= 0.05 * k))
+            )
+        # side summary labels and values, right of the last level
+        side = 10 + 2 * (len(levels) - 1)
+
+        sheet.write(0, 0, f"STASIUN METEOROLOGI {station}")
+        sheet.write(1, 0, "DATA PENENTUAN ANGIN ATAS")
+        sheet.write(2, 0, "PILOT BALON")
+        last_year = start_year + years - 1
+        for row, (label, value) in enumerate(
+            [
+                ("TAHUN", f"{start_year}-{last_year}"),
+                ("BULAN", name),
+                ("J A M", f"{hour:02d}.00"),
+            ],
+            start=4,
+        ):
+            sheet.write(row, 1, label)
+            sheet.write(row, 5, ":")
+            sheet.write(row, 6, value)
+        sheet.write(6, 7, "UTC")
+        if summary == "side":
+            for k in range(len(levels)):
+                sheet.write(7, side + 3 + 4 * k, "ddd")
+                sheet.write(7, side + 5 + 4 * k, "ff")
+        for col, label in [(0, "Year"), (2, "M"), (3, "D a y"), (5, "H")]:
+            sheet.write(8, col, label)
+        for k, level in enumerate(levels):
+            sheet.write(8, 6 + 2 * k, " ".join(str(level)))
+            sheet.write(9, 6 + 2 * k, "ddd")
+            sheet.write(9, 7 + 2 * k, "ff")
+        for k, (label, row) in enumerate(
+            [("Maksimum", 8), ("Minimum", 10), ("Modus", 12), ("Rata-rata", 14)]
+        ):
+            if summary == "side":
+                sheet.write(row, side, label)
+            else:
+                row = 10 + nrows + 1 + k
+                sheet.write(row, 0, label)
+            for j, (level_ddd, level_ff, level_observed) in enumerate(data):
+                values = _summary(label, level_ddd[level_observed])
+                values += _summary(label, level_ff[level_observed])
+                if summary == "side":
+                    sheet.write(row, side + 3 + 4 * j, values[0])
+                    sheet.write(row, side + 5 + 4 * j, values[1])
+                else:
+                    sheet.write(row, 6 + 2 * j, values[0])
+                    sheet.write(row, 7 + 2 * j, values[1])
+
+        for k in range(nrows):
+            row = 10 + k
+            year, day = divmod(k, ndays)
+            day += 1
+            if day == 1:
+                yy = (start_year + year) % 100
+                sheet.write(row, 0, yy // 10)
+                sheet.write(row, 1, yy % 10)
+                sheet.write(row, 2, month)
+                sheet.write(row, 5, hour)
+            sheet.write(row, 3, day // 10)
+            sheet.write(row, 4, float(day % 10))
+            for j, (level_ddd, level_ff, level_observed) in enumerate(data):
+                if level_observed[k]:
+                    sheet.write(row, 6 + 2 * j, level_ddd[k])
+                    sheet.write(row, 7 + 2 * j, level_ff[k])
+    workbook.close()
+
+
+if __name__ == "__main__":
+    path, *sizes = sys.argv[1:]
+    write_workbook(path, **dict(zip(["years", "levels"], map(int, sizes))))
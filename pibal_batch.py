@@ -0,0 +1,148 @@
+"""Render the monthly windroses and frequency tables of pibal workbooks.
+
+Usage::
+
+    python pibal_batch.py "Pibal 06UTC.xlsx" [more.xlsx ...] -o report
+
+Each workbook is parsed once, then the windrose and the frequency table of
+every month are computed and rendered in a pool of worker processes, with the
+Agg backend and without pyplot. For a workbook ``Pibal 06UTC.xlsx`` the
+output directory gets ``Pibal 06UTC/01_JANUARI.png`` (and ``.svg``) and
+``Pibal 06UTC/01_JANUARI.csv``, the speed bin x direction frequency table of
+the dashboards.
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np  # noqa: E402
+
+from pibal_core import (  # noqa: E402
+    SPEED_BINS,
+    SPEED_LABELS,
+    clean,
+    direction_labels,
+    frequency_table,
+    pivot_table,
+)
+from pibal_store import read_workbook  # noqa: E402
+from windrose import WindroseAxes  # noqa: E402
+
+FORMATS = ("png", "svg")
+NSECTOR_DEFAULT = 16
+DPI = 150
+
+
+def render_month(df, path, title, nsector=NSECTOR_DEFAULT, formats=("png",)):
+    """
+    Write the windrose and the frequency table of one month.
+
+    `path` is the output path without extension. A month without any wind,
+    no observation or only calms, only gets its (zero) table. Returns the
+    written paths.
+    """
+    df = clean(df)
+    written = []
+
+    table = pivot_table(
+        frequency_table(df, nsector, SPEED_BINS),
+        direction_labels(nsector),
+        SPEED_LABELS,
+    )
+    table.to_csv(f"{path}.csv")
+    written.append(f"{path}.csv")
+    if not (df["ff"] > 0).any():
+        return written
+
+    # Same right-closed speed bins as the table: ff == 0 is a calm
+    edges = np.nextafter(np.asarray(SPEED_BINS[:-1], dtype=float), np.inf)
+    ax = WindroseAxes.from_ax(pyplot=False)
+    ax.bar(
+        np.mod(df["ddd"].to_numpy(dtype=float), 360),
+        df["ff"].to_numpy(dtype=float),
+        bins=edges,
+        nsector=nsector,
+        calm_limit=0,
+        normed=True,
+        opening=0.8,
+        edgecolor="white",
+        collection=True,
+    )
+    legend = ax.set_legend()
+    for text, label in zip(legend.get_texts(), SPEED_LABELS):
+        text.set_text(label)
+    ax.set_title(title, loc="left")
+    for fmt in formats:
+        ax.figure.savefig(f"{path}.{fmt}", dpi=DPI)
+        written.append(f"{path}.{fmt}")
+    return written
+
+
+def render_workbook(pool, file, outdir, nsector=NSECTOR_DEFAULT, formats=("png",)):
+    """
+    Parse `file` and submit one `render_month` job per sheet to `pool`.
+
+    Returns the list of futures.
+    """
+    name = os.path.splitext(os.path.basename(file))[0]
+    directory = os.path.join(outdir, name)
+    os.makedirs(directory, exist_ok=True)
+    return [
+        pool.submit(
+            render_month,
+            df,
+            os.path.join(directory, f"{month:02d}_{sheet_name}"),
+            f"{name} - {sheet_name}",
+            nsector,
+            formats,
+        )
+        for month, (sheet_name, df) in enumerate(read_workbook(file).items(), 1)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render the monthly windroses and frequency tables of pibal "
+        "workbooks."
+    )
+    parser.add_argument("workbooks", nargs="+", help="pibal .xlsx workbooks")
+    parser.add_argument("-o", "--output", default="windroses", help="output directory")
+    parser.add_argument(
+        "-f",
+        "--format",
+        action="append",
+        choices=FORMATS,
+        help="figure format, may be repeated (default: png)",
+    )
+    parser.add_argument(
+        "-n",
+        "--nsector",
+        type=int,
+        default=NSECTOR_DEFAULT,
+        help=f"number of direction sectors (default: {NSECTOR_DEFAULT})",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="worker processes (default: number of CPUs)",
+    )
+    args = parser.parse_args(argv)
+    formats = tuple(dict.fromkeys(args.format or ["png"]))
+
+    with ProcessPoolExecutor(args.jobs) as pool:
+        futures = []
+        for file in args.workbooks:
+            futures += render_workbook(pool, file, args.output, args.nsector, formats)
+        written = [path for future in as_completed(futures) for path in future.result()]
+    print(f"{len(futures)} months, {len(written)} files written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
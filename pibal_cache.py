@@ -0,0 +1,186 @@
+"""Content-hash result cache shared by the Streamlit dashboards.
+
+Streamlit reruns the whole script on every widget interaction, e.g. when
+another month is picked, and every session imports this module only once.
+Results cached here are therefore reused across reruns and sessions as long
+as the uploaded workbook has the same content.
+"""
+
+import collections
+import functools
+import hashlib
+import inspect
+import os
+import sys
+import threading
+
+import numpy as np
+
+CACHE_MB_DEFAULT = 256
+HASH_BLOCK = 2**20
+# Digests of the last uploads, see `content_hash`
+UPLOAD_HASHES_KEPT = 64
+
+_upload_hashes = collections.OrderedDict()
+_upload_hashes_lock = threading.Lock()
+
+
+def content_hash(file):
+    """
+    SHA-256 hex digest of the content of `file`, a path, bytes or a file-like
+    object such as a Streamlit UploadedFile.
+
+    An UploadedFile is hashed once per upload, keyed on its ``file_id`` and
+    ``size``: the nested cached calls of every rerun reuse that digest.
+    """
+    file_id = getattr(file, "file_id", None)
+    if file_id is None:
+        return _hash(file)
+    key = (file_id, getattr(file, "size", None))
+    with _upload_hashes_lock:
+        digest = _upload_hashes.get(key)
+        if digest is not None:
+            _upload_hashes.move_to_end(key)
+            return digest
+    digest = _hash(file)
+    with _upload_hashes_lock:
+        _upload_hashes[key] = digest
+        while len(_upload_hashes) > UPLOAD_HASHES_KEPT:
+            _upload_hashes.popitem(last=False)
+    return digest
+
+
+def _hash(file):
+    """`content_hash`, computed"""
+    if isinstance(file, (bytes, bytearray, memoryview)):
+        data = file
+    elif hasattr(file, "getvalue"):
+        data = file.getvalue()
+    elif hasattr(file, "read"):
+        position = file.tell()
+        file.seek(0)
+        data = file.read()
+        file.seek(position)
+    else:
+        # in blocks, large archives are not read in memory whole
+        digest = hashlib.sha256()
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    return hashlib.sha256(data).hexdigest()
+
+
+def sizeof(obj):
+    """Approximate memory footprint of a cached result, in bytes"""
+    if hasattr(obj, "memory_usage"):
+        # DataFrame (one value per column) or Series, without importing pandas
+        return int(np.sum(obj.memory_usage(index=True, deep=True)))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if hasattr(obj, "to_plotly_json"):
+        # plotly figure: its data lives in nested dicts, sized by its JSON
+        return len(obj.to_json())
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            sizeof(key) + sizeof(value) for key, value in obj.items()
+        )
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(sizeof(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache bounded by the total size of its values.
+
+    Parameters
+    ----------
+    max_bytes : int
+        memory budget. The least recently used results are evicted to stay
+        under it, and a result larger than the whole budget is not stored.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return (
+            f"ResultCache({len(self)} items, {self.nbytes / 2**20:.1f}"
+            f"/{self.max_bytes / 2**20:.0f} MB, hits={self.hits}, "
+            f"misses={self.misses})"
+        )
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._items.move_to_end(key)
+            return self._items[key][0]
+
+    def put(self, key, value):
+        size = sizeof(value)
+        with self._lock:
+            if key in self._items:
+                self.nbytes -= self._items.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._items[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                self.nbytes -= self._items.popitem(last=False)[1][1]
+
+    def get_or_compute(self, key, compute):
+        """
+        Cached value of `key`, computed with ``compute()`` and stored on a
+        miss. None results are returned but not stored.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            if value is not None:
+                self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+
+CACHE = ResultCache(
+    int(os.environ.get("PIBAL_CACHE_MB", CACHE_MB_DEFAULT)) * 2**20,
+)
+
+
+def cached(func):
+    """
+    Cache ``func(file, ...)`` in `CACHE`, keyed on the content hash of `file`
+    and the values of the other arguments, defaults included, which must be
+    hashable.
+
+    Cached results are shared between reruns and sessions and must not be
+    modified in place. Calls that raise, or return None, are not cached.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(file, *args, **kwargs):
+        bound = signature.bind(file, *args, **kwargs)
+        bound.apply_defaults()
+        params = tuple(bound.arguments.items())[1:]
+        key = (func.__module__, func.__qualname__, content_hash(file), params)
+        return CACHE.get_or_compute(key, lambda: func(file, *args, **kwargs))
+
+    return wrapper
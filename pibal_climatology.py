@@ -0,0 +1,209 @@
+"""Wind climatology of many stations and sounding hours.
+
+A directory of pibal workbooks, typically one per station and hour (00, 06,
+12 UTC), is reduced to a single histogram cube of counts indexed by station x
+hour x month x sector x speed bin. The workbooks are parsed in parallel, one
+per worker process, and the dashboards then slice the cube without reading
+any workbook again.
+"""
+
+import collections
+import functools
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pibal_core import SPEED_BINS, long_table
+from pibal_io import MONTHS
+from pibal_store import load
+from windrose import histogram_by
+
+
+def workbook_counts(file, nsector=16, speed_bins=SPEED_BINS, level=None):
+    """
+    Frequency counts of each month of a workbook, by station and hour, at one
+    level: `level` (m), by default the lowest level of each station, i.e. the
+    first ddd / ff pair of the sheets.
+
+    The observations are read from `pibal_store`, so a workbook is only
+    parsed the first time it is seen. Other sources, e.g. PILOT bulletin
+    archives, can be used once stored, see `pibal_pilot.convert`.
+
+    Observations of an unknown hour or month are left out: sheets without
+    a J A M or BULAN header, and PILOT archives converted without their
+    ``month``.
+
+    Returns
+    -------
+    list
+        one ``(station, hour, month, years, counts)`` item per hour and
+        month, `counts` being the sector x speed bin int64 array of the month
+        and `years` the sorted years observed
+    """
+    meta, columns = load(file)
+    stations = np.asarray(columns["station"])
+    levels = np.asarray(columns["level"])
+    if level is None:
+        lowest = np.full(len(meta["stations"]), np.iinfo(levels.dtype).max)
+        np.minimum.at(lowest, stations, levels)
+        rows = levels == lowest[stations]
+    else:
+        rows = levels == level
+    hours = np.asarray(columns["hour"])
+    months = np.asarray(columns["month"])
+    rows &= (hours >= 0) & (months >= 1) & (months <= len(MONTHS))
+
+    # one integer code per (station, hour, month), binned in a single pass
+    hours = hours[rows].astype(np.int64)
+    code = (stations[rows].astype(np.int64) * 25 + hours) * 13 + months[rows]
+    edges = np.nextafter(np.asarray(speed_bins, dtype=float), np.inf)
+    tables = histogram_by(
+        np.mod(np.asarray(columns["ddd"][rows], dtype=float), 360),
+        np.asarray(columns["ff"][rows], dtype=float),
+        code,
+        edges,
+        nsector,
+    )
+    # the years of each code, from the distinct (code, year) pairs
+    pairs = np.unique(code * 2**16 + columns["year"][rows])
+    years = collections.defaultdict(list)
+    for key, year in zip((pairs >> 16).tolist(), (pairs & 0xFFFF).tolist()):
+        years[key].append(year)
+
+    items = []
+    for key, table in tables.items():
+        station, hour = divmod(key // 13, 25)
+        items.append(
+            (
+                meta["stations"][station],
+                hour,
+                key % 13,
+                tuple(years[key]),
+                table.counts[:-1].T.astype(np.int64),
+            )
+        )
+    return items
+
+
+class Climatology:
+    """
+    Counts of pibal observations by station x hour x month x sector x speed
+    bin.
+
+    Parameters
+    ----------
+    stations : sequence of str
+        station names, as given on top of the sheets
+    hours : sequence of int
+        sounding hours (UTC)
+    counts : 5D int64 array
+        ``(len(stations), len(hours), 12, nsector, len(speed_bins) - 1)``
+    speed_bins : sequence of float
+        speed bin edges, closed on the right
+    years : dict, optional
+        sorted years observed for each ``(station, hour)``
+
+    Observations of an unknown hour or month are not counted, see
+    `workbook_counts`.
+    """
+
+    def __init__(self, stations, hours, counts, speed_bins=SPEED_BINS, years=None):
+        self.stations = tuple(stations)
+        self.hours = tuple(hours)
+        self.counts = counts
+        self.speed_bins = tuple(speed_bins)
+        self.years = years or {}
+        if counts.shape[:3] != (len(self.stations), len(self.hours), len(MONTHS)):
+            raise ValueError("counts do not match the stations, hours and months")
+        if counts.shape[4] != len(self.speed_bins) - 1:
+            raise ValueError("counts do not match the speed bins")
+
+    def __repr__(self):
+        return (
+            f"Climatology({len(self.stations)} stations, hours={self.hours}, "
+            f"nsector={self.nsector}, {self.counts.sum()} observations)"
+        )
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + self.counts.nbytes
+
+    @property
+    def nsector(self):
+        return self.counts.shape[3]
+
+    @classmethod
+    def from_files(
+        cls, files, nsector=16, speed_bins=SPEED_BINS, jobs=None, level=None
+    ):
+        """
+        Build the cube of `files` at `level`, see `workbook_counts`, parsed
+        concurrently in `jobs` processes (default: number of CPUs).
+
+        Several workbooks may hold the same station and hour, e.g. one per
+        decade: their counts are added.
+        """
+        files = list(files)
+        if jobs == 1 or len(files) <= 1:
+            results = [
+                workbook_counts(file, nsector, speed_bins, level) for file in files
+            ]
+        else:
+            with ProcessPoolExecutor(jobs) as pool:
+                count = functools.partial(
+                    workbook_counts,
+                    nsector=nsector,
+                    speed_bins=speed_bins,
+                    level=level,
+                )
+                results = list(pool.map(count, files))
+        items = [item for result in results for item in result]
+        stations = sorted({item[0] for item in items})
+        hours = sorted({item[1] for item in items})
+        counts = np.zeros(
+            (len(stations), len(hours), len(MONTHS), nsector, len(speed_bins) - 1),
+            dtype=np.int64,
+        )
+        years = {}
+        for station, hour, month, month_years, month_counts in items:
+            key = (station, hour)
+            counts[
+                stations.index(station), hours.index(hour), month - 1
+            ] += month_counts
+            years[key] = tuple(sorted(set(years.get(key, ())) | set(month_years)))
+        return cls(stations, hours, counts, speed_bins, years)
+
+    @classmethod
+    def from_directory(
+        cls, directory, nsector=16, speed_bins=SPEED_BINS, jobs=None, level=None
+    ):
+        """Build the cube of every ``.xlsx`` workbook of `directory`"""
+        files = sorted(glob.glob(os.path.join(directory, "*.xlsx")))
+        return cls.from_files(files, nsector, speed_bins, jobs, level)
+
+    def _index(self, axis, values, value):
+        if value is None:
+            return slice(None)
+        if value not in values:
+            raise KeyError(f"no {axis} {value!r} in {values}")
+        return values.index(value)
+
+    def select(self, station=None, hour=None, month=None):
+        """
+        Sector x speed bin counts of a station, hour and month (1 to 12),
+        summed over the ones left to None.
+        """
+        counts = self.counts[
+            self._index("station", self.stations, station),
+            self._index("hour", self.hours, hour),
+            slice(None) if month is None else month - 1,
+        ]
+        return counts.reshape((-1,) + counts.shape[-2:]).sum(axis=0)
+
+    def frequency_table(self, station=None, hour=None, month=None):
+        """
+        `select` as a long table, like `pibal_core.frequency_table`, ready
+        for `pibal_core.label_table` and `pibal_core.pivot_table`.
+        """
+        return long_table(self.select(station, hour, month).T)
@@ -0,0 +1,209 @@
+"""Wind frequency tables shared by the pibal dashboards.
+
+Directions and speeds are reduced to integer sector and speed bin codes and
+counted with `windrose.histogram`, or `windrose.histogram_levels` for every
+level of vertical profiles at once. Compass and speed labels are only attached
+by `label_table` and `pivot_table`, when a table is displayed.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pibal_timing import timed
+from windrose import histogram, histogram_by, histogram_levels
+from windrose import sector_codes as windrose_sector_codes
+
+COMPASS_POINTS = (
+    "N",
+    "NNE",
+    "NE",
+    "ENE",
+    "E",
+    "ESE",
+    "SE",
+    "SSE",
+    "S",
+    "SSW",
+    "SW",
+    "WSW",
+    "W",
+    "WNW",
+    "NW",
+    "NNW",
+)
+SPEED_BINS = (0, 5, 10, 15, 20, 25, np.inf)
+SPEED_LABELS = (
+    "0-5 knot",
+    "6-10 knot",
+    "11-15 knot",
+    "16-20 knot",
+    "20-25 knot",
+    ">25 knot",
+)
+
+
+def direction_labels(nsector):
+    """
+    Label of each sector, from North clockwise: compass points when `nsector`
+    divides 16, the sector centre in degrees otherwise.
+    """
+    if 16 % nsector == 0:
+        return COMPASS_POINTS[:: 16 // nsector]
+    return tuple(f"{k * 360 / nsector:g}°" for k in range(nsector))
+
+
+def speed_labels(speed_bins, decimals=1):
+    """``"low-high"`` label of each speed bin"""
+    return tuple(
+        f"{low:.{decimals}f}-{high:.{decimals}f}"
+        for low, high in zip(speed_bins[:-1], speed_bins[1:])
+    )
+
+
+@timed("clean")
+def clean(df):
+    """The rows of `df` where both ``ddd`` and ``ff`` are finite"""
+    return df.replace([np.inf, -np.inf], np.nan).dropna(subset=["ddd", "ff"])
+
+
+def sector_codes(direction, nsector=16):
+    """
+    Sector code of each direction in degrees, 0 being the sector centred on
+    North and codes increasing clockwise. NaN directions get ``nsector``.
+    """
+    return windrose_sector_codes(np.mod(direction, 360), nsector)
+
+
+@timed("histogram")
+def frequency_counts(df, nsector=16, speed_bins=SPEED_BINS):
+    """
+    Number of observations of `df` in each speed bin x sector.
+
+    Speed bins are closed on the right like `pandas.cut`: with the default
+    `speed_bins` the first bin is ``0 < ff <= 5`` and calm (``ff == 0``)
+    observations are not counted.
+
+    Returns
+    -------
+    2D int64 array
+        ``len(speed_bins) - 1`` rows, `nsector` columns
+    """
+    speed = df["ff"].to_numpy(dtype=float)
+    # [a, b) on the next representable edges is (a, b] on the edges
+    edges = np.nextafter(np.asarray(speed_bins, dtype=float), np.inf)
+    table = histogram(np.mod(df["ddd"].to_numpy(), 360), speed, edges, nsector)[2]
+    # the extra row above the last edge is out of range
+    return table[:-1].astype(np.int64)
+
+
+@timed("histogram")
+def level_counts(ddd, ff, nsector=16, speed_bins=SPEED_BINS):
+    """
+    `frequency_counts` of every level of (observation x level) ``ddd`` and
+    ``ff`` arrays, e.g. of a `pibal_io.Profile`, in a single pass.
+
+    Observations missing at a level, NaN or non finite, are not counted at
+    that level.
+
+    Returns
+    -------
+    3D int64 array
+        level x speed bin x sector
+    """
+    edges = np.nextafter(np.asarray(speed_bins, dtype=float), np.inf)
+    table = histogram_levels(
+        np.mod(ddd, 360), np.asarray(ff, dtype=float), edges, nsector
+    )[2]
+    return table[:, :-1].astype(np.int64)
+
+
+def frame_level_counts(df, nsector=16, speed_bins=SPEED_BINS):
+    """
+    `level_counts` of the ``ddd``, ``ff`` and ``level`` columns of `df`, one
+    row per observation and level like `pibal_store.read_observations` or
+    `pibal_io.read_workbook` with ``levels=True``, in a single pass.
+
+    Returns
+    -------
+    levels : list of int
+        the levels with observations, in increasing order
+    counts : 3D int64 array
+        level x speed bin x sector
+    """
+    df = clean(df)
+    edges = np.nextafter(np.asarray(speed_bins, dtype=float), np.inf)
+    tables = histogram_by(
+        np.mod(df["ddd"].to_numpy(dtype=float), 360),
+        df["ff"].to_numpy(dtype=float),
+        df["level"].to_numpy(),
+        edges,
+        nsector,
+    )
+    counts = np.zeros((len(tables), len(edges) - 1, nsector), dtype=np.int64)
+    for i, table in enumerate(tables.values()):
+        counts[i] = table.counts[:-1]
+    return list(tables), counts
+
+
+def long_table(counts):
+    """
+    Long table of a speed bin x sector `counts` array, one row per sector x
+    speed bin, see `frequency_table`.
+    """
+    nbins, nsector = counts.shape
+    return pd.DataFrame(
+        {
+            "sector": np.repeat(np.arange(nsector), nbins),
+            "speed_bin": np.tile(np.arange(nbins), nsector),
+            "frequency": counts.T.ravel(),
+        }
+    )
+
+
+def frequency_table(df, nsector=16, speed_bins=SPEED_BINS):
+    """
+    Long table of the wind frequency of `df`, one row per sector x speed bin.
+
+    Rows are ordered by sector from North clockwise, then by speed bin, and
+    every combination is present. The ``sector`` and ``speed_bin`` columns
+    are integer codes, see `label_table`.
+    """
+    return long_table(frequency_counts(df, nsector, speed_bins))
+
+
+def frequency_tables(frames, nsector=16, speed_bins=SPEED_BINS):
+    """`frequency_table` of each cleaned DataFrame of `frames`, by sheet"""
+    return {
+        sheet_name: frequency_table(clean(df), nsector, speed_bins)
+        for sheet_name, df in frames.items()
+    }
+
+
+def label_table(table, directions, speeds):
+    """
+    Display copy of a `frequency_table`: the ``sector`` and ``speed_bin``
+    codes become ordered ``wind_direction`` and ``ff`` categoricals.
+    """
+    labelled = table.drop(columns=["sector", "speed_bin"])
+    labelled.insert(
+        0,
+        "ff",
+        pd.Categorical.from_codes(table["speed_bin"], list(speeds), ordered=True),
+    )
+    labelled.insert(
+        0,
+        "wind_direction",
+        pd.Categorical.from_codes(table["sector"], list(directions), ordered=True),
+    )
+    return labelled
+
+
+def pivot_table(table, directions, speeds, values="frequency"):
+    """Speed bin x direction DataFrame of a `frequency_table` column"""
+    counts = np.zeros((len(speeds), len(directions)), dtype=table[values].dtype)
+    counts[table["speed_bin"], table["sector"]] = table[values]
+    return pd.DataFrame(
+        counts,
+        index=pd.CategoricalIndex(speeds, ordered=True, name="ff"),
+        columns=pd.CategoricalIndex(directions, ordered=True, name="wind_direction"),
+    )
@@ -0,0 +1,73 @@
+"""Plotly windrose figures of the pibal dashboards.
+
+The figures are built with one `go.Barpolar` trace per speed bin straight
+from the dense speed bin x sector table, instead of letting
+`plotly.express.bar_polar` regroup a long DataFrame on every rerun. They are
+cached per workbook content, month and binning by the dashboards.
+"""
+
+import plotly.graph_objects as go
+from plotly.colors import sequential
+
+from pibal_core import pivot_table
+from pibal_timing import timed
+
+
+@timed("figure_build")
+def barpolar_figure(
+    table,
+    directions,
+    speeds,
+    values="frequency",
+    colors=sequential.Rainbow_r,
+    title=None,
+):
+    """
+    Stacked windrose of a `pibal_core.frequency_table` column.
+
+    Parameters
+    ----------
+    table : DataFrame
+        long table with ``sector`` and ``speed_bin`` codes
+    directions, speeds : sequence of str
+        sector and speed bin labels
+    values : str, default "frequency"
+        column of `table` giving the bar lengths
+    colors : sequence of str
+        color of each speed bin, cycled if too short
+
+    Returns
+    -------
+    go.Figure
+        the same figure as ``px.bar_polar(label_table(...), r=values,
+        theta="wind_direction", color="ff")``, North on top and clockwise
+    """
+    counts = pivot_table(table, directions, speeds, values).to_numpy()
+    theta = list(directions)
+    traces = [
+        go.Barpolar(
+            r=counts[k],
+            theta=theta,
+            name=speed,
+            legendgroup=speed,
+            marker_color=colors[k % len(colors)],
+            hovertemplate=(
+                f"ff={speed}<br>{values}=%{{r}}<br>wind_direction=%{{theta}}"
+                "<extra></extra>"
+            ),
+        )
+        for k, speed in enumerate(speeds)
+    ]
+    fig = go.Figure(traces)
+    fig.update_layout(
+        barmode="relative",
+        legend_title_text="ff",
+        legend_tracegroupgap=0,
+        margin_t=60,
+        polar_angularaxis_direction="clockwise",
+        polar_angularaxis_rotation=90,
+        polar_angularaxis_categoryorder="array",
+        polar_angularaxis_categoryarray=theta,
+        title=title,
+    )
+    return fig
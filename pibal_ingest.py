@@ -0,0 +1,262 @@
+"""Background ingestion of uploaded pibal workbooks.
+
+An `Ingestion` parses the sheets of a workbook in a worker thread, so the
+Streamlit script thread stays free to show the months already done and a
+progress bar. Frequency tables are binned from the parsed sheets on request,
+for any number of sectors and speed bins. Once every sheet is parsed the
+observations are saved to `pibal_store`, and later uploads of the same
+workbook are served from there.
+"""
+
+import collections
+import threading
+
+import openpyxl
+
+from pibal_cache import content_hash
+from pibal_core import SPEED_BINS, clean, frequency_table
+from pibal_io import LazyWorkbook, _open, _read_sheet, _source, first_level
+import pibal_store
+
+# Finished ingestions kept for the reruns and other sessions
+KEEP_FINISHED = 8
+
+
+class Cancelled(Exception):
+    """Raised by `Ingestion.frame` once the ingestion is cancelled"""
+
+
+class Ingestion:
+    """
+    Parse the sheets of a workbook, in workbook order, in a worker thread. A
+    workbook already in `pibal_store` is read from there.
+
+    Every level of the sheets is read, and the sheets parsed so far are in
+    `frames`. A sheet asked for with `frame` or `frequency_table` before the
+    worker reaches it is parsed right away by the caller, and skipped by the
+    worker: each sheet is parsed once. `cancel` stops the worker at the next
+    sheet.
+
+    A sheet that cannot be read, e.g. a cover sheet without a ddd / ff
+    header, has its exception in `errors`, raised again when that sheet is
+    asked for, and the worker goes on with the next sheet. `error` is an
+    exception that stopped the worker itself.
+
+    Ingestions are shared between sessions, see `ingest`: `sessions` counts
+    the sessions following this one, see `follow`.
+
+    Parameters
+    ----------
+    file : str, path, bytes or file-like
+        the workbook. The content of a file-like object is copied.
+    store : bool, default True
+        save the observations to `pibal_store` once all sheets are parsed
+    """
+
+    def __init__(self, file, store=True):
+        self.store = store
+        self.error = None
+        self.errors = {}
+        self.sessions = 0
+        self.frames = {}
+        self._source = _source(file)
+        self._workbook = LazyWorkbook(self._source, tags=True, levels=True)
+        self.sheet_names = list(self._workbook)
+        self._tracebacks = {}
+        self._tables = {}
+        self._claimed = set()  # sheets being parsed, by the worker or a caller
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __repr__(self):
+        state = "cancelled" if self.cancelled else "done" if self.done else "running"
+        return (
+            f"Ingestion({len(self.frames)}/{len(self.sheet_names)} sheets, "
+            f"{len(self.errors)} failed, {state})"
+        )
+
+    @property
+    def progress(self):
+        """Fraction of the sheets done, read or failed"""
+        if not self.sheet_names:
+            return 1.0
+        return (len(self.frames) + len(self.errors)) / len(self.sheet_names)
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """Stop the worker at the next sheet"""
+        self._cancelled.set()
+
+    def wait(self, timeout=None):
+        """Wait for the worker, returns whether it is finished"""
+        return self._done.wait(timeout)
+
+    def _finished(self, sheet_name):
+        return sheet_name in self.frames or sheet_name in self.errors
+
+    def _parse(self, sheet_name, read):
+        """
+        Record the DataFrame returned by `read`, or its error, for a sheet
+        claimed by the caller.
+        """
+        try:
+            df = read()
+        except Exception as e:
+            with self._condition:
+                self.errors[sheet_name] = e
+                self._tracebacks[sheet_name] = e.__traceback__
+        else:
+            with self._condition:
+                self.frames[sheet_name] = df
+        finally:
+            with self._condition:
+                self._claimed.discard(sheet_name)
+                self._condition.notify_all()
+
+    def _wait(self, sheet_name):
+        """
+        Wait for the worker or another caller if they are on `sheet_name`,
+        else parse it now.
+        """
+        with self._condition:
+            while sheet_name in self._claimed:
+                self._condition.wait()
+            claim = not self._finished(sheet_name)
+            if claim:
+                if self.cancelled:
+                    raise Cancelled(sheet_name)
+                self._claimed.add(sheet_name)
+        if claim:
+            self._parse(sheet_name, lambda: self._workbook[sheet_name])
+        if sheet_name in self.errors:
+            # the traceback of the parse, not of every earlier raise
+            raise self.errors[sheet_name].with_traceback(self._tracebacks[sheet_name])
+
+    def frame(self, sheet_name):
+        """
+        Observations of every level of a sheet, a DataFrame with at least the
+        ``ddd``, ``ff`` and ``level`` columns, see `pibal_io.first_level`:
+        the worker's if it has done it, or waits for it if it is on it, else
+        parsed now.
+        """
+        self._wait(sheet_name)
+        return self.frames[sheet_name]
+
+    def frequency_table(self, sheet_name, nsector=16, speed_bins=SPEED_BINS):
+        """
+        `pibal_core.frequency_table` of the first level of a sheet, see
+        `frame`, binned once for each `nsector` and `speed_bins`.
+        """
+        key = (sheet_name, nsector, tuple(speed_bins))
+        table = self._tables.get(key)
+        if table is None:
+            df = clean(first_level(self.frame(sheet_name)))
+            table = frequency_table(df, nsector, speed_bins)
+            self._tables[key] = table
+        return table
+
+    def _run(self):
+        try:
+            stored = pibal_store.is_stored(self._source)
+            if stored:
+                frames = pibal_store.read_workbook(self._source, levels=True)
+                with self._condition:
+                    for sheet_name, df in frames.items():
+                        if not self._finished(sheet_name):
+                            self.frames[sheet_name] = df
+                    self._condition.notify_all()
+                if all(self._finished(name) for name in self.sheet_names):
+                    return
+            # sheets not stored, or whose parsing failed when it was stored
+            workbook = openpyxl.load_workbook(
+                _open(self._source), read_only=True, data_only=True
+            )
+            try:
+                for worksheet in workbook.worksheets:
+                    sheet_name = worksheet.title
+                    with self._condition:
+                        if self._cancelled.is_set():
+                            return
+                        if self._finished(sheet_name) or sheet_name in self._claimed:
+                            continue
+                        self._claimed.add(sheet_name)
+                    self._parse(
+                        sheet_name,
+                        lambda: _read_sheet(worksheet, tags=True, levels=True),
+                    )
+            finally:
+                workbook.close()
+            if self.store and not stored:
+                with self._condition:
+                    # sheets still parsed by a caller
+                    while self._claimed:
+                        self._condition.wait()
+                    # the sheets read, in workbook order
+                    frames = {
+                        name: self.frames[name]
+                        for name in self.sheet_names
+                        if name in self.frames
+                    }
+                pibal_store.save(self._source, frames)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._done.set()
+
+
+_INGESTIONS = collections.OrderedDict()
+_LOCK = threading.Lock()
+
+
+def ingest(file):
+    """
+    The `Ingestion` of `file`, started if needed.
+
+    Ingestions are shared by content hash, whatever the binning asked of
+    them, so reruns and other sessions uploading the same workbook follow
+    the same worker, see `follow`. A cancelled ingestion is restarted.
+    """
+    key = content_hash(file)
+    with _LOCK:
+        ingestion = _INGESTIONS.get(key)
+        if ingestion is None or ingestion.cancelled:
+            ingestion = Ingestion(file).start()
+            _INGESTIONS[key] = ingestion
+        _INGESTIONS.move_to_end(key)
+        finished = [k for k, value in _INGESTIONS.items() if value.done]
+        for k in finished[: max(len(finished) - KEEP_FINISHED, 0)]:
+            del _INGESTIONS[k]
+    return ingestion
+
+
+def follow(ingestion, previous=None):
+    """
+    Make a session follow `ingestion` instead of `previous`, the ingestion it
+    followed so far, if any, and return `ingestion`.
+
+    `previous` is cancelled once no session follows it any more: another
+    session viewing the same workbook keeps its parsed sheets. Sessions that
+    end without following another ingestion leave theirs running to the end.
+    """
+    if ingestion is previous:
+        return ingestion
+    with _LOCK:
+        ingestion.sessions += 1
+        if previous is not None:
+            previous.sessions -= 1
+            if previous.sessions <= 0:
+                previous.cancel()
+    return ingestion
@@ -0,0 +1,442 @@
+"""Reading of pibal (pilot balloon) workbooks.
+
+A pibal workbook has one sheet per month. In every sheet a ``ddd`` / ``ff``
+header row (G10:H10 in the BMKG layout) sits on top of the wind direction
+``ddd`` (degrees) and speed ``ff`` (knots) of each sounding, which may be
+followed by Maksimum / Minimum / Modus / Rata-rata summary rows.
+"""
+
+import collections
+import collections.abc
+import io
+import re
+import threading
+import zipfile
+from xml.etree import ElementTree
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from pibal_timing import timed
+
+COLUMNS = ("ddd", "ff")
+Profile = collections.namedtuple("Profile", ["levels", "ddd", "ff"])
+Profile.__doc__ = """
+Observations of every level of a sheet: the ``levels`` (m) of the ddd / ff
+column pairs and float32 ``ddd`` and ``ff`` arrays of shape (observations,
+levels), NaN where a level was not reached.
+"""
+HEADER_SCAN_ROWS = 50  # rows searched for the ddd / ff header
+SUMMARY_LABELS = ("maksimum", "minimum", "modus", "rata-rata")
+MONTHS = (
+    "JANUARI",
+    "FEBRUARI",
+    "MARET",
+    "APRIL",
+    "MEI",
+    "JUNI",
+    "JULI",
+    "AGUSTUS",
+    "SEPTEMBER",
+    "OKTOBER",
+    "NOVEMBER",
+    "DESEMBER",
+)
+
+
+def _to_float32(values):
+    """Convert a list of cell values to float32, non numeric cells to NaN"""
+    try:
+        return np.array(values, dtype=np.float32)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(
+            dtype=np.float32
+        )
+
+
+def _label(value):
+    """Header / summary label of a cell, lowercase without spaces"""
+    if isinstance(value, str):
+        return value.replace(" ", "").lower()
+    return None
+
+
+def _find_header(rows):
+    """
+    Consume `rows` up to the ddd / ff header row and return the 0-based
+    column of ddd of every ddd / ff pair of the row (one per level), ff being
+    the next column, and the rows above the header.
+    """
+    above = []
+    for _, row in zip(range(HEADER_SCAN_ROWS), rows):
+        labels = [_label(value) for value in row]
+        cols = [
+            col
+            for col in range(len(labels) - 1)
+            if (labels[col], labels[col + 1]) == COLUMNS
+        ]
+        if cols:
+            return cols, above
+        above.append(row)
+    return [], above
+
+
+def _header_value(rows, label):
+    """Value of a ``LABEL : value`` line of the sheet header, e.g. TAHUN"""
+    for row in rows:
+        labels = [_label(value) for value in row]
+        if label in labels:
+            for value in row[labels.index(label) + 1 :]:
+                if value is not None and _label(value) != ":":
+                    return value
+    return None
+
+
+def _header_column(rows, label):
+    """0-based column of the `label` cell of the sheet header"""
+    for row in rows:
+        labels = [_label(value) for value in row]
+        if label in labels:
+            return labels.index(label)
+    return None
+
+
+def _digits(row, col):
+    """Number written as two one-digit cells at `col` and `col` + 1, e.g. 1 | 8"""
+    if col is None:
+        return None
+    tens, ones = (tuple(row[col : col + 2]) + (None, None))[:2]
+    if isinstance(tens, (int, float)) and isinstance(ones, (int, float)):
+        return int(tens) * 10 + int(ones)
+    return None
+
+
+def _level(value):
+    """Level of a ``3 0 0 0`` header cell, in meters (0 if unknown)"""
+    digits = re.sub(r"\s", "", str(value or ""))
+    return int(digits) if digits.isdigit() else 0
+
+
+def _sheet_tags(worksheet, rows):
+    """
+    Station, hour (UTC), month and first year of a sheet, from its header
+    rows: the station name on top, then the TAHUN, BULAN and J A M lines.
+    """
+    station = next(
+        (value.strip() for row in rows for value in row if _label(value)), None
+    )
+    hour = _header_value(rows, "jam")
+    if hasattr(hour, "hour"):
+        hour = hour.hour
+    else:
+        match = re.match(r"\d+", str("" if hour is None else hour).strip())
+        hour = int(match.group()) if match else -1
+    month = str(_header_value(rows, "bulan") or worksheet.title).strip().upper()
+    month = MONTHS.index(month) + 1 if month in MONTHS else 0
+    years = re.findall(r"\d{4}", str(_header_value(rows, "tahun") or ""))
+    return {
+        "station": station,
+        "hour": hour,
+        "month": month,
+        "first_year": int(years[0]) if years else 2000,
+    }
+
+
+def _no_header(worksheet):
+    raise ValueError(
+        f"sheet {worksheet.title!r} has no 'ddd' / 'ff' header in its first "
+        f"{HEADER_SCAN_ROWS} rows"
+    )
+
+
+def _scan_sheet(worksheet, nrows=None, tags=False, levels=True):
+    """
+    Read the ddd / ff pairs of one worksheet in a single row scan.
+
+    The header is located in the first `HEADER_SCAN_ROWS` rows, and the block
+    ends at the first summary row, the end of the sheet or after `nrows`
+    rows. Only the first level is read unless `levels`.
+
+    Returns
+    -------
+    heights : list of int
+        level (m) of each pair read
+    ddd, ff : 2D float32 arrays
+        (observations, levels)
+    sheet_tags : dict or None
+        with `tags`, `_sheet_tags` and the ``year`` and ``day`` arrays of the
+        rows, see `read_workbook`
+    """
+    rows = worksheet.iter_rows(values_only=True)
+    cols, above = _find_header(rows)
+    if not cols:
+        _no_header(worksheet)
+    if not levels:
+        cols = cols[:1]
+    labels = above[-1] if above else ()
+    heights = [_level(labels[col] if len(labels) > col else None) for col in cols]
+    width = cols[-1] + 2
+    sheet_tags = None
+    if tags:
+        sheet_tags = _sheet_tags(worksheet, above)
+        year_col = _header_column(above, "year")
+        day_col = _header_column(above, "day")
+        century = sheet_tags["first_year"] // 100 * 100
+        year = 0
+    block = []
+    years = []
+    days = []
+    end = 0  # trailing empty rows, e.g. formatted only, are dropped
+    for row in rows:
+        if nrows is not None and len(block) == nrows:
+            break
+        values = tuple(row[:width])
+        if any(_label(value) in SUMMARY_LABELS for value in values):
+            break
+        values += (None,) * (width - len(values))
+        block.append(values)
+        if tags:
+            # The two digits of the year start each year block, e.g. 1 | 8
+            yy = _digits(row, year_col)
+            if yy is not None:
+                year = century + yy
+                if year < sheet_tags["first_year"]:
+                    year += 100
+            years.append(year)
+            days.append(_digits(row, day_col) or 0)
+        if any(value is not None for value in values[cols[0] :]):
+            end = len(block)
+    block = block[:end]
+    ddd, ff = (
+        (
+            np.column_stack(
+                [_to_float32([values[col + k] for values in block]) for col in cols]
+            )
+            if block
+            else np.empty((0, len(cols)), dtype=np.float32)
+        )
+        for k in range(2)
+    )
+    if tags:
+        sheet_tags["year"] = np.array(years[:end], dtype=np.int16)
+        sheet_tags["day"] = np.array(days[:end], dtype=np.int8)
+    return heights, ddd, ff, sheet_tags
+
+
+@timed("parse_sheet")
+def _read_sheet(worksheet, nrows=None, tags=False, levels=False):
+    """
+    DataFrame of one worksheet, see `read_workbook`: one row per observation
+    of the first level, or per observation and level with `levels`, the
+    observations of each level following the ones of the level before.
+    """
+    heights, ddd, ff, sheet_tags = _scan_sheet(worksheet, nrows, tags, levels)
+    n, nlevels = ddd.shape
+    # level-major: the first level is a prefix of the frame
+    df = pd.DataFrame({"ddd": ddd.T.ravel(), "ff": ff.T.ravel()})
+    if tags:
+        df["station"] = pd.Categorical([sheet_tags["station"]] * len(df))
+        df["hour"] = np.int8(sheet_tags["hour"])
+        df["month"] = np.int8(sheet_tags["month"])
+    if tags or levels:
+        df["level"] = np.repeat(np.array(heights, dtype=np.int16), n)
+    if tags:
+        df["year"] = np.tile(sheet_tags["year"], nlevels)
+        df["day"] = np.tile(sheet_tags["day"], nlevels)
+    return df
+
+
+@timed("parse_levels")
+def _read_profile(worksheet):
+    """
+    Read the ddd / ff pairs of every level of one worksheet in a single row
+    scan, see `read_profiles`.
+    """
+    heights, ddd, ff, _ = _scan_sheet(worksheet)
+    return Profile(np.array(heights, dtype=np.int16), ddd, ff)
+
+
+def first_level(df):
+    """
+    Rows of the first level of a `read_workbook` DataFrame read with
+    ``levels=True``, the level of its first row. DataFrames without a
+    ``level`` column are returned as is.
+    """
+    if "level" not in df or len(df) == 0:
+        return df
+    level = df["level"].to_numpy()
+    # the levels follow one another: the first one is a prefix
+    return df.iloc[: int(np.argmax(level != level[0])) or len(df)]
+
+
+def _source(file):
+    """Path or bytes of `file`, reopened for each read"""
+    if isinstance(file, (bytes, bytearray)):
+        return bytes(file)
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    if hasattr(file, "read"):
+        file.seek(0)
+        return file.read()
+    return file
+
+
+def _open(source):
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def sheet_names(file):
+    """
+    Sheet names of a workbook, in workbook order, from ``xl/workbook.xml``
+    only: no cell data is read.
+    """
+    with zipfile.ZipFile(_open(_source(file))) as archive:
+        root = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    return [
+        element.get("name")
+        for element in root.iter()
+        if element.tag.rsplit("}", 1)[-1] == "sheet"
+    ]
+
+
+class LazyWorkbook(collections.abc.Mapping):
+    """
+    Read-only mapping of sheet name to the DataFrame of `read_workbook`, each
+    sheet being parsed on first access only and then kept.
+
+    The sheet names come from `sheet_names`, so listing the months of a
+    workbook reads no cell data, and showing one month parses one sheet.
+    Thread-safe, so a single view can be shared between sessions.
+
+    Parameters
+    ----------
+    file : str, path, bytes or file-like
+        the workbook. The content of a file-like object is copied.
+    nrows, tags, levels
+        see `read_workbook`
+    """
+
+    def __init__(self, file, nrows=None, tags=False, levels=False):
+        self._source = _source(file)
+        self._names = sheet_names(self._source)
+        self._nrows = nrows
+        self._tags = tags
+        self._levels = levels
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"LazyWorkbook({len(self._frames)}/{len(self)} sheets parsed)"
+
+    def __getitem__(self, sheet_name):
+        if sheet_name not in self._names:
+            raise KeyError(sheet_name)
+        with self._lock:
+            if sheet_name not in self._frames:
+                workbook = openpyxl.load_workbook(
+                    _open(self._source), read_only=True, data_only=True
+                )
+                try:
+                    self._frames[sheet_name] = _read_sheet(
+                        workbook[sheet_name], self._nrows, self._tags, self._levels
+                    )
+                finally:
+                    workbook.close()
+            return self._frames[sheet_name]
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __sizeof__(self):
+        size = object.__sizeof__(self)
+        if isinstance(self._source, bytes):
+            size += len(self._source)
+        return size + sum(
+            int(df.memory_usage(deep=True).sum()) for df in self._frames.values()
+        )
+
+
+def read_workbook(file, nrows=None, tags=False, levels=False):
+    """
+    Read the ddd / ff observations of every sheet of a pibal workbook.
+
+    The workbook is opened once in read-only mode and each sheet is streamed
+    row by row, instead of re-opening the file for every sheet. Only the rows
+    between the ddd / ff header and the first summary row (Maksimum, Minimum,
+    Modus, Rata-rata) are read, wherever they are.
+
+    Parameters
+    ----------
+    file : str, path, bytes or file-like
+        the workbook, e.g. a Streamlit UploadedFile
+    nrows : int, optional
+        maximum number of data rows to read below the header
+    tags : bool, default False
+        If True, every row is also tagged with the ``station``, ``hour``
+        (UTC), ``month`` and ``level`` (m) of the sheet header, and with its
+        ``year`` and ``day``, taken from the year digits starting each year
+        block and the day digits of the row. Unknown hours are -1, other
+        unknown tags 0.
+    levels : bool, default False
+        If True, the ddd / ff pair of every level is read, see
+        `read_profiles`, with one row per observation and level and a
+        ``level`` column. The rows of each level follow the ones of the level
+        before, see `first_level`. By default only the first level is read.
+
+    Returns
+    -------
+    dict
+        a DataFrame with float32 ``ddd`` and ``ff`` columns for each sheet, in
+        workbook order. Missing or non numeric cells are NaN.
+    """
+    if isinstance(file, (bytes, bytearray)):
+        file = io.BytesIO(file)
+    elif hasattr(file, "seek"):
+        file.seek(0)
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        return {
+            worksheet.title: _read_sheet(worksheet, nrows, tags, levels)
+            for worksheet in workbook.worksheets
+        }
+    finally:
+        workbook.close()
+
+
+def read_profiles(file, sheets=None):
+    """
+    Read the ddd / ff observations of every level of a pibal workbook.
+
+    The header row of a multi-level sheet has one ddd / ff pair per level,
+    e.g. G:H, I:J, K:L, with the level (``3 0 0 0``, ``5 0 0 0``, ...) on the
+    row above each ddd.
+
+    Parameters
+    ----------
+    file : str, path, bytes or file-like
+        the workbook
+    sheets : sequence of str, optional
+        the sheets to read, by default all of them
+
+    Returns
+    -------
+    dict
+        the `Profile` of each sheet, in workbook order
+    """
+    if isinstance(file, (bytes, bytearray)):
+        file = io.BytesIO(file)
+    elif hasattr(file, "seek"):
+        file.seek(0)
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        return {
+            worksheet.title: _read_profile(worksheet)
+            for worksheet in workbook.worksheets
+            if sheets is None or worksheet.title in sheets
+        }
+    finally:
+        workbook.close()
@@ -0,0 +1,242 @@
+"""Decoding of WMO FM 32 PILOT upper-wind bulletins.
+
+A PILOT report of a land station reads::
+
+    PPBB 58003 96749 90012 27010 28015 29020 90346 30025 31030 32035=
+
+``PPBB`` is the part (B: fixed altitudes up to 100 hPa, D: above), ``58003``
+gives the day (+ 50 when speeds are in knots), the hour (UTC) and the
+equipment, ``96749`` the WMO station index. Each ``9tnu1u2u3`` group then
+gives up to three altitudes, ``tn`` being their tens and ``u1u2u3`` their
+units, in 300 m (``1tnu1u2u3``: 500 m), and is followed by one ``ddfff``
+wind group per altitude: the direction to 5 degrees, the speed hundreds
+being added to it (``27615`` is 275 degrees, 115 knots).
+
+`decode` reads a bulletin archive line by line and yields `Wind` records,
+or `decode_chunks` column chunks, keeping one report in memory at a time.
+Everything outside of a PPBB / PPDD report (abbreviated headers, parts A and
+C reported by pressure, regional sections) is skipped. `convert` feeds one
+pass over an archive into both `pibal_store` and per station and level
+`windrose.WindroseTable` accumulators.
+"""
+
+import collections
+import sys
+
+import numpy as np
+
+import pibal_store
+from pibal_core import SPEED_BINS
+from windrose import histogram_by
+
+KNOTS_PER_MS = 3600 / 1852
+CHUNK_RECORDS = 2**16
+PARTS = {"PPBB", "PPDD"}
+# groups starting a report, of any part
+REPORT_STARTS = {"PPAA", "PPBB", "PPCC", "PPDD"}
+# groups ending the fixed altitude section of a report
+SECTION_ENDS = {"21212", "51515", "52525", "53535", "54545", "55555"}
+# altitude unit (m) of the first digit of an altitude group
+ALTITUDE_UNITS = {"9": 300, "1": 500}
+
+Wind = collections.namedtuple(
+    "Wind", ["station", "year", "month", "day", "hour", "level", "ddd", "ff"]
+)
+Wind.__doc__ = """
+Wind of a PILOT report at one altitude: ``level`` in m, ``ddd`` in degrees
+and ``ff`` in knots. ``year`` and ``month`` are not part of the report and
+are the ones given to `decode`.
+"""
+
+
+def _winds(report, levels, winds):
+    """
+    Append the altitude (m) and ``ddfff`` group value of every wind of a
+    report to `levels` and `winds`, and return the report ``(day, hour,
+    station, knots)`` and number of winds, or None for no wind.
+    """
+    if len(report) < 3 or report[0] not in PARTS:
+        return None
+    day_hour, station = report[1], report[2]
+    if len(day_hour) != 5 or not day_hour[:4].isdigit():
+        return None
+    day, hour = int(day_hour[:2]), int(day_hour[2:4])
+    knots = day > 50
+    if knots:
+        day -= 50
+    count = 0
+    k, n = 3, len(report)
+    while k < n:
+        group = report[k]
+        k += 1
+        if group in SECTION_ENDS:
+            break
+        unit = ALTITUDE_UNITS.get(group[:1])
+        if unit is None or len(group) != 5 or not group[1].isdigit():
+            continue
+        tens = int(group[1]) * 10
+        for units in group[2:]:
+            if not units.isdigit():
+                continue  # altitude not reported, nor its wind group
+            if k == n or report[k] in SECTION_ENDS:
+                k = n  # truncated report
+                break
+            wind = report[k]
+            k += 1
+            if len(wind) == 5 and wind.isdigit():
+                levels.append((tens + int(units)) * unit)
+                winds.append(int(wind))
+                count += 1
+    return ((day, hour, station, knots), count) if count else None
+
+
+def _reports(lines):
+    """Token list of each report of `lines`, ended by ``=``"""
+    report = []
+    for line in lines:
+        for token in line.split():
+            if token in REPORT_STARTS:
+                report = [token]
+                continue
+            end = token.endswith("=")
+            if end:
+                token = token[:-1]
+            if report and token:
+                report.append(token)
+            if end:
+                if report:
+                    yield report
+                report = []
+    if report:
+        yield report
+
+
+def decode(lines, year=0, month=0):
+    """
+    Yield the `Wind` of every altitude of every PILOT report of `lines`.
+
+    Parameters
+    ----------
+    lines : iterable of str
+        e.g. an archive file opened in text mode, read one line at a time
+    year, month : int, default 0 (unknown)
+        given to every record, reports only having the day and hour
+    """
+    for columns in decode_chunks(lines, year, month):
+        for record in zip(*(columns[name].tolist() for name in Wind._fields)):
+            yield Wind(*record)
+
+
+def decode_chunks(lines, year=0, month=0, size=CHUNK_RECORDS):
+    """
+    `decode` as chunks of about `size` records, each a dict of the
+    `pibal_store.COLUMNS` arrays, ``station`` holding the station indices.
+
+    Only the altitudes and raw wind groups are collected report by report,
+    the groups being decoded with numpy a chunk at a time.
+    """
+    reports, counts, levels, winds = [], [], [], []
+    for report in _reports(lines):
+        decoded = _winds(report, levels, winds)
+        if decoded is not None:
+            reports.append(decoded[0])
+            counts.append(decoded[1])
+            if len(winds) >= size:
+                yield _columns(reports, counts, levels, winds, year, month)
+                reports, counts, levels, winds = [], [], [], []
+    if winds:
+        yield _columns(reports, counts, levels, winds, year, month)
+
+
+def _columns(reports, counts, levels, winds, year, month):
+    day, hour, station, knots = (
+        np.repeat(np.array(column), counts) for column in zip(*reports)
+    )
+    # ddfff: direction to 5 degrees, plus the speed hundreds
+    direction, speed = np.divmod(np.array(winds, dtype=np.int32), 100)
+    hundreds = direction % 5
+    ff = (speed + 100 * hundreds).astype(np.float32)
+    ff[~knots] *= KNOTS_PER_MS
+    n = len(winds)
+    return {
+        "station": station,
+        "year": np.full(n, year, dtype=np.int16),
+        "month": np.full(n, month, dtype=np.int8),
+        "day": day.astype(np.int8),
+        "hour": hour.astype(np.int8),
+        "level": np.array(levels, dtype=np.int32),
+        "ddd": (direction - hundreds).astype(np.float32),
+        "ff": ff,
+    }
+
+
+def _update_tables(tables, columns, nsector, speed_bins):
+    """Add a chunk to the WindroseTable of each (station, level)"""
+    # right-closed speed bins, calms (ff == 0) not counted, as in pibal_core
+    bins = np.nextafter(np.asarray(speed_bins[:-1], dtype=float), np.inf)
+    stations, codes = np.unique(columns["station"], return_inverse=True)
+    levels = columns["level"].astype(np.int64)
+    chunk_tables = histogram_by(
+        np.mod(columns["ddd"], 360),
+        columns["ff"],
+        codes.reshape(-1) * 2**32 + levels,
+        bins,
+        nsector,
+        calm_limit=0,
+    )
+    for key, table in chunk_tables.items():
+        key = (str(stations[key >> 32]), int(key & (2**32 - 1)))
+        if key in tables:
+            tables[key].merge(table)
+        else:
+            tables[key] = table
+
+
+def convert(path, year=0, month=0, nsector=16, speed_bins=SPEED_BINS, directory=None):
+    """
+    Decode the bulletin archive `path` in one pass, storing its winds in
+    `pibal_store` and counting them by station and level.
+
+    Parameters
+    ----------
+    path : str or path
+        the archive, read line by line
+    year, month : int, default 0 (unknown)
+        see `decode`. `pibal_climatology.Climatology` leaves out the winds of
+        an unknown month.
+    nsector, speed_bins
+        see `pibal_core.frequency_counts`
+    directory : str, optional
+        the store, see `pibal_store.load`
+
+    Returns
+    -------
+    entry : str
+        the store entry of `path`
+    tables : dict
+        `windrose.WindroseTable` of each ``(station, level)``, with the
+        lower edges of right-closed `speed_bins` and calms counted apart
+    """
+    tables = {}
+
+    def chunks():
+        with open(path, encoding="ascii", errors="replace") as lines:
+            for columns in decode_chunks(lines, year, month):
+                _update_tables(tables, columns, nsector, speed_bins)
+                yield "PILOT", columns
+
+    entry = pibal_store.save_chunks(path, chunks(), directory)
+    if not tables:
+        # already stored: count the stored winds instead
+        meta, columns = pibal_store.load(path, directory)
+        stored = dict(columns)
+        stored["station"] = np.asarray(meta["stations"])[columns["station"]]
+        if meta["rows"]:
+            _update_tables(tables, stored, nsector, speed_bins)
+    return entry, tables
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        entry, tables = convert(path)
+        print(f"{path}: {sum(t.total for t in tables.values())} winds, {entry}")
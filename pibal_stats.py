@@ -0,0 +1,139 @@
+"""Resultant wind and steadiness statistics of pibal observations.
+
+Directions and speeds are converted once to u / v wind components and to
+unit direction vectors, and every statistic of every group (month, level,
+hour, ...) is then a sum over the group, computed with a single
+`numpy.bincount` per sum:
+
+``mean_speed``
+    scalar mean speed, calms included
+``resultant_speed``, ``resultant_direction``
+    speed and direction (where the wind blows from) of the mean u / v vector
+``steadiness``
+    ``resultant_speed / mean_speed``, 1 for a wind always from the same
+    direction, 0 for directions cancelling out
+``direction_std``
+    circular standard deviation of the directions, ``sqrt(-2 ln R)`` with
+    ``R`` the length of the mean unit direction vector, in degrees
+``modal_sector``
+    code of the most frequent sector, see `pibal_core.sector_codes`, -1
+    without wind
+
+Calms (``ff == 0``) have no direction: they count in ``count``, ``calm``
+and ``mean_speed`` only.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pibal_core import sector_codes
+
+STATISTICS = (
+    "count",
+    "calm",
+    "mean_speed",
+    "resultant_speed",
+    "resultant_direction",
+    "steadiness",
+    "direction_std",
+    "modal_sector",
+)
+
+
+def wind_statistics(ddd, ff, group=None, ngroups=1, nsector=16):
+    """
+    Wind statistics of each group of observations.
+
+    Parameters
+    ----------
+    ddd, ff : 1D arrays
+        directions (degrees) and speeds. Observations with a NaN or non
+        finite value are ignored.
+    group : 1D int array, optional
+        group code, in [0, ngroups), of each observation. By default all
+        observations are in one group.
+    ngroups : int, default 1
+    nsector : int, default 16
+        number of sectors of ``modal_sector``
+
+    Returns
+    -------
+    DataFrame
+        the `STATISTICS` of each group code, NaN for empty groups
+    """
+    ddd = np.asarray(ddd, dtype=float).ravel()
+    ff = np.asarray(ff, dtype=float).ravel()
+    if group is None:
+        group = np.zeros(len(ff), dtype=np.intp)
+    group = np.asarray(group, dtype=np.intp).ravel()
+    valid = np.isfinite(ddd) & np.isfinite(ff)
+    ddd, ff, group = ddd[valid], ff[valid], group[valid]
+
+    theta = np.deg2rad(ddd)
+    sin, cos = np.sin(theta), np.cos(theta)
+    moving = ff > 0
+
+    def sums(weights=None, mask=None):
+        g = group if mask is None else group[mask]
+        if weights is not None and mask is not None:
+            weights = weights[mask]
+        return np.bincount(g, weights=weights, minlength=ngroups)[:ngroups]
+
+    count = sums()
+    calm = count - sums(mask=moving)
+    # u / v components of the wind blowing from ddd
+    u = sums(-ff * sin)
+    v = sums(-ff * cos)
+    speed = sums(ff)
+    direction_length = np.hypot(sums(sin, moving), sums(cos, moving))
+
+    sectors = sector_codes(ddd[moving], nsector)
+    modes = np.bincount(
+        group[moving] * (nsector + 1) + sectors, minlength=ngroups * (nsector + 1)
+    )[: ngroups * (nsector + 1)].reshape(ngroups, nsector + 1)[:, :nsector]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_speed = speed / count
+        resultant_speed = np.hypot(u, v) / count
+        resultant_direction = np.mod(np.rad2deg(np.arctan2(-u, -v)), 360)
+        steadiness = resultant_speed / mean_speed
+        mean_length = np.clip(direction_length / (count - calm), 0, 1)
+        direction_std = np.rad2deg(np.sqrt(-2 * np.log(mean_length)))
+    resultant_direction[count == 0] = np.nan
+    return pd.DataFrame(
+        {
+            "count": count.astype(np.int64),
+            "calm": calm.astype(np.int64),
+            "mean_speed": mean_speed,
+            "resultant_speed": resultant_speed,
+            "resultant_direction": resultant_direction,
+            "steadiness": steadiness,
+            "direction_std": direction_std,
+            "modal_sector": np.where(modes.any(axis=1), modes.argmax(axis=1), -1),
+        }
+    )
+
+
+def statistics_by(df, by, nsector=16):
+    """
+    `wind_statistics` of the ``ddd`` and ``ff`` columns of `df` grouped by
+    the columns `by`, e.g. ``["month", "level", "hour"]`` of
+    `pibal_store.read_observations`, indexed by the groups in sorted order,
+    by a plain index for a single column.
+    """
+    single = isinstance(by, str)
+    by = [by] if single else list(by)
+    codes, keys = pd.MultiIndex.from_frame(df[by]).factorize(sort=True)
+    stats = wind_statistics(df["ddd"], df["ff"], codes, len(keys), nsector)
+    keys = pd.MultiIndex.from_tuples(keys, names=by)
+    stats.index = keys.get_level_values(0) if single else keys
+    return stats
+
+
+def profile_statistics(profile, nsector=16):
+    """`wind_statistics` of each level of a `pibal_io.Profile`, by level"""
+    nlevels = len(profile.levels)
+    level = np.broadcast_to(np.arange(nlevels), profile.ff.shape)
+    stats = wind_statistics(profile.ddd, profile.ff, level, nlevels, nsector)
+    stats.index = pd.Index(profile.levels, name="level")
+    return stats
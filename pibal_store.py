@@ -0,0 +1,277 @@
+"""Columnar on-disk store of parsed pibal workbooks.
+
+Parsing a workbook with openpyxl is by far the slowest step of every
+dashboard. `convert` parses a workbook once and stores its cleaned
+observations, one row per observation and level, as one ``.npy`` file per
+column, in a directory named after the SHA-256 content hash of the workbook::
+
+    <store>/v3/<sha256>/meta.json
+    <store>/v3/<sha256>/station.npy, year.npy, month.npy, day.npy, hour.npy,
+                        level.npy, ddd.npy, ff.npy
+
+Later loads of the same workbook, under any file name, memory-map the columns
+instead of reading the workbook again. Archives can be converted ahead of
+time with::
+
+    python pibal_store.py archive/*.xlsx
+
+The store is ``~/.cache/pibal`` unless ``PIBAL_STORE_DIR`` is set.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from pibal_cache import content_hash
+from pibal_core import clean
+from pibal_io import LazyWorkbook
+from pibal_io import read_workbook as read_xlsx
+from pibal_timing import timed
+
+STORE_DIR = os.environ.get(
+    "PIBAL_STORE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "pibal")
+)
+STORE_VERSION = 3
+
+# Stored columns and their dtype, in order. ``station`` is the index of the
+# station name in the ``stations`` list of meta.json.
+COLUMNS = {
+    "station": np.int16,
+    "year": np.int16,
+    "month": np.int8,
+    "day": np.int8,
+    "hour": np.int8,
+    "level": np.int32,
+    "ddd": np.float32,
+    "ff": np.float32,
+}
+
+
+def _entry(file, directory):
+    return os.path.join(directory or STORE_DIR, f"v{STORE_VERSION}", content_hash(file))
+
+
+def _is_complete(entry):
+    # meta.json is written last
+    return os.path.exists(os.path.join(entry, "meta.json"))
+
+
+def _source_name(file):
+    name = getattr(file, "name", file)
+    return os.path.basename(name) if isinstance(name, (str, os.PathLike)) else None
+
+
+def _frame_columns(df):
+    return {
+        name: df[name].astype(str).to_numpy() if name == "station" else df[name]
+        for name in COLUMNS
+    }
+
+
+def save(file, frames, directory=None):
+    """
+    Store the observations of `file` parsed by ``pibal_io.read_workbook(file,
+    tags=True)`` as `frames`, unless already stored. See `save_chunks`.
+
+    Returns
+    -------
+    str
+        the store entry of `file`
+    """
+    return save_chunks(
+        file,
+        ((sheet_name, _frame_columns(clean(df))) for sheet_name, df in frames.items()),
+        directory,
+    )
+
+
+def save_chunks(file, chunks, directory=None):
+    """
+    Store the observations of `file`, unless already stored, streaming them
+    chunk by chunk: the columns are appended to raw files and only get their
+    ``.npy`` header at the end, so memory use does not grow with `file`.
+
+    The entry is written to a temporary directory that is then renamed, so
+    concurrent conversions of the same workbook are safe.
+
+    Parameters
+    ----------
+    file : str, path, bytes or file-like
+        the source of the observations, giving the entry content hash
+    chunks : iterable
+        ``(sheet_name, columns)`` pairs, `columns` mapping every name of
+        `COLUMNS` to a 1D array, ``station`` holding station names. The
+        consecutive chunks of a sheet make up its rows.
+
+    Returns
+    -------
+    str
+        the store entry of `file`
+    """
+    entry = _entry(file, directory)
+    if _is_complete(entry):
+        return entry
+
+    os.makedirs(os.path.dirname(entry), exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(entry))
+    try:
+        raw = {name: open(os.path.join(tmp, f"{name}.raw"), "wb") for name in COLUMNS}
+        stations = {}  # station code of each name, by first appearance
+        sheets = {}
+        rows = 0
+        try:
+            for sheet_name, columns in chunks:
+                names = np.asarray(columns["station"])
+                if len(names) == 0:
+                    sheets.setdefault(sheet_name, [rows, rows])
+                    continue
+                unique, inverse = np.unique(names, return_inverse=True)
+                codes = np.array(
+                    [
+                        stations.setdefault(name, len(stations))
+                        for name in unique.tolist()
+                    ],
+                    dtype=COLUMNS["station"],
+                )
+                for name, dtype in COLUMNS.items():
+                    values = codes[inverse] if name == "station" else columns[name]
+                    raw[name].write(np.asarray(values, dtype=dtype).tobytes())
+                rows += len(names)
+                sheets.setdefault(sheet_name, [rows - len(names), rows])[1] = rows
+        finally:
+            for f in raw.values():
+                f.close()
+        for name, dtype in COLUMNS.items():
+            _finish_column(os.path.join(tmp, name), np.dtype(dtype), rows)
+        meta = {
+            "version": STORE_VERSION,
+            "source": _source_name(file),
+            "station": next(iter(stations), None),
+            "stations": list(stations),
+            "sheets": sheets,
+            "rows": rows,
+        }
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=1)
+        try:
+            os.rename(tmp, entry)
+        except OSError:
+            # converted meanwhile by another process
+            if not _is_complete(entry):
+                raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return entry
+
+
+def _finish_column(path, dtype, rows):
+    """Turn the raw ``<path>.raw`` column into ``<path>.npy``"""
+    with open(f"{path}.npy", "wb") as out, open(f"{path}.raw", "rb") as data:
+        np.lib.format.write_array_header_1_0(
+            out,
+            {
+                "descr": np.lib.format.dtype_to_descr(dtype),
+                "fortran_order": False,
+                "shape": (rows,),
+            },
+        )
+        shutil.copyfileobj(data, out)
+    os.remove(f"{path}.raw")
+
+
+def convert(file, directory=None):
+    """
+    Parse `file` and store its cleaned observations of every level, unless
+    already stored.
+
+    Returns
+    -------
+    str
+        the store entry of `file`
+    """
+    entry = _entry(file, directory)
+    if _is_complete(entry):
+        return entry
+    return save(file, read_xlsx(file, tags=True, levels=True), directory)
+
+
+def is_stored(file, directory=None):
+    """Whether the observations of `file` are in the store"""
+    return _is_complete(_entry(file, directory))
+
+
+@timed("store_load")
+def load(file, directory=None):
+    """
+    Stored observations of `file`, converted first if needed.
+
+    Returns
+    -------
+    meta : dict
+        ``source`` file name, ``stations`` (names of the ``station`` codes),
+        ``station`` (the first one), ``sheets`` (``[start, stop]`` rows of
+        each sheet, in workbook order) and number of ``rows``
+    columns : dict
+        read-only memory-mapped array of each column of `COLUMNS`
+    """
+    entry = convert(file, directory)
+    with open(os.path.join(entry, "meta.json")) as f:
+        meta = json.load(f)
+    columns = {
+        name: np.load(os.path.join(entry, f"{name}.npy"), mmap_mode="r")
+        for name in COLUMNS
+    }
+    return meta, columns
+
+
+def read_observations(file, directory=None):
+    """`load` as a DataFrame, with a categorical ``station`` column"""
+    meta, columns = load(file, directory)
+    df = pd.DataFrame(columns)
+    df["station"] = pd.Categorical.from_codes(columns["station"], meta["stations"])
+    return df
+
+
+def read_workbook(file, directory=None, levels=False):
+    """
+    Drop-in replacement of `pibal_io.read_workbook` served from the store:
+    a DataFrame with the ``ddd`` and ``ff`` columns of each sheet, in
+    workbook order, of the first level or, with `levels`, of every level
+    with a ``level`` column. Only the observations with both values are
+    stored.
+    """
+    meta, columns = load(file, directory)
+    names = ["ddd", "ff", "level"] if levels else ["ddd", "ff"]
+    frames = {}
+    for sheet_name, (start, stop) in meta["sheets"].items():
+        if not levels:
+            # the first level is a prefix of each sheet, see `pibal_io.first_level`
+            level = columns["level"][start:stop]
+            if len(level):
+                stop = start + (int(np.argmax(level != level[0])) or len(level))
+        frames[sheet_name] = pd.DataFrame(
+            {name: columns[name][start:stop] for name in names}
+        )
+    return frames
+
+
+def open_workbook(file, directory=None):
+    """
+    The ddd / ff DataFrame of each sheet of `file`: `read_workbook` when the
+    workbook is already stored, else a `pibal_io.LazyWorkbook` parsing each
+    sheet on first access only.
+    """
+    if is_stored(file, directory):
+        return read_workbook(file, directory)
+    return LazyWorkbook(file)
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        meta, _ = load(path)
+        print(f"{path}: {meta['rows']} observations, {meta['station']}")
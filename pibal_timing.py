@@ -0,0 +1,268 @@
+"""Timing spans of the dashboard stages.
+
+A dashboard script run is wrapped in `run`, and its stages in `span`::
+
+    with pibal_timing.run("create_windrose", memory=True) as timings:
+        with span("figure"):
+            fig = create_windrose_figure(uploaded_file, bulan)
+
+Spans nest, and the library stages (sheet parse, cleaning, histogram, figure
+build, store load) open their own spans, so a run records where its wall
+time went. Outside of a run `span` only looks up a context variable. With
+`memory`, the peak of the Python allocations of each span (numpy arrays
+included) is traced with `tracemalloc`, which slows allocations down. The
+peak is process-wide: allocations of concurrent sessions and threads count.
+
+Each run is appended as one JSON line to ``~/.cache/pibal/timing.jsonl``,
+or ``$PIBAL_TIMING_LOG``, and the log of all sessions is summarised with::
+
+    python pibal_timing.py [timing.jsonl]
+"""
+
+import collections
+import contextlib
+import contextvars
+import datetime
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+LOG_FILE = os.environ.get(
+    "PIBAL_TIMING_LOG",
+    os.path.join(os.path.expanduser("~"), ".cache", "pibal", "timing.jsonl"),
+)
+LOG_MAX_BYTES = 10 * 2**20
+LOG_BACKUPS = 5
+
+_run = contextvars.ContextVar("pibal_timing_run", default=None)
+_tracing = 0  # runs tracing memory
+_tracing_started = False  # tracemalloc started by them
+_tracing_lock = threading.Lock()
+_logger = None
+
+
+class Timings:
+    """
+    Spans of one run, in the order they started.
+
+    Each span is a dict with its ``name``, nesting ``depth``, wall time in
+    ``seconds`` and, when tracing memory, ``peak_bytes`` allocated above the
+    memory in use when it started.
+    """
+
+    def __init__(self, app, memory=False, session=None):
+        self.app = app
+        self.memory = memory
+        self.session = session
+        self.started = datetime.datetime.now().astimezone()
+        self.seconds = None
+        self.spans = []
+        self._stack = []
+
+    def __repr__(self):
+        return f"Timings({self.app!r}, {len(self.spans)} spans)"
+
+    def record(self):
+        """The run as a JSON-serialisable dict, as logged"""
+        return {
+            "time": self.started.isoformat(timespec="seconds"),
+            "app": self.app,
+            "session": self.session,
+            "seconds": self.seconds,
+            "spans": self.spans,
+        }
+
+
+@contextlib.contextmanager
+def span(name):
+    """Time the enclosed block as a stage of the current run, if any"""
+    timings = _run.get()
+    if timings is None:
+        yield
+        return
+    record = {"name": name, "depth": len(timings._stack)}
+    timings.spans.append(record)
+    if timings.memory:
+        current, peak = tracemalloc.get_traced_memory()
+        if timings._stack:
+            # tracemalloc has a single peak: keep the parent's so far
+            parent = timings._stack[-1]
+            parent["peak"] = max(parent["peak"], peak)
+        tracemalloc.reset_peak()
+        frame = {"start": current, "peak": current}
+    else:
+        frame = {}
+    timings._stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record["seconds"] = time.perf_counter() - start
+        timings._stack.pop()
+        if timings.memory:
+            peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+            record["peak_bytes"] = peak - frame["start"]
+            if timings._stack:
+                parent = timings._stack[-1]
+                parent["peak"] = max(parent["peak"], peak)
+
+
+def timed(name):
+    """Decorator timing every call of a function as a `span`"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _session_id():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+
+def _get_logger():
+    global _logger
+    if _logger is None:
+        logger = logging.getLogger("pibal.timing")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        try:
+            os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS
+            )
+        except OSError:
+            handler = logging.NullHandler()
+        logger.addHandler(handler)
+        _logger = logger
+    return _logger
+
+
+def _start_tracing():
+    global _tracing, _tracing_started
+    with _tracing_lock:
+        if _tracing == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing += 1
+
+
+def _stop_tracing():
+    global _tracing, _tracing_started
+    with _tracing_lock:
+        _tracing -= 1
+        if _tracing == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+@contextlib.contextmanager
+def run(app, memory=False):
+    """
+    Record the spans of the enclosed block, one script run of `app`, and log
+    them when it ends.
+
+    Yields
+    ------
+    Timings
+    """
+    timings = Timings(app, memory, _session_id())
+    if memory:
+        _start_tracing()
+    token = _run.set(timings)
+    try:
+        with span(app):
+            yield timings
+    finally:
+        _run.reset(token)
+        if memory:
+            _stop_tracing()
+        timings.seconds = timings.spans[0]["seconds"]
+        _get_logger().info(json.dumps(timings.record()))
+
+
+def panel_enabled(label="Show timings"):
+    """Sidebar checkbox switching the timing panel (and memory tracing) on"""
+    import streamlit as st
+
+    return st.sidebar.checkbox(label, key="pibal_timing_panel")
+
+
+def show_panel(timings):
+    """Sidebar table of the spans of the run `timings`"""
+    import pandas as pd
+    import streamlit as st
+
+    st.sidebar.subheader("Timings")
+    st.sidebar.caption(f"Last run: {timings.seconds * 1e3:.0f} ms")
+    table = pd.DataFrame(
+        {
+            "stage": [
+                " " * record["depth"] + record["name"] for record in timings.spans
+            ],
+            "ms": [record["seconds"] * 1e3 for record in timings.spans],
+            "peak MB": [
+                record.get("peak_bytes", np.nan) / 2**20 for record in timings.spans
+            ],
+        }
+    )
+    st.sidebar.dataframe(table.round(1), hide_index=True)
+
+
+def summarise(lines):
+    """
+    Wall time statistics of each app and span over the logged runs `lines`.
+
+    Returns
+    -------
+    dict
+        ``(app, span): (count, median, p95, max)`` seconds
+    """
+    seconds = collections.defaultdict(list)
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        for item in record.get("spans", ()):
+            seconds[record["app"], item["name"]].append(item["seconds"])
+    return {
+        key: (
+            len(values),
+            float(np.median(values)),
+            float(np.percentile(values, 95)),
+            max(values),
+        )
+        for key, values in seconds.items()
+    }
+
+
+if __name__ == "__main__":
+    lines = []
+    for path in sys.argv[1:] or [LOG_FILE]:
+        with open(path) as f:
+            lines.extend(f)
+    print(f"{'app':<18} {'span':<20} {'count':>6} {'median':>9} {'p95':>9} {'max':>9}")
+    for (app, name), (count, median, p95, slowest) in sorted(summarise(lines).items()):
+        print(
+            f"{app:<18} {name:<20} {count:>6} {median * 1e3:>7.1f}ms "
+            f"{p95 * 1e3:>7.1f}ms {slowest * 1e3:>7.1f}ms"
+        )
@@ -1,60 +1,70 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
-import plotly.express as px
-
-def convert_to_wind_direction(degrees):
-    directions = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE', 'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW', 'N']
-    index = np.round((degrees % 360) / 22.5).astype(int)
-    return np.array(directions)[index]
-
-def calculate_wind_frequency(file_path):
-    # Membaca file Excel dengan multiple sheets
-    xls = pd.ExcelFile(file_path)
-
-    # Membuat dictionary untuk menyimpan DataFrame setiap sheet
-    data_frames = {}
-    data_frames_dropna = {}
-
-    # Loop melalui setiap sheet
-    for sheet_name in xls.sheet_names:
-        # Membaca data di range kolom G11:I165
-        df = pd.read_excel(file_path, sheet_name=sheet_name, usecols="G:H", skiprows=9, nrows=155)
-        
-        # Menghapus nilai NaN dan non-finite
-        df_cleaned = df.dropna().replace([np.inf, -np.inf], np.nan)
-        
-        # Mengubah nilai ddd menjadi mata angin
-        df_cleaned['wind_direction'] = convert_to_wind_direction(df_cleaned['ddd'])
-        
-        data_frames[sheet_name] = df
-        data_frames_dropna[sheet_name] = df_cleaned
+from plotly.colors import sequential
+
+from pibal_cache import cached
+from pibal_core import clean, direction_labels, frequency_table, speed_labels
+from pibal_figures import barpolar_figure
+from pibal_ingest import follow, ingest
+from pibal_io import first_level
+import pibal_timing
+from pibal_timing import span
+
+NSECTOR = 16
+
+# Workbook di-parsing per sheet di thread latar (pibal_ingest), seperti di
+# create_windrose, dan observasinya disimpan di disk (pibal_store) setelah
+# semua sheet selesai, sehingga upload ulang file yang sama tidak perlu
+# mem-parsing Excel lagi. Tabel frekuensi dan figure di-cache berdasarkan
+# hash isi file, sehingga rerun Streamlit (mis. ganti bulan) tidak membaca
+# ulang workbook.
+
+@cached
+def calculate_wind_frequency(file_path, bulan, nsector=NSECTOR):
+    # ddd/ff ketinggian pertama bulan ini dari thread latar, atau di-parsing
+    # langsung bila thread belum sampai ke sheet ini
+    df = first_level(ingest(file_path).frame(bulan))
+
+    # Menghapus nilai NaN dan non-finite
+    df_cleaned = clean(df)
+
+    # Menghitung range kecepatan angin secara dinamis
+    min_speed = df_cleaned['ff'].min()
+    max_speed = df_cleaned['ff'].max()
+    speed_bins = np.linspace(min_speed, max_speed, num=6)
 
     # Menghitung frekuensi mata angin berdasarkan kecepatan angin
-    frequency_tables = {}
-    for sheet_name, df_cleaned in data_frames_dropna.items():
-        # Menghitung range kecepatan angin secara dinamis
-        min_speed = df_cleaned['ff'].min()
-        max_speed = df_cleaned['ff'].max()
-        speed_bins = np.linspace(min_speed, max_speed, num=6)
-        speed_labels = [f'{speed_bins[i]:.1f}-{speed_bins[i+1]:.1f}' for i in range(len(speed_bins)-1)]
-        
-        frequency_table = df_cleaned.groupby(['wind_direction', pd.cut(df_cleaned['ff'], bins=speed_bins, labels=speed_labels)]).size().reset_index(name='frequency')
-        frequency_tables[sheet_name] = frequency_table
-
-    return frequency_tables
+    return speed_bins, frequency_table(df_cleaned, nsector, speed_bins)
+
+@cached
+def create_windrose_figure(file_path, bulan, nsector=NSECTOR):
+    # Figure di-cache per (hash file, bulan, binning)
+    speed_bins, table = calculate_wind_frequency(file_path, bulan, nsector)
+    return barpolar_figure(table, direction_labels(nsector), speed_labels(speed_bins),
+                           colors=sequential.Plasma_r)
 
 # Menggunakan Streamlit untuk menampilkan grafik polar
-st.title("Grafik Polar Frekuensi Mata Angin")
-file_path = st.file_uploader("Upload file Excel", type=["xlsx"])
-
-if file_path is not None:
-    tables = calculate_wind_frequency(file_path)
-    bulan = st.selectbox("Pilih Bulan", list(tables.keys()))
-
-    if bulan:
-        table = tables[bulan]
-        fig = px.bar_polar(table, r="frequency", theta="wind_direction",
-                           color="ff",
-                           color_discrete_sequence=px.colors.sequential.Plasma_r)
-        st.plotly_chart(fig)
+# Waktu (dan memori) tiap tahap dicatat ke log; panel di sidebar opsional
+show_timings = pibal_timing.panel_enabled("Tampilkan waktu proses")
+with pibal_timing.run("pibalstat", memory=show_timings) as timings:
+    st.title("Grafik Polar Frekuensi Mata Angin")
+    file_path = st.file_uploader("Upload file Excel", type=["xlsx"])
+
+    if file_path is not None:
+        # Mulai (atau lanjutkan) parsing di thread latar; parsing file
+        # sebelumnya dihentikan bila pengguna meng-upload file lain, kecuali
+        # masih diikuti sesi lain yang membuka workbook yang sama
+        with span("ingest"):
+            job = follow(ingest(file_path), st.session_state.get("ingestion"))
+        st.session_state["ingestion"] = job
+
+        # Daftar bulan diambil dari nama sheet, tanpa membaca data
+        bulan = st.selectbox("Pilih Bulan", job.sheet_names)
+
+        if bulan:
+            with span("figure"):
+                fig = create_windrose_figure(file_path, bulan)
+            with span("plotly_chart"):
+                st.plotly_chart(fig)
+if show_timings:
+    pibal_timing.show_panel(timings)
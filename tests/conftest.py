@@ -0,0 +1,51 @@
+import os
+import sys
+
+# the modules live at the root of the repository, like for the benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import openpyxl  # noqa: E402
+import pytest  # noqa: E402
+
+# (year digits, day digits, ddd / ff of 3000 m, ddd / ff of 5000 m) of each
+# row of the `workbook` JANUARI sheet: 2019 starts on the third row
+ROWS = [
+    ((1, 9), (0, 1), (90, 5), (100, 12)),
+    ((None, None), (0, 2), (None, None), (None, None)),
+    ((2, 0), (0, 1), (360, 0), ("x", 7)),
+    ((None, None), (1, 5), (270, 25), (None, None)),
+]
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    """
+    Two-level workbook in the BMKG layout: a JANUARI sheet with a summary
+    row below the data, and a cover sheet without a ddd / ff header.
+    """
+    book = openpyxl.Workbook()
+    cover = book.active
+    cover.title = "Cover"
+    cover["A1"] = "Data angin atas"
+    sheet = book.create_sheet("JANUARI")
+    sheet["A1"] = "STASIUN METEOROLOGI UJI"
+    for row, (label, value) in enumerate(
+        [("TAHUN", "2019-2020"), ("BULAN", "JANUARI"), ("J A M", "06.00")], start=5
+    ):
+        sheet.cell(row, 2, label)
+        sheet.cell(row, 6, ":")
+        sheet.cell(row, 7, value)
+    for col, label in [(1, "Year"), (4, "D a y"), (7, "3 0 0 0"), (9, "5 0 0 0")]:
+        sheet.cell(9, col, label)
+    for col, label in enumerate(["ddd", "ff", "ddd", "ff"], start=7):
+        sheet.cell(10, col, label)
+    for row, (year, day, low, high) in enumerate(ROWS, start=11):
+        for col, value in enumerate(year + (None,) + day, start=1):
+            sheet.cell(row, col, value)
+        for col, value in enumerate(low + high, start=7):
+            sheet.cell(row, col, value)
+    sheet.cell(11 + len(ROWS), 7, "Rata-rata")
+    sheet.cell(11 + len(ROWS), 8, 99)
+    path = tmp_path / "pibal.xlsx"
+    book.save(path)
+    return path
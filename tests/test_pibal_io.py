@@ -0,0 +1,43 @@
+"""Header detection and reading of pibal workbooks"""
+
+import numpy as np
+import pytest
+
+from pibal_io import LazyWorkbook, first_level, read_profiles, read_workbook
+
+
+def test_read_first_level(workbook):
+    with pytest.raises(ValueError, match="Cover"):
+        read_workbook(workbook)
+    df = LazyWorkbook(workbook)["JANUARI"]
+    np.testing.assert_array_equal(df["ddd"], [90, np.nan, 360, 270])
+    np.testing.assert_array_equal(df["ff"], [5, np.nan, 0, 25])
+    assert df["ddd"].dtype == np.float32
+    np.testing.assert_array_equal(
+        LazyWorkbook(workbook, nrows=3)["JANUARI"]["ff"], [5, np.nan, 0]
+    )
+    # the empty row ending the block is not an observation
+    assert len(LazyWorkbook(workbook, nrows=2)["JANUARI"]) == 1
+
+
+def test_read_tags(workbook):
+    df = LazyWorkbook(workbook, tags=True)["JANUARI"]
+    assert set(df["station"]) == {"STASIUN METEOROLOGI UJI"}
+    assert set(df["hour"]) == {6} and set(df["month"]) == {1}
+    assert list(df["level"]) == [3000] * 4
+    assert list(df["year"]) == [2019, 2019, 2020, 2020]
+    assert list(df["day"]) == [1, 2, 1, 15]
+
+
+def test_read_levels(workbook):
+    df = LazyWorkbook(workbook, tags=True, levels=True)["JANUARI"]
+    # level-major: the 4 rows of 3000 m, then the 4 rows of 5000 m
+    assert list(df["level"]) == [3000] * 4 + [5000] * 4
+    np.testing.assert_array_equal(df["ddd"][4:], [100, np.nan, np.nan, np.nan])
+    np.testing.assert_array_equal(df["ff"][4:], [12, np.nan, 7, np.nan])
+    assert list(df["year"]) == [2019, 2019, 2020, 2020] * 2
+    assert first_level(df).equals(df.iloc[:4])
+
+    profile = read_profiles(workbook, ["JANUARI"])["JANUARI"]
+    assert list(profile.levels) == [3000, 5000]
+    np.testing.assert_array_equal(profile.ff, df["ff"].to_numpy().reshape(2, 4).T)
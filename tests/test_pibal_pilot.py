@@ -0,0 +1,48 @@
+"""Decoding of PILOT reports against hand-decoded values"""
+
+import pytest
+
+from pibal_pilot import KNOTS_PER_MS, Wind, decode
+
+ARCHIVE = """\
+ZCZC 123
+PPAA 58001 96749 70999 10000 27010=
+PPBB 58003 96749 90012 27010 28015
+     29020 90346 30025 31030 32035=
+PPDD 08001 96581 91/23 27615 ///// 90//4 05005 21212 00100 18010=
+NNNN
+"""
+
+
+def test_decode_report():
+    winds = list(decode(ARCHIVE.splitlines(), year=2023, month=7))
+    # PPBB of 96749, day 08 (58 - 50: knots), 00 UTC, heights in 300 m
+    assert winds[:6] == [
+        Wind("96749", 2023, 7, 8, 0, level, ddd, ff)
+        for level, ddd, ff in [
+            (0, 270, 10),
+            (300, 280, 15),
+            (600, 290, 20),
+            (900, 300, 25),
+            (1200, 310, 30),
+            (1800, 320, 35),
+        ]
+    ]
+
+
+def test_decode_speed_hundreds_units_and_missing_groups():
+    winds = list(decode(ARCHIVE.splitlines()))[6:]
+    # PPDD of 96581, day 08 in m/s. 91/23: tens 1, no first altitude, then
+    # (10 + 2) and (10 + 3) x 300 m, the wind of the second one missing
+    # (/////). 90//4: 4 x 300 m only. The 21212 section is not part of the
+    # fixed altitudes.
+    assert [(w.station, w.day, w.hour, w.level) for w in winds] == [
+        ("96581", 8, 0, 3600),
+        ("96581", 8, 0, 1200),
+    ]
+    # 27615: 275 degrees, 115 (m/s, stored in knots), then 05005: 50 degrees, 5
+    assert winds[0].ddd == 275
+    assert winds[0].ff == pytest.approx(115 * KNOTS_PER_MS, rel=1e-6)
+    assert winds[1].ddd == 50
+    assert winds[1].ff == pytest.approx(5 * KNOTS_PER_MS, rel=1e-6)
+    assert winds[1].year == winds[1].month == 0
@@ -0,0 +1,55 @@
+"""Round trip of parsed workbooks through the columnar store"""
+
+import numpy as np
+
+import pibal_store
+from pibal_core import clean
+from pibal_io import LazyWorkbook
+
+
+def test_save_load_round_trip(workbook, tmp_path):
+    directory = tmp_path / "store"
+    frames = {"JANUARI": LazyWorkbook(workbook, tags=True, levels=True)["JANUARI"]}
+    assert not pibal_store.is_stored(workbook, directory)
+    entry = pibal_store.save(workbook, frames, directory)
+    assert pibal_store.is_stored(workbook, directory)
+    assert pibal_store.save(workbook, {}, directory) == entry
+
+    meta, columns = pibal_store.load(workbook, directory)
+    # the 5000 m pairs missing ddd are dropped
+    expected = clean(frames["JANUARI"])
+    assert meta["rows"] == len(expected) == 4
+    assert meta["sheets"] == {"JANUARI": [0, 4]}
+    assert meta["stations"] == ["STASIUN METEOROLOGI UJI"]
+    assert meta["source"] == "pibal.xlsx"
+    for name, dtype in pibal_store.COLUMNS.items():
+        assert columns[name].dtype == dtype
+        if name != "station":
+            np.testing.assert_array_equal(columns[name], expected[name])
+
+    df = pibal_store.read_observations(workbook, directory)
+    assert list(df["station"]) == ["STASIUN METEOROLOGI UJI"] * 4
+    first = pibal_store.read_workbook(workbook, directory)["JANUARI"]
+    np.testing.assert_array_equal(first["ff"], [5, 0, 25])
+    levels = pibal_store.read_workbook(workbook, directory, levels=True)["JANUARI"]
+    assert list(levels["level"]) == [3000, 3000, 3000, 5000]
+
+
+def test_save_chunks_streams_sheets(tmp_path):
+    directory = tmp_path / "store"
+    source = tmp_path / "archive.txt"
+    source.write_text("archive")
+    chunk = {
+        name: np.arange(3, dtype=dtype) for name, dtype in pibal_store.COLUMNS.items()
+    }
+    chunk["station"] = np.array(["B", "A", "B"])
+    empty = {name: values[:0] for name, values in chunk.items()}
+    pibal_store.save_chunks(
+        source, [("one", chunk), ("one", chunk), ("two", empty)], directory
+    )
+    meta, columns = pibal_store.load(source, directory)
+    assert meta["sheets"] == {"one": [0, 6], "two": [6, 6]}
+    assert sorted(meta["stations"]) == ["A", "B"]
+    names = np.asarray(meta["stations"])[columns["station"]]
+    assert list(names) == ["B", "A", "B"] * 2
+    np.testing.assert_array_equal(columns["ff"], [0, 1, 2, 0, 1, 2])
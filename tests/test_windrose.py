@@ -0,0 +1,125 @@
+"""Histogram and Weibull engines of windrose against their references"""
+
+import numpy as np
+import pytest
+
+import windrose
+from windrose import WindroseTable, histogram, histogram_by, weibull_fit
+
+
+def histogram2d_table(direction, var, bins, nsector, normed=False, blowto=False):
+    """The windrose 1.9.0 histogram, with numpy.histogram2d"""
+    angle = 360.0 / nsector
+    dir_bins = np.arange(-angle / 2, 360.0 + angle, angle, dtype=float)
+    dir_bins[0] = 0.0
+    var_bins = list(bins) + [np.inf]
+    if blowto:
+        direction = direction + 180.0
+        direction[direction >= 360.0] = direction[direction >= 360.0] - 360
+    table = np.histogram2d(x=var, y=direction, bins=[var_bins, dir_bins])[0]
+    table[:, 0] = table[:, 0] + table[:, -1]
+    table = table[:, :-1]
+    if normed:
+        table = table * 100 / len(var)
+    return table
+
+
+@pytest.fixture
+def winds():
+    rng = np.random.default_rng(0)
+    n = 20000
+    direction = rng.uniform(0, 360, n)
+    var = rng.weibull(2.0, n) * 8
+    # samples on the sector and bin edges, where rounding matters
+    direction[:8] = [0, 11.25, 348.75, 359.999, 22.5, 45, 180, 360 - 1e-9]
+    var[:8] = [0, 1, 2, 4, 6, 8, 10, 12]
+    return direction, var
+
+
+@pytest.mark.parametrize("nsector", [4, 8, 16, 36])
+@pytest.mark.parametrize("blowto", [False, True])
+def test_histogram_matches_histogram2d(winds, nsector, blowto):
+    direction, var = winds
+    bins = np.array([0, 2, 4, 6, 8, 10])
+    expected = histogram2d_table(direction.copy(), var, bins, nsector, blowto=blowto)
+    dir_edges, var_bins, table = histogram(direction, var, bins, nsector, blowto=blowto)
+    np.testing.assert_array_equal(table, expected)
+    assert len(dir_edges) == nsector
+    assert var_bins == bins.tolist() + [np.inf]
+
+
+def test_histogram_normed(winds):
+    direction, var = winds
+    bins = np.array([0, 2, 4, 6, 8, 10])
+    table = histogram(direction, var, bins, 16, normed=True, total=len(var))[2]
+    np.testing.assert_allclose(
+        table, histogram2d_table(direction.copy(), var, bins, 16, normed=True)
+    )
+    with pytest.raises(ValueError):
+        histogram(direction, var, bins, 16, normed=True)
+    empty = histogram(np.array([]), np.array([]), bins, 16, normed=True)[2]
+    assert not empty.any()
+
+
+def test_table_chunks_and_merge_match_histogram(winds):
+    direction, var = winds
+    bins = np.array([0, 2, 4, 6, 8, 10])
+    expected = histogram(direction, var, bins, 16)[2]
+    chunked = WindroseTable(bins, 16)
+    for start in range(0, len(var), 3000):
+        chunked.update(direction[start : start + 3000], var[start : start + 3000])
+    halves = [
+        WindroseTable(bins, 16).update(direction[part], var[part])
+        for part in (slice(None, 5000), slice(5000, None))
+    ]
+    merged = halves[0].merge(halves[1])
+    for table in (chunked, merged):
+        np.testing.assert_array_equal(table.table, expected)
+        assert table.total == len(var)
+    with pytest.raises(ValueError):
+        merged.merge(WindroseTable(bins, 8))
+
+
+def test_histogram_by_matches_histogram_of_each_group(winds):
+    direction, var = winds
+    bins = np.array([0, 2, 4, 6, 8, 10])
+    by = np.arange(len(var)) % 5
+    tables = histogram_by(direction, var, by, bins, 16, calm_limit=0)
+    assert list(tables) == [0, 1, 2, 3, 4]
+    for key, table in tables.items():
+        group = by == key
+        moving = group & (var > 0)
+        expected = histogram(direction[moving], var[moving], bins, 16)[2]
+        np.testing.assert_array_equal(table.table, expected)
+        assert table.total == group.sum()
+        assert table.calm_count == (group & (var <= 0)).sum()
+
+
+def test_sector_codes_match_histogram(winds):
+    direction, var = winds
+    codes = windrose.sector_codes(direction, 16)
+    counts = np.bincount(codes, minlength=16)
+    np.testing.assert_array_equal(counts, histogram(direction, var, [0], 16)[2][0])
+
+
+def test_weibull_fit_matches_scipy():
+    stats = pytest.importorskip("scipy.stats")
+    rng = np.random.default_rng(1)
+    samples = [
+        rng.weibull(shape, size) * scale
+        for shape, scale, size in [(1.2, 3.0, 50), (2.0, 8.0, 400), (3.5, 15.0, 2000)]
+    ]
+    var = np.concatenate(samples + [[0.0, 0.0, np.nan]])
+    group = np.concatenate(
+        [np.full(len(s), k) for k, s in enumerate(samples)] + [[0, 1, 2]]
+    )
+    shape, scale = weibull_fit(var, group, len(samples))
+    for k, s in enumerate(samples):
+        _, expected_shape, _, expected_scale = stats.exponweib.fit(s, floc=0, f0=1)
+        assert shape[k] == pytest.approx(expected_shape, rel=1e-4)
+        assert scale[k] == pytest.approx(expected_scale, rel=1e-4)
+
+
+def test_weibull_fit_degenerate_groups():
+    shape, scale = weibull_fit([5.0, 0.0, 3.0, 3.0], [0, 1, 2, 2], 4)
+    assert np.isnan(shape).all() and np.isnan(scale).all()
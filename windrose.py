@@ -1,889 +1,670 @@
-"""Windrose for matplotlib"""
+"""Windrose for matplotlib
 
-import locale
-import random
+The histogram and cleaning functions only need numpy. The matplotlib axes and
+plotting functions (`WindroseAxes`, `wrbar`, `plot_windrose`, ...) live in
+`windrose_plot` and are imported from there on first access, so that batch
+jobs binning winds do not pay for the matplotlib import.
+"""
+
+import functools
 
-import matplotlib as mpl
-import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib.projections.polar import PolarAxes
-from numpy.lib.twodim_base import histogram2d
 
-ZBASE = -1000  # The starting zorder for all drawing, negative to have the grid on
 VAR_DEFAULT = "speed"
 DIR_DEFAULT = "direction"
-FIGSIZE_DEFAULT = (8, 8)
-DPI_DEFAULT = 80
-DEFAULT_THETA_LABELS = ["E", "N-E", "N", "N-W", "W", "S-W", "S", "S-E"]
-
-
-def _copy_docstring(source):
+HISTOGRAM_CHUNK = 1 << 18  # samples binned per pass by `histogram`
+WEIBULL_SAMPLES = 10000  # synthetic samples per unit of frequency
+
+# names of windrose_plot, imported on first access by `__getattr__`
+_PLOTTING = frozenset(
+    [
+        "DEFAULT_THETA_LABELS",
+        "DPI_DEFAULT",
+        "D_KIND_PLOT",
+        "FIGSIZE_DEFAULT",
+        "WEIBULL_RTOL",
+        "WindAxes",
+        "WindAxesFactory",
+        "WindroseAxes",
+        "ZBASE",
+        "plot_windrose",
+        "plot_windrose_df",
+        "plot_windrose_np",
+        "wrbar",
+        "wrbox",
+        "wrcontour",
+        "wrcontourf",
+        "wrpdf",
+        "wrscatter",
+    ]
+)
+
+
+def __getattr__(name):
+    if name in _PLOTTING:
+        import windrose_plot
+
+        value = getattr(windrose_plot, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _PLOTTING)
+
+
+@functools.lru_cache(maxsize=None)
+def _direction_bins(nsector):
     """
+    Sector edges of the windrose table, as used by `histogram`.
 
-    Copy the docstring from another function.
-    Implemented according to: https://github.com/matplotlib/matplotlib/blob/b5ac96a8980fdb9e59c9fb649e0714d776e26701/lib/matplotlib/_docstring.py#L86-L92
-
-    """  # noqa: E501
-
-    def inner(target):
-        if source.__doc__ is not None:
-            target.__doc__ = source.__doc__
-        return target
+    Returns the public ``dir_edges`` list and the edges of the nsector + 1
+    histogram columns, the first one starting at 0 and the last one (closed)
+    being folded back onto North.
+    """
+    angle = 360.0 / nsector
 
-    return inner
+    dir_bins = np.arange(-angle / 2, 360.0 + angle, angle, dtype=float)
+    dir_edges = dir_bins.tolist()
+    dir_edges.pop(-1)
+    dir_edges[0] = dir_edges.pop(-1)
+    dir_bins[0] = 0.0
+    dir_bins.flags.writeable = False
+    return tuple(dir_edges), dir_bins
 
 
-class WindAxesFactory:
+@functools.lru_cache(maxsize=None)
+def _sector_lookup(nsector):
     """
+    Tables turning directions into sector codes.
 
-    Factory class to create WindroseAxes or WindAxes
-
+    Returns ``(edges, fold)``: ``fold[np.searchsorted(edges, d, "right")]`` is
+    the sector of `d`, or ``nsector`` when `d` falls outside the histogram
+    (negative, beyond the last edge or NaN). The last edge is closed and the
+    last column is folded onto North, exactly like the historical
+    ``histogram2d`` implementation.
     """
+    dir_bins = _direction_bins(nsector)[1]
+    ncol = len(dir_bins) - 1
+    nsec = ncol - 1
+    # The closed last edge is nudged up by one ulp, and NaN sorts after every
+    # finite edge, so NaN directions land in their own trailing slot.
+    edges = np.append(dir_bins, np.nan)
+    edges[-2] = np.nextafter(edges[-2], np.inf)
+    fold = np.full(len(edges) + 1, nsec, dtype=np.intp)
+    fold[1 : ncol + 1] = np.arange(ncol)
+    fold[ncol] = 0
+    edges.flags.writeable = False
+    fold.flags.writeable = False
+    return edges, fold
+
+
+# Above this many var bins, `_bin_codes` switches to a binary search
+_BIN_COMPARE_MAX = 16
+
+# Integer directions outside this range are dropped whatever blowto is
+_LUT_LO, _LUT_HI = -360, 721
+
+
+@functools.lru_cache(maxsize=None)
+def _sector_lut(nsector, blowto):
+    """
+    Sector code of every integer direction in [_LUT_LO, _LUT_HI], indexed by
+    ``direction - _LUT_LO``. Built by binning the integers themselves so that
+    it matches the generic path bit for bit.
+    """
+    degrees = np.arange(_LUT_LO, _LUT_HI + 1, dtype=float)
+    lut = _sector_codes_float(degrees, nsector, blowto)
+    lut.flags.writeable = False
+    return lut
 
-    @staticmethod
-    def create(typ, ax=None, *args, **kwargs):
-        """
-
-        Create
-
-        Mandatory:
 
-        Parameters
-        ----------
-        typ : string, 'windroseaxes' or 'windaxes'
-            Type of axes to create
-                * windroseaxes : a WindroseAxes axe
-                * windaxe : a WindAxes axe
+def _sector_codes_float(direction, nsector, blowto):
+    edges, fold = _sector_lookup(nsector)
+    if blowto:
+        direction = direction + 180.0
+        np.subtract(direction, 360, out=direction, where=direction >= 360.0)
+    return fold[np.searchsorted(edges, direction, side="right")]
 
-        ax : matplotlib.Axes, optional
-            A matplotlib axe
 
-        """
-        typ = typ.lower()
-        d = {"windroseaxes": WindroseAxes, "windaxes": WindAxes}
-        if typ in d.keys():
-            cls = d[typ]
-            if isinstance(ax, cls):
-                return ax
-            else:
-                ax = cls.from_ax(ax, *args, **kwargs)
-                return ax
-        else:
-            raise NotImplementedError(f"typ={typ!r} but it might be in {d.keys()}")
-
-
-class WindroseAxes(PolarAxes):
+def sector_codes(direction, nsector, blowto=False):
     """
+    Sector code (0 is North, increasing clockwise) of each direction in
+    degrees, as binned by `histogram`, ``nsector`` for the directions it
+    drops (NaN, out of [0, 360]). With blowto, the direction the wind blows
+    to is binned instead.
 
-    Create a windrose axes
-
+    Integer degrees, as reported by pibal ``ddd``, are resolved with a lookup
+    table; other values go through a binary search over the sector edges.
     """
+    direction = np.asarray(direction)
+    if direction.dtype.kind in "iu":
+        index = direction.astype(np.intp)
+    elif direction.dtype.kind == "f":
+        with np.errstate(invalid="ignore"):
+            index = direction.astype(np.intp)
+        nan = np.isnan(direction)
+        if not np.all((index == direction) | nan):
+            return _sector_codes_float(direction, nsector, blowto)
+        index[nan] = _LUT_HI
+    else:
+        return _sector_codes_float(direction, nsector, blowto)
+    np.clip(index, _LUT_LO, _LUT_HI, out=index)
+    index -= _LUT_LO
+    return _sector_lut(nsector, blowto)[index]
 
-    name = "windrose"
-
-    def __init__(self, *args, **kwargs):
-        """
-        See Axes base class for args and kwargs documentation
-
-        Other kwargs are:
-
-        theta_labels : default ["E", "N-E", "N", "N-W", "W", "S-W", "S", "S-E"]
-            Labels for theta coordinate
-        """
 
-        # Uncomment to have the possibility to change the resolution directly
-        # when the instance is created
-        # self.RESOLUTION = kwargs.pop('resolution', 100)
-        self.rmax = kwargs.pop("rmax", None)
-        self.theta_labels = kwargs.pop("theta_labels", DEFAULT_THETA_LABELS)
-
-        PolarAxes.__init__(self, *args, **kwargs)
-        self.set_aspect("equal", adjustable="box", anchor="C")
-        self.radii_angle = 67.5
-        self.clear()
-
-    @staticmethod
-    def from_ax(
-        ax=None,
-        fig=None,
-        rmax=None,
-        figsize=FIGSIZE_DEFAULT,
-        rect=None,
-        *args,
-        **kwargs,
+def _bin_codes(var, bins):
+    """
+    Bin code of each var value, ``len(bins)`` for the values below ``bins[0]``
+    or NaN. The last bin is open ended.
+    """
+    var = np.asarray(var)
+    bins = np.asarray(bins, dtype=float)
+    if (
+        len(bins) <= _BIN_COMPARE_MAX
+        and var.dtype.kind in "iuf"
+        and np.array_equal(bins.astype(var.dtype), bins)
     ):
-        """
-        Return a WindroseAxes object for the figure `fig`.
-        """
-        if ax is None:
-            if fig is None:
-                fig = plt.figure(
-                    figsize=figsize,
-                    dpi=DPI_DEFAULT,
-                    facecolor="w",
-                    edgecolor="w",
-                )
-            if rect is None:
-                rect = [0.1, 0.1, 0.8, 0.8]
-            ax = WindroseAxes(fig, rect, *args, **kwargs)
-            fig.add_axes(ax)
-            return ax
-        else:
-            return ax
-
-    def clear(self):
-        """
-        Clear the current axes
-        """
-        PolarAxes.clear(self)
-
-        self.theta_angles = np.arange(0, 360, 45)
-        self.set_thetagrids(angles=self.theta_angles, labels=self.theta_labels)
-
-        self._info = {"dir": [], "bins": [], "table": []}
+        # A few comparisons beat a binary search for the usual handful of
+        # speed bins. Only done when the edges are exact in var's dtype.
+        codes = np.full(len(var), -1, dtype=np.intp)
+        for edge in bins.astype(var.dtype):
+            codes += var >= edge
+    else:
+        # NaN sorts after +inf, so it is the only value landing past the
+        # last bin
+        codes = np.searchsorted(np.append(bins, np.nan), var, side="right")
+        codes -= 1
+    codes[codes < 0] = len(bins)
+    return codes
 
-        self.patches_list = []
 
-        self.calm_count = None
+def histogram(direction, var, bins, nsector, normed=False, blowto=False, total=0):
+    """
+    Returns an array where, for each sector of wind
+    (centred on the north), we have the number of time the wind comes with a
+    particular var (speed, pollutant concentration, ...).
 
-    def _colors(self, cmap, n):
-        """
-        Returns a list of n colors based on the colormap cmap
+    Parameters
+    ----------
+    direction : 1D array
+        directions the wind blows from, North centred
+    var : 1D array
+        values of the variable to compute. Typically the wind speeds
+    bins : list
+        list of var category against we're going to compute the table
+    nsector : integer
+        number of sectors
 
-        """
-        return [cmap(i) for i in np.linspace(0.0, 1.0, n)]
+    Other Parameters
+    ----------------
+    normed : boolean, default False
+        The resulting table is normed in percent or not.
+    blowto : boolean, default False
+        Normally a windrose is computed with directions as wind blows from. If
+        true, the table will be reversed (useful for pollutantrose)
+    total : int, default 0
+        number of samples the percentages are relative to, calms included.
+        Required with `normed`, unless the table is empty.
+
+    Notes
+    -----
+    Each sample gets a flat (bin, sector) code and the table is a single
+    ``np.bincount`` of those codes, computed in chunks of `HISTOGRAM_CHUNK`
+    samples so the inputs are never copied whole.
+    """
 
-    def set_radii_angle(self, **kwargs):
-        """
-        Set the radii labels angle
-        """
+    bins = np.asarray(bins)
+    dir_edges = list(_direction_bins(nsector)[0])
+    var_bins = bins.tolist()
+    var_bins.append(np.inf)
 
-        kwargs.pop("labels", None)
-        angle = kwargs.pop("angle", None)
-        if angle is None:
-            angle = self.radii_angle
-        self.radii_angle = angle
-        N = 5
-        rmax = self.get_rmax()
-        radii = np.linspace(0, rmax, N + 1)
-        if rmax % N == 0:
-            fmt = "%d"
-        else:
-            fmt = "%.1f"
-        radii_labels = [fmt % r for r in radii]
-        # radii_labels[0] = ""  # Removing label 0
-        self.set_rgrids(
-            radii=radii[1:], labels=radii_labels[1:], angle=self.radii_angle, **kwargs
-        )
+    table = _histogram_counts(direction, var, bins, nsector, blowto).astype(float)
+    if normed:
+        if total:
+            table = table * 100 / total
+        elif table.any():
+            raise ValueError("normed=True needs the total number of samples")
 
-    def _update(self):
-        if not self.rmax:
-            self.rmax = np.max(np.sum(self._info["table"], axis=0))
-        calm_count = self.calm_count or 0
-        self.set_rmax(rmax=self.rmax + calm_count)
-        self.set_radii_angle(angle=self.radii_angle)
+    return dir_edges, var_bins, table
 
-    def legend(self, loc="lower left", decimal_places=1, units=None, **kwargs):
-        """
-        Sets the legend location and her properties.
 
-        Parameters
-        ----------
-        loc : int, string or pair of floats, default: 'lower left'
-            see :obj:`matplotlib.pyplot.legend`.
-
-        decimal_places : int, default 1
-            The decimal places of the formatted legend
-
-        units: str, default None
-
-        Other Parameters
-        ----------------
-        isaxes : boolean, default True
-            whether this is an axes legend
-        prop : FontProperties(size='smaller')
-            the font property
-        borderpad : float
-            the fractional whitespace inside the legend border
-        shadow : boolean
-            if True, draw a shadow behind legend
-        labelspacing : float, 0.005
-            the vertical space between the legend entries
-        handlelenght : float, 0.05
-            the length of the legend lines
-        handletextsep : float, 0.02
-            the space between the legend line and legend text
-        borderaxespad : float, 0.02
-            the border between the axes and legend edge
-        kwarg
-            Every other kwarg argument supported by
-            :obj:`matplotlib.pyplot.legend`
-        """
+def histogram_levels(direction, var, bins, nsector, blowto=False):
+    """
+    `histogram` of every level of vertical profiles, in a single pass.
 
-        def get_handles():
-            handles = []
-            for p in self.patches_list:
-                if isinstance(p, mpl.patches.Polygon) or isinstance(
-                    p,
-                    mpl.patches.Rectangle,
-                ):
-                    color = p.get_facecolor()
-                elif isinstance(p, mpl.lines.Line2D):
-                    color = p.get_color()
-                else:
-                    raise AttributeError("Can't handle patches")
-                handles.append(
-                    mpl.patches.Rectangle(
-                        (0, 0),
-                        0.2,
-                        0.2,
-                        facecolor=color,
-                        edgecolor="black",
-                    ),
-                )
-            return handles
-
-        def get_labels(decimal_places=1, units=None):
-            digits = np.copy(self._info["bins"]).tolist()
-            if not digits:
-                return ""
-            digits[-1] = digits[-2]
-            digits = [f"{label:.{decimal_places}f}" for label in digits]
-            fmt = "[{} : {}"
-            if locale.getlocale()[0] in ["fr_FR"]:
-                fmt += "["
-            else:
-                fmt += ")"
-
-            if units:
-                fmt += " " + units
-
-            labels = [
-                fmt.format(digits[k], digits[k + 1]) for k in range(len(digits) - 1)
-            ]
-            labels[-1] = f">{digits[-1]}"
-            return labels
-
-        kwargs.pop("labels", None)
-        kwargs.pop("handles", None)
-
-        handles = get_handles()
-        labels = get_labels(decimal_places, units)
-        self.legend_ = mpl.legend.Legend(self, handles, labels, loc=loc, **kwargs)
-        return self.legend_
-
-    def set_legend(self, **pyplot_arguments):
-        if "borderaxespad" not in pyplot_arguments:
-            pyplot_arguments["borderaxespad"] = -0.10
-        legend = self.legend(**pyplot_arguments)
-        plt.setp(legend.get_texts(), fontsize=8)
-        return legend
-
-    def _init_plot(self, direction, var, **kwargs):
-        """
-        Internal method used by all plotting commands
+    Parameters
+    ----------
+    direction : 2D array
+        directions the wind blows from, North centred, one row per sounding
+        and one column per level. NaN where the level was not reached.
+    var : 2D array
+        values of the variable at the same soundings and levels
+    bins : list
+        list of var category against we're going to compute the table
+    nsector : integer
+        number of sectors
 
-        Parameters
-        ----------
-        direction : 1D array,
-            directions the wind blows from, North centred
-        var : 1D array,
-            values of the variable to compute. Typically the wind speeds
+    Other Parameters
+    ----------------
+    blowto : boolean, default False
+        see `histogram`
+
+    Returns
+    -------
+    dir_edges, var_bins
+        like `histogram`
+    table : 3D array
+        the `histogram` table of each level, ``(levels, bins, sectors)``
+    """
+    direction = np.asarray(direction)
+    var = np.asarray(var)
+    if direction.ndim != 2 or direction.shape != var.shape:
+        raise ValueError("var and direction must be 2D arrays of the same shape")
+
+    # The level of a sample is its column: ravelled row by row, the level
+    # codes repeat 0, 1, ..., nlevels - 1
+    nlevels = var.shape[1]
+    level = np.broadcast_to(np.arange(nlevels, dtype=np.intp), var.shape).ravel()
+    bins = np.asarray(bins)
+    table = _histogram_counts(
+        direction.ravel(),
+        var.ravel(),
+        bins,
+        nsector,
+        blowto,
+        group=level,
+        ngroups=nlevels,
+    ).astype(float)
+
+    dir_edges = list(_direction_bins(nsector)[0])
+    var_bins = bins.tolist()
+    var_bins.append(np.inf)
+    return dir_edges, var_bins, table
 
-        Other Parameters
-        ----------------
-        normed : boolean, default False
-        blowto : boolean, default False
-        colors : str or list of str, default None
-            The colors of the plot.
-        cmap : color map
-            A :obj:`matplotlib.cm` colormap for the plot.
-            Warning! It overrides `colors`.
-        weibull_factors :
-        mean_values :
-        frequency :
-        calm_limit : float, default None
-        kwarg
-            Any argument accepted by :obj:`matplotlib.pyplot.plot`.
-        """
 
-        normed = kwargs.pop("normed", False)
-        blowto = kwargs.pop("blowto", False)
-
-        # Calm condition, mask data if needed
-        calm_limit = kwargs.pop("calm_limit", None)
-        total = len(var)
-        if calm_limit is not None:
-            mask = var > calm_limit
-            self.calm_count = len(var) - np.count_nonzero(mask)
-            if normed:
-                self.calm_count = self.calm_count * 100 / len(var)
-            var = var[mask]
-            direction = direction[mask]
+def weibull_samples(direction, scale, shape, frequency, seed=None):
+    """
+    Draw synthetic samples from one Weibull distribution per direction.
 
-        # if weibull factors are entered overwrite direction and var
-        if "weibull_factors" in kwargs or "mean_values" in kwargs:
-            if "weibull_factors" in kwargs and "mean_values" in kwargs:
-                raise TypeError("cannot specify both weibull_factors and mean_values")
-            statistic_type = "unset"
-            if "weibull_factors" in kwargs:
-                statistic_type = "weibull"
-                val = kwargs.pop("weibull_factors")
-            elif "mean_values" in kwargs:
-                statistic_type = "mean"
-                val = kwargs.pop("mean_values")
-            if val:
-                if "frequency" not in kwargs:
-                    raise TypeError(
-                        "specify 'frequency' argument for statistical input",
-                    )
-                windFrequencies = kwargs.pop("frequency")
-                if len(windFrequencies) != len(direction) or len(direction) != len(var):
-                    if len(windFrequencies) != len(direction):
-                        raise TypeError("len(frequency) != len(direction)")
-                    elif len(direction) != len(var):
-                        raise TypeError("len(frequency) != len(direction)")
-                windSpeeds = []
-                windDirections = []
-                for dbin in range(len(direction)):
-                    for _ in range(int(windFrequencies[dbin] * 10000)):
-                        if statistic_type == "weibull":
-                            windSpeeds.append(
-                                random.weibullvariate(var[dbin][0], var[dbin][1]),
-                            )
-                        elif statistic_type == "mean":
-                            windSpeeds.append(
-                                random.weibullvariate(
-                                    var[dbin] * 2 / np.sqrt(np.pi),
-                                    2,
-                                ),
-                            )
-                        windDirections.append(direction[dbin])
-                var, direction = windSpeeds, windDirections
-
-        # self.clear()
-        kwargs.pop("zorder", None)
-
-        # Init of the bins array if not set
-        bins = kwargs.pop("bins", None)
-        if bins is None:
-            bins = np.linspace(np.min(var), np.max(var), 6)
-        if isinstance(bins, int):
-            bins = np.linspace(np.min(var), np.max(var), bins)
-        bins = np.asarray(bins)
-        nbins = len(bins)
-
-        # Number of sectors
-        nsector = kwargs.pop("nsector", None)
-        if nsector is None:
-            nsector = 16
-
-        # Sets the colors table based on the colormap or the "colors" argument
-        colors = kwargs.pop("colors", None)
-        cmap = kwargs.pop("cmap", None)
-        if colors is not None:
-            if isinstance(colors, str):
-                colors = [colors] * nbins
-            if isinstance(colors, (tuple, list)):
-                if len(colors) != nbins:
-                    raise ValueError("colors and bins must have same length")
-        else:
-            if cmap is None:
-                cmap = plt.get_cmap()
-            colors = self._colors(cmap, nbins)
-
-        # Building the angles list
-        angles = np.arange(0, -2 * np.pi, -2 * np.pi / nsector) + np.pi / 2
-
-        # Set the global information dictionary
-        self._info["dir"], self._info["bins"], self._info["table"] = histogram(
-            direction,
-            var,
-            bins,
-            nsector,
-            normed,
-            blowto,
-            total,
-        )
+    Parameters
+    ----------
+    direction : 1D array
+        directions the wind blows from, North centred
+    scale, shape : 1D array
+        Weibull factors of each direction
+    frequency : 1D array
+        frequency of each direction, ``frequency * WEIBULL_SAMPLES`` samples
+        are drawn for each one
 
-        return bins, nbins, nsector, colors, angles, kwargs
+    Other Parameters
+    ----------------
+    seed : int or numpy.random.Generator, default None
+        Seed of :obj:`numpy.random.default_rng`
 
-    def _calm_circle(self):
-        """Draw the calm centered circle"""
-        if self.calm_count and self.calm_count > 0:
-            self.set_rorigin(-(np.sqrt(self.calm_count / np.pi)))
+    Returns
+    -------
+    direction, var : 1D arrays
+        the samples, ready for `histogram`
+    """
+    counts = (np.asarray(frequency, dtype=float) * WEIBULL_SAMPLES).astype(int)
+    rng = np.random.default_rng(seed)
+    var = np.repeat(scale, counts) * rng.weibull(np.repeat(shape, counts))
+    return np.repeat(direction, counts), var
 
-    def contour(self, direction, var, **kwargs):
-        """
-        Plot a windrose in linear mode. For each var bins, a line will be
-        draw on the axes, a segment between each sector (center to center).
-        Each line can be formatted (color, width, ...) like with standard plot
-        pylab command.
 
-        Parameters
-        ----------
-        direction : 1D array
-            directions the wind blows from, North centred
-        var : 1D array
-            values of the variable to compute. Typically the wind speeds.
-
-        Other Parameters
-        ----------------
-        nsector : integer, optional
-            number of sectors used to compute the windrose table. If not set,
-            nsector=16, then each sector will be 360/16=22.5°, and the
-            resulting computed table will be aligned with the cardinals points.
-        bins : 1D array or integer, optional
-            number of bins, or a sequence of bins variable. If not set, bins=6,
-            then bins=linspace(min(var), max(var), 6)
-        blowto : bool, optional
-            If True, the windrose will be pi rotated, to show where the wind
-            blow to (useful for pollutant rose).
-        colors : string or tuple, optional
-            one string color ('k' or 'black'), in this case all bins will be
-            plotted in this color; a tuple of matplotlib color args (string,
-            float, rgb, etc), different levels will be plotted in different
-            colors in the order specified.
-        cmap : a cm Colormap instance from :obj:`matplotlib.cm`, optional
-            if cmap == None and colors == None, a default Colormap is used.
-        calm_limit : float, optional
-            Calm limit for the var parameter. If not None, a centered red
-            circle will be draw for representing the calms occurrences and all
-            data below this value will be removed from the computation.
-
-        others kwargs
-            Any supported argument of :obj:`matplotlib.pyplot.plot`
+def weibull_fit(var, group=None, ngroups=1, tol=1e-10, maxiter=50):
+    """
+    Maximum likelihood Weibull factors of the samples of each group.
 
-        """
-        bins, nbins, nsector, colors, angles, kwargs = self._init_plot(
-            direction, var, **kwargs
-        )
+    All the groups are fitted at once: the shape is found by Newton
+    iterations on the likelihood equation
 
-        # closing lines
-        angles = np.hstack((angles, angles[-1] - 2 * np.pi / nsector))
-        vals = np.hstack(
-            (
-                self._info["table"],
-                np.reshape(
-                    self._info["table"][:, 0],
-                    (self._info["table"].shape[0], 1),
-                ),
-            ),
-        )
+        sum(x**k * ln x) / sum(x**k) - 1 / k - mean(ln x) = 0
 
-        self._calm_circle()
-        origin = 0
-        for i in range(nbins):
-            val = vals[i, :] + origin
-            origin += vals[i, :]
-            zorder = ZBASE + nbins - i
-            patch = self.plot(angles, val, color=colors[i], zorder=zorder, **kwargs)
-            self.patches_list.extend(patch)
-        self._update()
-
-    def contourf(self, direction, var, **kwargs):
-        """
-        Plot a windrose in filled mode. For each var bins, a line will be
-        draw on the axes, a segment between each sector (center to center).
-        Each line can be formatted (color, width, ...) like with standard plot
-        pylab command.
+    its group sums being computed with one `numpy.bincount` each per
+    iteration, starting from the method of moments estimate. The result is
+    the one of ``scipy.stats.exponweib.fit(var, floc=0, f0=1)`` (or
+    ``weibull_min.fit(var, floc=0)``) for each group.
 
-        Parameters
-        ----------
-        direction : 1D array
-            directions the wind blows from, North centred
-        var : 1D array
-            values of the variable to compute. Typically the wind speeds
+    Parameters
+    ----------
+    var : 1D array
+        samples, typically wind speeds. Samples that are not > 0 (calms) or
+        not finite are ignored, the likelihood being 0 at 0.
+    group : 1D int array, optional
+        group code, in [0, ngroups), of each sample, e.g. the sector, month
+        and level of a speed. By default all the samples are in one group.
+    ngroups : int, default 1
 
-        Other Parameters
-        ----------------
-        nsector: integer, optional
-            number of sectors used to compute the windrose table. If not set,
-            nsector=16, then each sector will be 360/16=22.5°, and the
-            resulting computed table will be aligned with the cardinals points.
-        bins : 1D array or integer, optional
-            number of bins, or a sequence of bins variable. If not set, bins=6,
-            then bins=linspace(min(`var`), max(`var`), 6)
-        blowto : bool, optional
-            If True, the windrose will be pi rotated, to show where the wind
-            blow to (useful for pollutant rose).
-        colors : string or tuple, optional
-            one string color ('k' or 'black'), in this case all bins will be
-            plotted in this color; a tuple of matplotlib color args (string,
-            float, rgb, etc), different levels will be plotted in different
-            colors in the order specified.
-        cmap : a cm Colormap instance from :obj:`matplotlib.cm`, optional
-            if cmap == None and colors == None, a default Colormap is used.
-        calm_limit : float, optional
-            Calm limit for the var parameter. If not None, a centered red
-            circle will be draw for representing the calms occurrences and all
-            data below this value will be removed from the computation.
-
-        others kwargs
-            Any supported argument of :obj:`matplotlib.pyplot.plot`
-        """
+    Other Parameters
+    ----------------
+    tol : float, default 1e-10
+        relative tolerance on the shape
+    maxiter : int, default 50
+
+    Returns
+    -------
+    shape, scale : 1D arrays
+        factors of each group, NaN for groups with less than two distinct
+        samples
+    """
+    var = np.asarray(var, dtype=float).ravel()
+    if group is None:
+        group = np.zeros(len(var), dtype=np.intp)
+    group = np.asarray(group, dtype=np.intp).ravel()
+    if len(group) != len(var):
+        raise ValueError("group and var must have same length")
+    valid = np.isfinite(var) & (var > 0)
+    var, group = var[valid], group[valid]
+
+    def sums(weights):
+        return np.bincount(group, weights=weights, minlength=ngroups)[:ngroups]
+
+    count = sums(None)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = sums(var) / count
+        # the shape does not depend on the unit: fit var / mean, near 1
+        log = np.log(var / mean[group])
+        mean_log = sums(log) / count
+        std = np.sqrt(np.maximum(sums(log * log) / count - mean_log**2, 0))
+        cv = np.sqrt(np.maximum(sums((var / mean[group]) ** 2) / count - 1, 0))
+        # moments estimate, or from the log spread when cv is degenerate
+        shape = np.where(cv > 0, cv**-1.086, np.pi / np.sqrt(6) / std)
+    fitted = (count >= 2) & (std > 0)
+    shape = np.where(fitted, np.clip(shape, 1e-3, 1e3), 1.0)
+
+    for _ in range(maxiter):
+        power = np.exp(shape[group] * log)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            s0 = sums(power)
+            s1 = sums(power * log) / s0
+            s2 = sums(power * log * log) / s0
+            value = s1 - 1 / shape - mean_log
+            slope = s2 - s1**2 + 1 / shape**2
+            step = np.where(fitted, value / slope, 0.0)
+        # the equation is increasing in the shape: never step below 0
+        shape = np.where(shape - step > 0, shape - step, shape / 2)
+        if np.all(np.abs(step) <= tol * shape):
+            break
+
+    power = np.exp(shape[group] * log)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = mean * (sums(power) / count) ** (1 / shape)
+    shape = np.where(fitted, shape, np.nan)
+    scale = np.where(fitted, scale, np.nan)
+    return shape, scale
+
+
+def weibull_table(
+    direction, scale, shape, frequency, bins, nsector, normed=False, blowto=False
+):
+    """
+    Windrose table expected from one Weibull distribution per direction,
+    without drawing any sample.
 
-        bins, nbins, nsector, colors, angles, kwargs = self._init_plot(
-            direction, var, **kwargs
-        )
-        kwargs.pop("facecolor", None)
-        kwargs.pop("edgecolor", None)
-
-        # closing lines
-        angles = np.hstack((angles, angles[-1] - 2 * np.pi / nsector))
-        vals = np.hstack(
-            (
-                self._info["table"],
-                np.reshape(
-                    self._info["table"][:, 0],
-                    (self._info["table"].shape[0], 1),
-                ),
-            ),
-        )
-        self._calm_circle()
-        origin = 0
-        for i in range(nbins):
-            val = vals[i, :] + origin
-            origin += vals[i, :]
-            zorder = ZBASE + nbins - i
-            patch = self.fill(
-                np.append(angles, 0),
-                np.append(val, 0),
-                facecolor=colors[i],
-                edgecolor=colors[i],
-                zorder=zorder,
-                **kwargs,
-            )
-            self.patches_list.extend(patch)
-        self._update()
+    Each direction contributes ``frequency * WEIBULL_SAMPLES`` samples spread
+    over the var bins according to the Weibull CDF evaluated at the bins
+    edges. Parameters are the ones of `weibull_samples` and `histogram`.
 
-    def bar(self, direction, var, **kwargs):
-        """
-        Plot a windrose in bar mode. For each var bins and for each sector,
-        a colored bar will be draw on the axes.
+    Returns
+    -------
+    dir_edges, var_bins, table
+        like `histogram`
+    """
+    bins = np.asarray(bins, dtype=float)
+    scale = np.asarray(scale, dtype=float)
+    shape = np.asarray(shape, dtype=float)
+    counts = (np.asarray(frequency, dtype=float) * WEIBULL_SAMPLES).astype(int)
+
+    edges = np.maximum(np.append(bins, np.inf), 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cdf = -np.expm1(-((edges / scale[:, None]) ** shape[:, None]))
+    expected = counts[:, None] * np.diff(cdf, axis=1)
+
+    nsec = len(_direction_bins(nsector)[1]) - 2
+    sector = sector_codes(direction, nsector, blowto)
+    table = np.empty((len(bins), nsec))
+    for i in range(len(bins)):
+        table[i] = np.bincount(sector, weights=expected[:, i], minlength=nsec + 1)[
+            :nsec
+        ]
+    if normed:
+        table = table * 100 / counts.sum()
 
-        Parameters
-        ----------
-        direction : 1D array
-            directions the wind blows from, North centred
-        var : 1D array
-            values of the variable to compute. Typically the wind speeds.
-
-        Other Parameters
-        ----------------
-        nsector : integer, optional
-            number of sectors used to compute the windrose table. If not set,
-            nsector=16, then each sector will be 360/16=22.5°, and the
-            resulting computed table will be aligned with the cardinals points.
-        bins : 1D array or integer, optional
-            number of bins, or a sequence of bins variable. If not set, bins=6
-            between min(`var`) and max(`var`).
-        blowto : bool, optional.
-            if True, the windrose will be pi rotated, to show where the wind
-            blow to (useful for pollutant rose).
-        colors : string or tuple, optional
-            one string color ('k' or 'black'), in this case all bins will be
-            plotted in this color; a tuple of matplotlib color args (string,
-            float, rgb, etc), different levels will be plotted
-            in different colors in the order specified.
-        cmap : a cm Colormap instance from :obj:`matplotlib.cm`, optional.
-            if cmap == None and colors == None, a default Colormap is used.
-        edgecolor : string, optional
-            The string color each edge box will be plotted.
-            Default : no edgecolor
-        opening : float, optional
-            between 0.0 and 1.0, to control the space between each sector (1.0
-            for no space)
-        calm_limit : float, optional
-            Calm limit for the var parameter. If not None, a centered red
-            circle will be draw for representing the calms occurrences and all
-            data below this value will be removed from the computation.
+    dir_edges = list(_direction_bins(nsector)[0])
+    var_bins = bins.tolist()
+    var_bins.append(np.inf)
+    return dir_edges, var_bins, table
 
-        """
 
-        bins, nbins, nsector, colors, angles, kwargs = self._init_plot(
-            direction, var, **kwargs
-        )
-        kwargs.pop("facecolor", None)
-        edgecolor = kwargs.pop("edgecolor", None)
-        if edgecolor is not None:
-            if not isinstance(edgecolor, str):
-                raise ValueError("edgecolor must be a string color")
-        opening = kwargs.pop("opening", None)
-        if opening is None:
-            opening = 0.8
-        dtheta = 2 * np.pi / nsector
-        opening = dtheta * opening
-
-        self._calm_circle()
-
-        for j in range(nsector):
-            origin = 0
-            for i in range(nbins):
-                if i > 0:
-                    origin += self._info["table"][i - 1, j]
-                val = self._info["table"][i, j]
-                zorder = ZBASE + nbins - i
-                patch = mpl.patches.Rectangle(
-                    (angles[j] - opening / 2, origin),
-                    opening,
-                    val,
-                    facecolor=colors[i],
-                    edgecolor=edgecolor,
-                    zorder=zorder,
-                    **kwargs,
-                )
-                self.add_patch(patch)
-                if j == 0:
-                    self.patches_list.append(patch)
-        self._update()
-
-    def box(self, direction, var, **kwargs):
-        """
-        Plot a windrose in proportional box mode. For each var bins and for
-        each sector, a colored box will be draw on the axes.
+def _histogram_counts(
+    direction, var, bins, nsector, blowto=False, group=None, ngroups=1
+):
+    """
+    Integer (bins, sectors) counts of `histogram`.
 
-        Parameters
-        ----------
-        direction : 1D array
-            directions the wind blows from, North centred
-        var : 1D array
-            values of the variable to compute. Typically the wind speeds
+    With `group`, an array of integer codes in [0, ngroups), the counts of
+    every group are computed in the same pass and returned as a
+    (groups, bins, sectors) array.
+    """
+    if len(var) != len(direction):
+        raise ValueError("var and direction must have same length")
+    if group is not None and len(group) != len(var):
+        raise ValueError("group and var must have same length")
+
+    direction = np.asarray(direction)
+    var = np.asarray(var)
+    bins = np.asarray(bins)
+    if np.any(bins[:-1] > bins[1:]):
+        raise ValueError("bins must increase monotonically")
+
+    nsec = len(_direction_bins(nsector)[1]) - 2
+    nvar = len(bins)
+    ncell = (nvar + 1) * (nsec + 1)
+    # Codes nsec / nvar collect the dropped samples, sliced off at the end
+    counts = np.zeros(ngroups * ncell, dtype=np.int64)
+    for start in range(0, len(var), HISTOGRAM_CHUNK):
+        stop = start + HISTOGRAM_CHUNK
+        code = _bin_codes(var[start:stop], bins)
+        code *= nsec + 1
+        code += sector_codes(direction[start:stop], nsector, blowto)
+        if group is not None:
+            code += np.asarray(group[start:stop], dtype=np.intp) * ncell
+        counts += np.bincount(code, minlength=len(counts))
+    counts = counts.reshape(ngroups, nvar + 1, nsec + 1)[:, :nvar, :nsec]
+    return counts if group is not None else counts[0]
+
+
+def histogram_by(direction, var, by, bins, nsector=16, blowto=False, calm_limit=None):
+    """
+    Compute one WindroseTable per distinct value of `by`, all in a single
+    pass over the data.
 
-        Other Parameters
-        ----------------
-        nsector: integer, optional
-            number of sectors used to compute the windrose table. If not set,
-            nsector=16, then each sector will be 360/16=22.5°, and the
-            resulting computed table will be aligned with the cardinals points.
-        bins : 1D array or integer, optional
-            number of bins, or a sequence of bins variable. If not set, bins=6
-            between min(`var`) and max(`var`).
-        blowto : bool, optional
-            If True, the windrose will be pi rotated, to show where the wind
-            blow to (useful for pollutant rose).
-        colors : string or tuple, optional
-            one string color ('k' or 'black'), in this case all bins will be
-            plotted in this color; a tuple of matplotlib color args (string,
-            float, rgb, etc), different levels will be plotted in different
-            colors in the order specified.
-        cmap : a cm Colormap instance from :obj:`matplotlib.cm`, optional
-            if cmap == None and colors == None, a default Colormap is used.
-        edgecolor : string, optional
-            The string color each edge bar will be plotted.  Default : no
-            edgecolor
-        calm_limit : float, optional
-            Calm limit for the var parameter. If not None, a centered red
-            circle will be draw for representing the calms occurrences and all
-            data below this value will be removed from the computation.
+    Parameters
+    ----------
+    direction : 1D array
+        directions the wind blows from, North centred
+    var : 1D array
+        values of the variable to compute. Typically the wind speeds
+    by : 1D array
+        group of each sample (month, year, hour, level, ...)
+    bins : 1D array
+        lower edges of the var bins, the last bin being open ended
 
-        """
+    Other Parameters
+    ----------------
+    nsector, blowto, calm_limit :
+        see `WindroseTable`
 
-        bins, nbins, nsector, colors, angles, kwargs = self._init_plot(
-            direction, var, **kwargs
-        )
-        kwargs.pop("facecolor", None)
-        edgecolor = kwargs.pop("edgecolor", None)
-        if edgecolor is not None:
-            if not isinstance(edgecolor, str):
-                raise ValueError("edgecolor must be a string color")
-        opening = np.linspace(0.0, np.pi / 16, nbins)
-
-        self._calm_circle()
-
-        for j in range(nsector):
-            origin = 0
-            for i in range(nbins):
-                if i > 0:
-                    origin += self._info["table"][i - 1, j]
-                val = self._info["table"][i, j]
-                zorder = ZBASE + nbins - i
-                patch = mpl.patches.Rectangle(
-                    (angles[j] - opening[i] / 2, origin),
-                    opening[i],
-                    val,
-                    facecolor=colors[i],
-                    edgecolor=edgecolor,
-                    zorder=zorder,
-                    **kwargs,
-                )
-                self.add_patch(patch)
-                if j == 0:
-                    self.patches_list.append(patch)
-        self._update()
-
-
-class WindAxes(mpl.axes.Subplot):
-    def __init__(self, *args, **kwargs):
-        """
-        See Axes base class for args and kwargs documentation
-        """
-        super().__init__(*args, **kwargs)
-
-    @staticmethod
-    def from_ax(ax=None, fig=None, figsize=FIGSIZE_DEFAULT, *args, **kwargs):
-        if ax is None:
-            if fig is None:
-                fig = plt.figure(figsize=figsize, dpi=DPI_DEFAULT)
-            ax = WindAxes(fig, 1, 1, 1, *args, **kwargs)
-            fig.add_axes(ax)
-            return ax
-        else:
-            return ax
-
-    def pdf(
-        self,
-        var,
-        bins=None,
-        Nx=100,
-        bar_color="b",
-        plot_color="g",
-        Nbins=10,
-        *args,
-        **kwargs,
-    ):
-        """
-        Draw probability density function and return Weibull distribution
-        parameters
-        """
-        import scipy.stats
+    Returns
+    -------
+    dict
+        WindroseTable of each group, in sorted group order
+    """
+    if len(by) != len(var):
+        raise ValueError("by and var must have same length")
+    keys, group = np.unique(np.asarray(by), return_inverse=True)
+    group = group.reshape(-1)
+    var = np.asarray(var)
+    direction = np.asarray(direction)
+
+    totals = np.bincount(group, minlength=len(keys))
+    calms = np.zeros(len(keys), dtype=np.int64)
+    if calm_limit is not None:
+        mask = var > calm_limit
+        calms = totals - np.bincount(group[mask], minlength=len(keys))
+        var, direction, group = var[mask], direction[mask], group[mask]
+    counts = _histogram_counts(
+        direction, var, bins, nsector, blowto, group=group, ngroups=len(keys)
+    )
 
-        if bins is None:
-            bins = np.linspace(0, np.max(var), Nbins)
-        hist, bins = np.histogram(var, bins=bins, density=True)
-        width = 0.7 * (bins[1] - bins[0])
-        center = (bins[:-1] + bins[1:]) / 2
-        self.bar(center, hist, align="center", width=width, color=bar_color)
-        params = scipy.stats.exponweib.fit(var, floc=0, f0=1)
-        x = np.linspace(0, bins[-1], Nx)
-        self.plot(x, scipy.stats.exponweib.pdf(x, *params), color=plot_color)
-        return (self, params)
+    tables = {}
+    for i, key in enumerate(keys.tolist()):
+        table = WindroseTable(bins, nsector, blowto=blowto, calm_limit=calm_limit)
+        table.counts = counts[i]
+        table.calm_count = int(calms[i])
+        table.total = int(totals[i])
+        tables[key] = table
+    return tables
 
 
-def histogram(direction, var, bins, nsector, normed=False, blowto=False, total=0):
+class WindroseTable:
     """
-    Returns an array where, for each sector of wind
-    (centred on the north), we have the number of time the wind comes with a
-    particular var (speed, pollutant concentration, ...).
+    Mergeable windrose table, accumulated chunk by chunk.
+
+    The sectors and var bins are fixed at creation so that tables built from
+    different chunks of data, possibly in different processes, can be merged
+    into the table of the whole data set. A WindroseTable can be plotted
+    directly with `WindroseAxes.bar`, `box`, `contour` and `contourf`.
 
     Parameters
     ----------
-    direction : 1D array
-        directions the wind blows from, North centred
-    var : 1D array
-        values of the variable to compute. Typically the wind speeds
-    bins : list
-        list of var category against we're going to compute the table
-    nsector : integer
+    bins : 1D array
+        lower edges of the var bins, the last bin being open ended
+    nsector : integer, default 16
         number of sectors
 
     Other Parameters
     ----------------
-    normed : boolean, default False
-        The resulting table is normed in percent or not.
     blowto : boolean, default False
-        Normally a windrose is computed with directions as wind blows from. If
-        true, the table will be reversed (useful for pollutantrose)
+        If True, the table is computed for the directions the wind blows to.
+    calm_limit : float, default None
+        If not None, the var values lower or equal to this limit are counted
+        as calms instead of being binned.
+
+    Examples
+    --------
+    Histogram an archive in parallel, one shard per process:
+
+    >>> def shard_table(path):
+    ...     direction, var = load(path)
+    ...     return WindroseTable(bins, nsector=16).update(direction, var)
+    >>> with ProcessPoolExecutor() as pool:
+    ...     table = functools.reduce(WindroseTable.merge, pool.map(shard_table, paths))
+    >>> ax = WindroseAxes.from_ax()
+    >>> ax.bar(table, normed=True)
     """
 
-    if len(var) != len(direction):
-        raise ValueError("var and direction must have same length")
+    def __init__(self, bins, nsector=16, blowto=False, calm_limit=None):
+        self.bins = np.asarray(bins, dtype=float)
+        if self.bins.ndim != 1 or len(self.bins) == 0:
+            raise ValueError("bins must be a non empty 1D array")
+        if np.any(self.bins[:-1] > self.bins[1:]):
+            raise ValueError("bins must increase monotonically")
+        self.nsector = nsector
+        self.blowto = blowto
+        self.calm_limit = calm_limit
+        dir_edges, dir_bins = _direction_bins(nsector)
+        self.counts = np.zeros((len(self.bins), len(dir_bins) - 2), dtype=np.int64)
+        self.calm_count = 0
+        self.total = 0
+
+    def __repr__(self):
+        return (
+            f"WindroseTable(nsector={self.nsector}, nbins={len(self.bins)}, "
+            f"total={self.total}, calm_count={self.calm_count})"
+        )
 
-    angle = 360.0 / nsector
+    @property
+    def dir_edges(self):
+        """Sector edges, as returned by `histogram`"""
+        return list(_direction_bins(self.nsector)[0])
 
-    dir_bins = np.arange(-angle / 2, 360.0 + angle, angle, dtype=float)
-    dir_edges = dir_bins.tolist()
-    dir_edges.pop(-1)
-    dir_edges[0] = dir_edges.pop(-1)
-    dir_bins[0] = 0.0
+    @property
+    def var_bins(self):
+        """Var bins edges, as returned by `histogram`"""
+        return self.bins.tolist() + [np.inf]
 
-    var_bins = bins.tolist()
-    var_bins.append(np.inf)
-
-    if blowto:
-        direction = direction + 180.0
-        direction[direction >= 360.0] = direction[direction >= 360.0] - 360
+    @property
+    def table(self):
+        """Counts as a float (bins, sectors) array, like `histogram`"""
+        return self.counts.astype(float)
 
-    table = histogram2d(x=var, y=direction, bins=[var_bins, dir_bins], density=False)[0]
-    # add the last value to the first to have the table of North winds
-    table[:, 0] = table[:, 0] + table[:, -1]
-    # and remove the last col
-    table = table[:, :-1]
-    if normed:
-        table = table * 100 / total
+    def update(self, direction, var):
+        """
+        Add a chunk of samples to the table.
 
-    return dir_edges, var_bins, table
+        Parameters
+        ----------
+        direction : 1D array
+            directions the wind blows from, North centred
+        var : 1D array
+            values of the variable to compute. Typically the wind speeds
 
+        Returns
+        -------
+        self
+        """
+        if len(var) != len(direction):
+            raise ValueError("var and direction must have same length")
+        var = np.asarray(var)
+        direction = np.asarray(direction)
+        self.total += len(var)
+        if self.calm_limit is not None:
+            mask = var > self.calm_limit
+            self.calm_count += len(var) - np.count_nonzero(mask)
+            var = var[mask]
+            direction = direction[mask]
+        self.counts += _histogram_counts(
+            direction, var, self.bins, self.nsector, self.blowto
+        )
+        return self
 
-@_copy_docstring(WindroseAxes.contour)
-def wrcontour(direction, var, ax=None, rmax=None, figsize=FIGSIZE_DEFAULT, **kwargs):
-    """
-    Draw contour probability density function and return Weibull
-    distribution parameters.
-    """
-    ax = WindroseAxes.from_ax(ax, rmax=rmax, figsize=figsize)
-    ax.contour(direction, var, **kwargs)
-    ax.set_legend()
-    return ax
-
-
-@_copy_docstring(WindroseAxes.contourf)
-def wrcontourf(direction, var, ax=None, rmax=None, figsize=FIGSIZE_DEFAULT, **kwargs):
-    ax = WindroseAxes.from_ax(ax, rmax=rmax, figsize=figsize)
-    ax.contourf(direction, var, **kwargs)
-    ax.set_legend()
-    return ax
-
-
-@_copy_docstring(WindroseAxes.box)
-def wrbox(direction, var, ax=None, rmax=None, figsize=FIGSIZE_DEFAULT, **kwargs):
-    ax = WindroseAxes.from_ax(ax, rmax=rmax, figsize=figsize)
-    ax.box(direction, var, **kwargs)
-    ax.set_legend()
-    return ax
-
-
-@_copy_docstring(WindroseAxes.bar)
-def wrbar(direction, var, ax=None, rmax=None, figsize=FIGSIZE_DEFAULT, **kwargs):
-    ax = WindroseAxes.from_ax(ax, rmax=rmax, figsize=figsize)
-    ax.bar(direction, var, **kwargs)
-    ax.set_legend()
-    return ax
-
-
-@_copy_docstring(WindAxes.pdf)
-def wrpdf(
-    var,
-    bins=None,
-    Nx=100,
-    bar_color="b",
-    plot_color="g",
-    Nbins=10,
-    ax=None,
-    rmax=None,
-    figsize=FIGSIZE_DEFAULT,
-    *args,
-    **kwargs,
-):
-    """
-    Draw probability density function and return Weitbull distribution
-    parameters
-    """
-    ax = WindAxes.from_ax(ax, figsize=figsize)
-    ax, params = ax.pdf(var, bins, Nx, bar_color, plot_color, Nbins, *args, **kwargs)
-    return (ax, params)
+    def merge(self, other):
+        """
+        Add the counts of another table built with the same nsector, bins,
+        blowto and calm_limit.
 
+        Returns
+        -------
+        self
+        """
+        if (
+            other.nsector != self.nsector
+            or not np.array_equal(other.bins, self.bins)
+            or other.blowto != self.blowto
+            or other.calm_limit != self.calm_limit
+        ):
+            raise ValueError(
+                "cannot merge tables with different nsector, bins, blowto or "
+                "calm_limit"
+            )
+        self.counts += other.counts
+        self.calm_count += other.calm_count
+        self.total += other.total
+        return self
 
-def wrscatter(
-    direction, var, ax=None, rmax=None, figsize=FIGSIZE_DEFAULT, *args, **kwargs
-):
-    """
-    Draw scatter plot
-    """
-    ax = WindroseAxes.from_ax(ax, rmax=rmax, figsize=figsize)
-    direction = -np.array(direction) + np.radians(90)
-    ax.scatter(direction, var, *args, **kwargs)
-    return ax
+    def normed(self):
+        """
+        Table in percent of the total number of samples, calms included, like
+        `histogram` with normed=True.
+        """
+        if self.total == 0:
+            return np.zeros(self.counts.shape)
+        return self.counts * 100 / self.total
 
 
 # def clean(direction, var):
@@ -920,93 +701,8 @@ def clean(direction, var, index=False):
     if index is None:
         index = np.arange(mask.sum())
         return direction[mask], var[mask], index
-    elif not index:
+    elif index is False:
         return direction[mask], var[mask]
     else:
         index = index[mask]
         return direction[mask], var[mask], index
-
-
-D_KIND_PLOT = {
-    "contour": wrcontour,
-    "contourf": wrcontourf,
-    "box": wrbox,
-    "bar": wrbar,
-    "pdf": wrpdf,
-    "scatter": wrscatter,
-}
-
-
-def plot_windrose(
-    direction_or_df,
-    var=None,
-    kind="contour",
-    var_name=VAR_DEFAULT,
-    direction_name=DIR_DEFAULT,
-    by=None,
-    rmax=None,
-    ax=None,
-    **kwargs,
-):
-    """Plot windrose from a pandas DataFrame or a numpy array."""
-    if var is None:
-        # Assuming direction_or_df is a DataFrame
-        df = direction_or_df
-        var = df[var_name].values
-        direction = df[direction_name].values
-    else:
-        direction = direction_or_df
-    return plot_windrose_np(
-        direction, var, kind=kind, by=by, rmax=rmax, ax=ax, **kwargs
-    )
-
-
-def plot_windrose_df(
-    df,
-    kind="contour",
-    var_name=VAR_DEFAULT,
-    direction_name=DIR_DEFAULT,
-    by=None,
-    rmax=None,
-    ax=None,
-    **kwargs,
-):
-    """Plot windrose from a pandas DataFrame."""
-    var = df[var_name].values
-    direction = df[direction_name].values
-    return plot_windrose_np(
-        direction, var, kind=kind, by=by, rmax=rmax, ax=ax, **kwargs
-    )
-
-
-def plot_windrose_np(
-    direction,
-    var,
-    kind="contour",
-    clean_flag=True,
-    by=None,
-    rmax=None,
-    ax=None,
-    **kwargs,
-):
-    """Plot windrose from a numpy array."""
-    if kind in D_KIND_PLOT.keys():
-        f_plot = D_KIND_PLOT[kind]
-    else:
-        raise Exception(f"kind={kind!r} but it must be in {D_KIND_PLOT.keys()!r}")
-    # if f_clean is not None:
-    #     df = f_clean(df)
-    # var = df[var_name].values
-    # direction = df[direction_name].values
-    if clean_flag:
-        direction, var = clean(direction, var)
-    if by is None:
-        ax = f_plot(direction=direction, var=var, rmax=rmax, ax=ax, **kwargs)
-        if kind not in ["pdf"]:
-            ax.set_legend()
-        return ax
-    else:
-        raise NotImplementedError(
-            "'by' keyword not supported for now "
-            "https://github.com/scls19fr/windrose/issues/10",
-        )
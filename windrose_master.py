@@ -1,69 +1,96 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import base64
-from xlsxwriter import Workbook
-
-def convert_to_wind_direction(degrees):
-    directions = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE', 'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW', 'N']
-    index = np.round((degrees % 360) / 22.5).astype(int)
-    return np.array(directions)[index]
-
-def sort_wind_directions(directions):
-    """Mengurutkan arah mata angin dari utara ke selatan, timur ke barat."""
-    order = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE', 'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW']
-    return sorted(directions, key=lambda direction: order.index(direction))
-
-def calculate_wind_frequency(file_path):
-    try:
-        # Membaca file Excel dengan multiple sheets
-        xls = pd.ExcelFile(file_path)
-
-        # Membuat dictionary untuk menyimpan DataFrame setiap sheet
-        data_frames = {}
-
-        # Loop melalui setiap sheet
-        for sheet_name in xls.sheet_names:
-            # Membaca data di range kolom G11:I165
-            df = pd.read_excel(file_path, sheet_name=sheet_name, usecols="G:H", skiprows=9, nrows=155)
-            
-            # Menghapus nilai NaN dan non-finite
-            df_cleaned = df.dropna().replace([np.inf, -np.inf], np.nan)
-            
-            # Mengubah nilai ddd menjadi mata angin
-            df_cleaned['wind_direction'] = convert_to_wind_direction(df_cleaned['ddd'])
-            
-            data_frames[sheet_name] = df_cleaned
-
-        # Menghitung frekuensi mata angin berdasarkan kecepatan angin
-        frequency_tables = {}
-        for sheet_name, df_cleaned in data_frames.items():
-            # Menghitung range kecepatan angin secara dinamis
-            speed_bins = [0, 5, 10, 15, 20, 25, np.inf]
-            speed_labels = ['0-5 knot', '6-10 knot', '11-15 knot', '16-20 knot', '20-25 knot', '>25 knot']
-            frequency_table = df_cleaned.groupby(['wind_direction', pd.cut(df_cleaned['ff'], bins=speed_bins, labels=speed_labels)]).size().reset_index(name='frequency')
-     
-            # Menambah bar kosong untuk mata angin yang tidak memiliki nilai
-            order = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE', 'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW']
-            for direction in order:
-                if direction not in frequency_table['wind_direction'].tolist():
-                    frequency_table = frequency_table.append({'wind_direction': direction, 'ff': speed_labels[0], 'frequency': 0}, ignore_index=True)
-
-            # Mengurutkan bar berdasarkan arah mata angin
-            frequency_table['wind_direction'] = sort_wind_directions(frequency_table['wind_direction'])
-
-            frequency_tables[sheet_name] = frequency_table
-
-        return frequency_tables
-    except Exception as e:
-        st.error(f"Terjadi kesalahan: {str(e)}")
-
-
-def create_pivot_table(data_frame, bulan):
-    pivot_table = data_frame[bulan].pivot(index='ff', columns='wind_direction', values='frequency')
-    pivot_table_filled = pivot_table.fillna(0).astype(int)
-    return pivot_table_filled
+from plotly.colors import sequential
+
+from pibal_cache import cached
+from pibal_core import SPEED_BINS, SPEED_LABELS, direction_labels, frame_level_counts, long_table, pivot_table
+from pibal_figures import barpolar_figure
+from pibal_ingest import follow, ingest
+import pibal_timing
+from pibal_timing import span
+
+NSECTOR = 16
+DIRECTIONS = direction_labels(NSECTOR)
+
+# Workbook di-parsing per sheet di thread latar (pibal_ingest), sehingga
+# halaman tetap responsif dan bulan yang sudah selesai langsung bisa
+# ditampilkan. Bulan yang dipilih sebelum thread sampai ke sana di-parsing
+# langsung. Parsing dipakai bersama semua dashboard yang membuka file yang
+# sama, apa pun jumlah sektor dan kelas kecepatannya. Observasi disimpan di disk (pibal_store), sehingga
+# upload ulang file yang sama tidak perlu mem-parsing Excel lagi. Tabel
+# frekuensi dan figure di-cache berdasarkan hash isi file.
+
+@cached
+def calculate_month_frequency(file_path, bulan, nsector=NSECTOR, speed_bins=SPEED_BINS):
+    # Frekuensi kode sektor arah x kode kelas kecepatan, dari thread latar
+    # bila sheet ini sudah selesai. Kesalahan diteruskan ke pemanggil (dan
+    # tidak di-cache), yang menampilkannya dengan st.error
+    return ingest(file_path).frequency_table(bulan, nsector, speed_bins)
+
+@cached
+def calculate_wind_frequency(file_path, nsector=NSECTOR, speed_bins=SPEED_BINS):
+    # Tabel frekuensi semua bulan, mis. untuk export. Sheet yang tidak bisa
+    # dibaca (mis. sampul tanpa header ddd/ff) dilewati
+    job = ingest(file_path)
+    tables = {}
+    for bulan in job.sheet_names:
+        try:
+            tables[bulan] = calculate_month_frequency(file_path, bulan, nsector, speed_bins)
+        except Exception:
+            if bulan not in job.errors:
+                raise
+    return tables
+
+
+def create_pivot_table(table):
+    return pivot_table(table, DIRECTIONS, SPEED_LABELS)
+
+@cached
+def create_windrose_figure(file_path, bulan, nsector=NSECTOR, speed_bins=SPEED_BINS):
+    """Figure windrose satu bulan, di-cache per (hash file, bulan, binning).
+
+    Ganti bulan atau rerun memakai figure yang sudah jadi, tanpa membangun
+    ulang trace dan pemetaan warna.
+    """
+    table = calculate_month_frequency(file_path, bulan, nsector, speed_bins)
+    return barpolar_figure(table, direction_labels(nsector), SPEED_LABELS,
+                           colors=sequential.Rainbow_r)
+
+@cached
+def calculate_level_counts(file_path, bulan, nsector=NSECTOR, speed_bins=SPEED_BINS):
+    """Kubus frekuensi ketinggian x kelas kecepatan x sektor arah satu bulan.
+
+    Semua pasangan kolom ddd/ff (satu per ketinggian) dibaca sekali oleh
+    thread latar (atau dari pibal_store) dan dihitung sekaligus, sehingga
+    slider ketinggian hanya memilih irisan kubus.
+    """
+    df = ingest(file_path).frame(bulan)
+    return frame_level_counts(df, nsector, speed_bins)
+
+@cached
+def create_level_figure(file_path, bulan, level, nsector=NSECTOR, speed_bins=SPEED_BINS):
+    # Figure windrose satu ketinggian, diambil dari kubus yang sudah dihitung
+    levels, counts = calculate_level_counts(file_path, bulan, nsector, speed_bins)
+    table = long_table(counts[levels.index(level)])
+    return barpolar_figure(table, direction_labels(nsector), SPEED_LABELS,
+                           colors=sequential.Rainbow_r, title=f"Ketinggian {level} m")
+
+def show_progress(job):
+    """Progress parsing per bulan, diperbarui tanpa menjalankan ulang seluruh halaman."""
+    if job.done:
+        return
+
+    @st.fragment(run_every=0.5)
+    def progress():
+        st.progress(job.progress, text=f"Memproses workbook: {len(job.frames)}/{len(job.sheet_names)} bulan")
+        if job.frames:
+            st.caption("Selesai: " + ", ".join(bulan for bulan in job.sheet_names if bulan in job.frames))
+        if job.errors:
+            st.caption("Gagal dibaca: " + ", ".join(job.errors))
+        if job.done:
+            # Semua bulan selesai: jalankan ulang halaman sekali
+            st.rerun()
+
+    progress()
 
 def main():
     st.title("Wind Frequency Dashboard")
@@ -72,39 +99,58 @@ def main():
     uploaded_file = st.file_uploader("Upload an Excel file", type=["xlsx"])
 
     if uploaded_file is not None:
-        # Menghitung frekuensi angin
-        frequency_tables = calculate_wind_frequency(uploaded_file)
-        bulan = st.selectbox("Pilih Bulan", list(frequency_tables.keys()))
+        # Mulai (atau lanjutkan) parsing di thread latar; parsing file
+        # sebelumnya dihentikan bila pengguna meng-upload file lain, kecuali
+        # masih diikuti sesi lain yang membuka workbook yang sama
+        with span("ingest"):
+            job = follow(ingest(uploaded_file), st.session_state.get("ingestion"))
+        st.session_state["ingestion"] = job
+        show_progress(job)
+
+        # Daftar bulan diambil dari nama sheet, tanpa membaca data
+        bulan = st.selectbox("Pilih Bulan", job.sheet_names)
 
         if bulan:
-            # Menampilkan grafik untuk setiap sheet dalam file Excel sesuai bulan yang dipilih
-            table = frequency_tables[bulan]
-            st.subheader(f"Windrose Bulan: {bulan}")
-            fig = px.bar_polar(table, r="frequency", theta="wind_direction",
-                               color="ff",
-                               color_discrete_sequence=px.colors.sequential.Rainbow_r,
-                               start_angle=0,
-                               direction="clockwise"
-                              )
-            fig.update_layout(polar_angularaxis_rotation=90)
-            st.plotly_chart(fig)
-
-            # Menampilkan Pivot Table
-            #pivot_table = create_pivot_table(frequency_tables, bulan)
-            #st.subheader(f"Tabel Frekuensi Angin Bulan: {bulan}")
-            #st.dataframe(pivot_table)
+            # Sheet yang tidak bisa dibaca (mis. tanpa header ddd/ff) hanya
+            # menampilkan pesan kesalahan, seperti sebelumnya
+            try:
+                # Menampilkan grafik untuk setiap sheet dalam file Excel sesuai bulan yang dipilih
+                st.subheader(f"Windrose Bulan: {bulan}")
+                with span("levels"):
+                    levels, counts = calculate_level_counts(uploaded_file, bulan)
+                with span("figure"):
+                    if len(levels) > 1:
+                        # Workbook multi-ketinggian: slider memilih windrose dari kubus
+                        level = st.select_slider("Ketinggian (m)", options=levels)
+                        fig = create_level_figure(uploaded_file, bulan, level)
+                    else:
+                        fig = create_windrose_figure(uploaded_file, bulan)
+                with span("plotly_chart"):
+                    st.plotly_chart(fig)
+
+                # Menampilkan Pivot Table
+                #pivot_table = create_pivot_table(calculate_month_frequency(uploaded_file, bulan))
+                #st.subheader(f"Tabel Frekuensi Angin Bulan: {bulan}")
+                #st.dataframe(pivot_table)
             
-            # Menyimpan tabel pivot ke dalam file Excel
-            #pivot_table.to_excel("pivot_table.xlsx", index=True)
+                # Menyimpan tabel pivot ke dalam file Excel
+                #pivot_table.to_excel("pivot_table.xlsx", index=True)
             
-            # Menampilkan tombol unduh untuk file Excel
-            #st.download_button("Unduh Tabel Pivot (Excel)", "pivot_table.xlsx")
+                # Menampilkan tombol unduh untuk file Excel
+                #st.download_button("Unduh Tabel Pivot (Excel)", "pivot_table.xlsx")
             
-            # Menampilkan statistik deskriptif
-            #st.subheader("Statistik Deskriptif")
-            #st.write("Rata-rata:", pivot_table.mean().to_frame().T)
-            #st.write("Minimum:", pivot_table.min().to_frame().T)
-            #st.write("Maksimum:", pivot_table.max().to_frame().T)
+                # Menampilkan statistik deskriptif
+                #st.subheader("Statistik Deskriptif")
+                #st.write("Rata-rata:", pivot_table.mean().to_frame().T)
+                #st.write("Minimum:", pivot_table.min().to_frame().T)
+                #st.write("Maksimum:", pivot_table.max().to_frame().T)
+            except Exception as e:
+                st.error(f"Terjadi kesalahan: {str(e)}")
 
 if __name__ == "__main__":
-    main()
+    # Waktu (dan memori) tiap tahap dicatat ke log; panel di sidebar opsional
+    show_timings = pibal_timing.panel_enabled("Tampilkan waktu proses")
+    with pibal_timing.run("windrose_master", memory=show_timings) as timings:
+        main()
+    if show_timings:
+        pibal_timing.show_panel(timings)
@@ -0,0 +1,1257 @@
+"""Windrose axes and plotting functions for matplotlib.
+
+They are the plotting half of `windrose`, split from the histogram and
+cleaning core so that the core imports without matplotlib. `windrose` loads
+this module on first access to one of its names, e.g. ``windrose.wrbar``.
+"""
+
+import locale
+
+import matplotlib as mpl
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.projections.polar import PolarAxes
+
+from windrose import (
+    DIR_DEFAULT,
+    VAR_DEFAULT,
+    WindroseTable,
+    clean,
+    histogram,
+    histogram_by,
+    weibull_fit,
+    weibull_samples,
+    weibull_table,
+)
+
+ZBASE = -1000  # The starting zorder for all drawing, negative to have the grid on
+FIGSIZE_DEFAULT = (8, 8)
+DPI_DEFAULT = 80
+DEFAULT_THETA_LABELS = ["E", "N-E", "N", "N-W", "W", "S-W", "S", "S-E"]
+WEIBULL_RTOL = 1e-3  # agreement with scipy checked by WindAxes.pdf(check=True)
+
+
+def _figure(pyplot=True, **kwargs):
+    """
+    Create a new figure.
+
+    With pyplot=False, a bare :obj:`matplotlib.figure.Figure` attached to an
+    Agg canvas is returned instead of a pyplot figure. It is not registered
+    with pyplot, so it is garbage collected with its last reference and can be
+    built from any thread, e.g. in a web server.
+    """
+    if pyplot:
+        # pyplot picks and loads a GUI backend: only imported when used
+        import matplotlib.pyplot as plt
+
+        return plt.figure(**kwargs)
+    fig = Figure(**kwargs)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _copy_docstring(source):
+    """
+
+    Copy the docstring from another function.
+    Implemented according to: https://github.com/matplotlib/matplotlib/blob/b5ac96a8980fdb9e59c9fb649e0714d776e26701/lib/matplotlib/_docstring.py#L86-L92
+
+    """  # noqa: E501
+
+    def inner(target):
+        if source.__doc__ is not None:
+            target.__doc__ = source.__doc__
+        return target
+
+    return inner
+
+
+class WindAxesFactory:
+    """
+
+    Factory class to create WindroseAxes or WindAxes
+
+    """
+
+    @staticmethod
+    def create(typ, ax=None, *args, **kwargs):
+        """
+
+        Create
+
+        Mandatory:
+
+        Parameters
+        ----------
+        typ : string, 'windroseaxes' or 'windaxes'
+            Type of axes to create
+                * windroseaxes : a WindroseAxes axe
+                * windaxe : a WindAxes axe
+
+        ax : matplotlib.Axes, optional
+            A matplotlib axe
+
+        """
+        typ = typ.lower()
+        d = {"windroseaxes": WindroseAxes, "windaxes": WindAxes}
+        if typ in d.keys():
+            cls = d[typ]
+            if isinstance(ax, cls):
+                return ax
+            else:
+                ax = cls.from_ax(ax, *args, **kwargs)
+                return ax
+        else:
+            raise NotImplementedError(f"typ={typ!r} but it might be in {d.keys()}")
+
+
+class WindroseAxes(PolarAxes):
+    """
+
+    Create a windrose axes
+
+    """
+
+    name = "windrose"
+
+    def __init__(self, *args, **kwargs):
+        """
+        See Axes base class for args and kwargs documentation
+
+        Other kwargs are:
+
+        theta_labels : default ["E", "N-E", "N", "N-W", "W", "S-W", "S", "S-E"]
+            Labels for theta coordinate
+        """
+
+        # Uncomment to have the possibility to change the resolution directly
+        # when the instance is created
+        # self.RESOLUTION = kwargs.pop('resolution', 100)
+        self.rmax = kwargs.pop("rmax", None)
+        self.theta_labels = kwargs.pop("theta_labels", DEFAULT_THETA_LABELS)
+
+        PolarAxes.__init__(self, *args, **kwargs)
+        self.set_aspect("equal", adjustable="box", anchor="C")
+        self.radii_angle = 67.5
+        if not hasattr(self, "_info"):
+            # Axes.__init__ only calls the clear() override from matplotlib 3.6
+            self.clear()
+
+    @staticmethod
+    def from_ax(
+        ax=None,
+        fig=None,
+        rmax=None,
+        figsize=FIGSIZE_DEFAULT,
+        rect=None,
+        *args,
+        pyplot=True,
+        **kwargs,
+    ):
+        """
+        Return a WindroseAxes object for the figure `fig`.
+
+        If `fig` is None, a new figure is created, through pyplot unless
+        pyplot=False (see `_figure`).
+        """
+        if ax is None:
+            if fig is None:
+                fig = _figure(
+                    pyplot,
+                    figsize=figsize,
+                    dpi=DPI_DEFAULT,
+                    facecolor="w",
+                    edgecolor="w",
+                )
+            if rect is None:
+                rect = [0.1, 0.1, 0.8, 0.8]
+            ax = WindroseAxes(fig, rect, *args, **kwargs)
+            fig.add_axes(ax)
+            return ax
+        else:
+            return ax
+
+    def clear(self):
+        """
+        Clear the current axes
+        """
+        PolarAxes.clear(self)
+
+        self.theta_angles = np.arange(0, 360, 45)
+        self.set_thetagrids(angles=self.theta_angles, labels=self.theta_labels)
+
+        self._info = {"dir": [], "bins": [], "table": []}
+
+        self.patches_list = []
+
+        self.calm_count = None
+
+    def _colors(self, cmap, n):
+        """
+        Returns a list of n colors based on the colormap cmap
+
+        """
+        return [cmap(i) for i in np.linspace(0.0, 1.0, n)]
+
+    def set_radii_angle(self, **kwargs):
+        """
+        Set the radii labels angle
+        """
+
+        kwargs.pop("labels", None)
+        angle = kwargs.pop("angle", None)
+        if angle is None:
+            angle = self.radii_angle
+        self.radii_angle = angle
+        N = 5
+        rmax = self.get_rmax()
+        radii = np.linspace(0, rmax, N + 1)
+        if rmax % N == 0:
+            fmt = "%d"
+        else:
+            fmt = "%.1f"
+        radii_labels = [fmt % r for r in radii]
+        # radii_labels[0] = ""  # Removing label 0
+        self.set_rgrids(
+            radii=radii[1:], labels=radii_labels[1:], angle=self.radii_angle, **kwargs
+        )
+
+    def _update(self):
+        if not self.rmax:
+            self.rmax = np.max(np.sum(self._info["table"], axis=0))
+        calm_count = self.calm_count or 0
+        self.set_rmax(rmax=self.rmax + calm_count)
+        self.set_radii_angle(angle=self.radii_angle)
+
+    def legend(self, loc="lower left", decimal_places=1, units=None, **kwargs):
+        """
+        Sets the legend location and her properties.
+
+        Parameters
+        ----------
+        loc : int, string or pair of floats, default: 'lower left'
+            see :obj:`matplotlib.pyplot.legend`.
+
+        decimal_places : int, default 1
+            The decimal places of the formatted legend
+
+        units: str, default None
+
+        Other Parameters
+        ----------------
+        isaxes : boolean, default True
+            whether this is an axes legend
+        prop : FontProperties(size='smaller')
+            the font property
+        borderpad : float
+            the fractional whitespace inside the legend border
+        shadow : boolean
+            if True, draw a shadow behind legend
+        labelspacing : float, 0.005
+            the vertical space between the legend entries
+        handlelenght : float, 0.05
+            the length of the legend lines
+        handletextsep : float, 0.02
+            the space between the legend line and legend text
+        borderaxespad : float, 0.02
+            the border between the axes and legend edge
+        kwarg
+            Every other kwarg argument supported by
+            :obj:`matplotlib.pyplot.legend`
+        """
+
+        kwargs.pop("labels", None)
+        kwargs.pop("handles", None)
+
+        handles, labels = self._legend_entries(decimal_places, units)
+        self.legend_ = mpl.legend.Legend(self, handles, labels, loc=loc, **kwargs)
+        return self.legend_
+
+    def _legend_entries(self, decimal_places=1, units=None):
+        """Handles and labels of the legend of the speed bins"""
+
+        def get_handles():
+            handles = []
+            for p in self.patches_list:
+                if isinstance(p, mpl.patches.Polygon) or isinstance(
+                    p,
+                    mpl.patches.Rectangle,
+                ):
+                    color = p.get_facecolor()
+                elif isinstance(p, mpl.collections.PolyCollection):
+                    color = p.get_facecolor()[0]
+                elif isinstance(p, mpl.lines.Line2D):
+                    color = p.get_color()
+                else:
+                    raise AttributeError("Can't handle patches")
+                handles.append(
+                    mpl.patches.Rectangle(
+                        (0, 0),
+                        0.2,
+                        0.2,
+                        facecolor=color,
+                        edgecolor="black",
+                    ),
+                )
+            return handles
+
+        def get_labels(decimal_places=1, units=None):
+            digits = np.copy(self._info["bins"]).tolist()
+            if not digits:
+                return ""
+            digits[-1] = digits[-2]
+            digits = [f"{label:.{decimal_places}f}" for label in digits]
+            fmt = "[{} : {}"
+            if locale.getlocale()[0] in ["fr_FR"]:
+                fmt += "["
+            else:
+                fmt += ")"
+
+            if units:
+                fmt += " " + units
+
+            labels = [
+                fmt.format(digits[k], digits[k + 1]) for k in range(len(digits) - 1)
+            ]
+            labels[-1] = f">{digits[-1]}"
+            return labels
+
+        return get_handles(), get_labels(decimal_places, units)
+
+    def set_legend(self, **pyplot_arguments):
+        if "borderaxespad" not in pyplot_arguments:
+            pyplot_arguments["borderaxespad"] = -0.10
+        legend = self.legend(**pyplot_arguments)
+        for text in legend.get_texts():
+            text.set_fontsize(8)
+        return legend
+
+    def _init_plot(self, direction, var, **kwargs):
+        """
+        Internal method used by all plotting commands
+
+        Parameters
+        ----------
+        direction : 1D array or WindroseTable
+            directions the wind blows from, North centred, or a precomputed
+            table
+        var : 1D array, optional
+            values of the variable to compute. Typically the wind speeds.
+            Must be None when `direction` is a WindroseTable.
+
+        Other Parameters
+        ----------------
+        normed : boolean, default False
+        blowto : boolean, default False
+        colors : str or list of str, default None
+            The colors of the plot.
+        cmap : color map
+            A :obj:`matplotlib.cm` colormap for the plot.
+            Warning! It overrides `colors`.
+        weibull_factors : boolean, default False
+            If True, `var` holds one (scale, shape) pair of Weibull factors
+            per `direction` instead of samples.
+        mean_values : boolean, default False
+            If True, `var` holds one mean speed per `direction`, used as a
+            Weibull distribution of shape 2.
+        frequency : 1D array
+            frequency of each `direction`, mandatory with weibull_factors or
+            mean_values. Each one stands for ``frequency * WEIBULL_SAMPLES``
+            samples.
+        weibull_mode : {'sample', 'analytic'}, default 'sample'
+            With weibull_factors or mean_values, either draw the samples or
+            fill the table from the Weibull CDF at the bins edges, in which
+            case `bins` must be a sequence.
+        seed : int or numpy.random.Generator, default None
+            Seed of the samples drawn in 'sample' mode.
+        calm_limit : float, default None
+        kwarg
+            Any argument accepted by :obj:`matplotlib.pyplot.plot`.
+        """
+
+        if isinstance(direction, WindroseTable):
+            if var is not None:
+                raise TypeError("var must be None when direction is a WindroseTable")
+            bins, nsector = self._set_table(direction, kwargs)
+        else:
+            if var is None:
+                raise TypeError("var is required unless direction is a WindroseTable")
+            bins, nsector = self._compute_table(direction, var, kwargs)
+        nbins = len(bins)
+
+        # self.clear()
+        kwargs.pop("zorder", None)
+
+        # Sets the colors table based on the colormap or the "colors" argument
+        colors = kwargs.pop("colors", None)
+        cmap = kwargs.pop("cmap", None)
+        if colors is not None:
+            if isinstance(colors, str):
+                colors = [colors] * nbins
+            if isinstance(colors, (tuple, list)):
+                if len(colors) != nbins:
+                    raise ValueError("colors and bins must have same length")
+        else:
+            if cmap is None:
+                cmap = mpl.colormaps[mpl.rcParams["image.cmap"]]
+            colors = self._colors(cmap, nbins)
+
+        # Building the angles list
+        angles = np.arange(0, -2 * np.pi, -2 * np.pi / nsector) + np.pi / 2
+
+        return bins, nbins, nsector, colors, angles, kwargs
+
+    def _set_table(self, table, kwargs):
+        """
+        Use a precomputed WindroseTable as the table of `_init_plot`
+        """
+        for key in ("bins", "nsector", "blowto", "calm_limit", "frequency"):
+            if key in kwargs:
+                raise TypeError(f"{key} is fixed by the WindroseTable")
+        for key in ("weibull_factors", "mean_values"):
+            if key in kwargs:
+                raise TypeError(f"cannot specify {key} with a WindroseTable")
+        normed = kwargs.pop("normed", False)
+
+        self._info["dir"] = table.dir_edges
+        self._info["bins"] = table.var_bins
+        self._info["table"] = table.normed() if normed else table.table
+        if table.calm_limit is not None:
+            self.calm_count = table.calm_count
+            if normed and table.total:
+                self.calm_count = table.calm_count * 100 / table.total
+        return table.bins, table.nsector
+
+    def _compute_table(self, direction, var, kwargs):
+        """
+        Compute the table of `_init_plot` from the direction and var samples
+        """
+        normed = kwargs.pop("normed", False)
+        blowto = kwargs.pop("blowto", False)
+        weibull_mode = kwargs.pop("weibull_mode", "sample")
+        seed = kwargs.pop("seed", None)
+
+        # Calm condition, mask data if needed
+        calm_limit = kwargs.pop("calm_limit", None)
+        total = len(var)
+        if calm_limit is not None:
+            mask = var > calm_limit
+            self.calm_count = len(var) - np.count_nonzero(mask)
+            if normed and len(var):
+                self.calm_count = self.calm_count * 100 / len(var)
+            var = var[mask]
+            direction = direction[mask]
+
+        # if weibull factors are entered overwrite direction and var, or keep
+        # the factors to compute the table analytically
+        weibull = None
+        if "weibull_factors" in kwargs or "mean_values" in kwargs:
+            if "weibull_factors" in kwargs and "mean_values" in kwargs:
+                raise TypeError("cannot specify both weibull_factors and mean_values")
+            statistic_type = "unset"
+            if "weibull_factors" in kwargs:
+                statistic_type = "weibull"
+                val = kwargs.pop("weibull_factors")
+            elif "mean_values" in kwargs:
+                statistic_type = "mean"
+                val = kwargs.pop("mean_values")
+            if val:
+                if "frequency" not in kwargs:
+                    raise TypeError(
+                        "specify 'frequency' argument for statistical input",
+                    )
+                windFrequencies = kwargs.pop("frequency")
+                if len(windFrequencies) != len(direction) or len(direction) != len(var):
+                    if len(windFrequencies) != len(direction):
+                        raise TypeError("len(frequency) != len(direction)")
+                    elif len(direction) != len(var):
+                        raise TypeError("len(frequency) != len(direction)")
+                if statistic_type == "weibull":
+                    factors = np.asarray(var, dtype=float)
+                    scale, shape = factors[:, 0], factors[:, 1]
+                elif statistic_type == "mean":
+                    scale = np.asarray(var, dtype=float) * 2 / np.sqrt(np.pi)
+                    shape = np.full(len(scale), 2.0)
+                if weibull_mode == "sample":
+                    direction, var = weibull_samples(
+                        direction, scale, shape, windFrequencies, seed=seed
+                    )
+                    total = len(var)
+                elif weibull_mode == "analytic":
+                    weibull = (direction, scale, shape, windFrequencies)
+                else:
+                    raise ValueError(
+                        f"weibull_mode={weibull_mode!r} but it must be 'sample' "
+                        "or 'analytic'"
+                    )
+
+        # Init of the bins array if not set
+        bins = kwargs.pop("bins", None)
+        if weibull is not None and (bins is None or isinstance(bins, int)):
+            raise ValueError("bins must be given as a sequence in analytic mode")
+        if bins is None:
+            bins = np.linspace(np.min(var), np.max(var), 6)
+        if isinstance(bins, int):
+            bins = np.linspace(np.min(var), np.max(var), bins)
+        bins = np.asarray(bins)
+
+        # Number of sectors
+        nsector = kwargs.pop("nsector", None)
+        if nsector is None:
+            nsector = 16
+
+        # Set the global information dictionary
+        if weibull is not None:
+            self._info["dir"], self._info["bins"], self._info["table"] = weibull_table(
+                *weibull, bins, nsector, normed, blowto
+            )
+        else:
+            self._info["dir"], self._info["bins"], self._info["table"] = histogram(
+                direction,
+                var,
+                bins,
+                nsector,
+                normed,
+                blowto,
+                total,
+            )
+
+        return bins, nsector
+
+    def _calm_circle(self):
+        """Draw the calm centered circle"""
+        if self.calm_count and self.calm_count > 0:
+            self.set_rorigin(-(np.sqrt(self.calm_count / np.pi)))
+
+    def contour(self, direction, var=None, **kwargs):
+        """
+        Plot a windrose in linear mode. For each var bins, a line will be
+        draw on the axes, a segment between each sector (center to center).
+        Each line can be formatted (color, width, ...) like with standard plot
+        pylab command.
+
+        Parameters
+        ----------
+        direction : 1D array or WindroseTable
+            directions the wind blows from, North centred, or a precomputed
+            WindroseTable, in which case nsector, bins, blowto and calm_limit
+            are taken from the table
+        var : 1D array, optional
+            values of the variable to compute. Typically the wind speeds.
+            Must be None when `direction` is a WindroseTable.
+
+        Other Parameters
+        ----------------
+        nsector : integer, optional
+            number of sectors used to compute the windrose table. If not set,
+            nsector=16, then each sector will be 360/16=22.5°, and the
+            resulting computed table will be aligned with the cardinals points.
+        bins : 1D array or integer, optional
+            number of bins, or a sequence of bins variable. If not set, bins=6,
+            then bins=linspace(min(var), max(var), 6)
+        blowto : bool, optional
+            If True, the windrose will be pi rotated, to show where the wind
+            blow to (useful for pollutant rose).
+        colors : string or tuple, optional
+            one string color ('k' or 'black'), in this case all bins will be
+            plotted in this color; a tuple of matplotlib color args (string,
+            float, rgb, etc), different levels will be plotted in different
+            colors in the order specified.
+        cmap : a cm Colormap instance from :obj:`matplotlib.cm`, optional
+            if cmap == None and colors == None, a default Colormap is used.
+        calm_limit : float, optional
+            Calm limit for the var parameter. If not None, a centered red
+            circle will be draw for representing the calms occurrences and all
+            data below this value will be removed from the computation.
+
+        others kwargs
+            Any supported argument of :obj:`matplotlib.pyplot.plot`
+
+        """
+        bins, nbins, nsector, colors, angles, kwargs = self._init_plot(
+            direction, var, **kwargs
+        )
+
+        # closing lines
+        angles = np.hstack((angles, angles[-1] - 2 * np.pi / nsector))
+        vals = np.hstack(
+            (
+                self._info["table"],
+                np.reshape(
+                    self._info["table"][:, 0],
+                    (self._info["table"].shape[0], 1),
+                ),
+            ),
+        )
+
+        self._calm_circle()
+        origin = 0
+        for i in range(nbins):
+            val = vals[i, :] + origin
+            origin += vals[i, :]
+            zorder = ZBASE + nbins - i
+            patch = self.plot(angles, val, color=colors[i], zorder=zorder, **kwargs)
+            self.patches_list.extend(patch)
+        self._update()
+
+    def contourf(self, direction, var=None, **kwargs):
+        """
+        Plot a windrose in filled mode. For each var bins, a line will be
+        draw on the axes, a segment between each sector (center to center).
+        Each line can be formatted (color, width, ...) like with standard plot
+        pylab command.
+
+        Parameters
+        ----------
+        direction : 1D array or WindroseTable
+            directions the wind blows from, North centred, or a precomputed
+            WindroseTable, in which case nsector, bins, blowto and calm_limit
+            are taken from the table
+        var : 1D array, optional
+            values of the variable to compute. Typically the wind speeds.
+            Must be None when `direction` is a WindroseTable.
+
+        Other Parameters
+        ----------------
+        nsector: integer, optional
+            number of sectors used to compute the windrose table. If not set,
+            nsector=16, then each sector will be 360/16=22.5°, and the
+            resulting computed table will be aligned with the cardinals points.
+        bins : 1D array or integer, optional
+            number of bins, or a sequence of bins variable. If not set, bins=6,
+            then bins=linspace(min(`var`), max(`var`), 6)
+        blowto : bool, optional
+            If True, the windrose will be pi rotated, to show where the wind
+            blow to (useful for pollutant rose).
+        colors : string or tuple, optional
+            one string color ('k' or 'black'), in this case all bins will be
+            plotted in this color; a tuple of matplotlib color args (string,
+            float, rgb, etc), different levels will be plotted in different
+            colors in the order specified.
+        cmap : a cm Colormap instance from :obj:`matplotlib.cm`, optional
+            if cmap == None and colors == None, a default Colormap is used.
+        calm_limit : float, optional
+            Calm limit for the var parameter. If not None, a centered red
+            circle will be draw for representing the calms occurrences and all
+            data below this value will be removed from the computation.
+
+        others kwargs
+            Any supported argument of :obj:`matplotlib.pyplot.plot`
+        """
+
+        bins, nbins, nsector, colors, angles, kwargs = self._init_plot(
+            direction, var, **kwargs
+        )
+        kwargs.pop("facecolor", None)
+        kwargs.pop("edgecolor", None)
+
+        # closing lines
+        angles = np.hstack((angles, angles[-1] - 2 * np.pi / nsector))
+        vals = np.hstack(
+            (
+                self._info["table"],
+                np.reshape(
+                    self._info["table"][:, 0],
+                    (self._info["table"].shape[0], 1),
+                ),
+            ),
+        )
+        self._calm_circle()
+        origin = 0
+        for i in range(nbins):
+            val = vals[i, :] + origin
+            origin += vals[i, :]
+            zorder = ZBASE + nbins - i
+            patch = self.fill(
+                np.append(angles, 0),
+                np.append(val, 0),
+                facecolor=colors[i],
+                edgecolor=colors[i],
+                zorder=zorder,
+                **kwargs,
+            )
+            self.patches_list.extend(patch)
+        self._update()
+
+    def bar(self, direction, var=None, **kwargs):
+        """
+        Plot a windrose in bar mode. For each var bins and for each sector,
+        a colored bar will be draw on the axes.
+
+        Parameters
+        ----------
+        direction : 1D array or WindroseTable
+            directions the wind blows from, North centred, or a precomputed
+            WindroseTable, in which case nsector, bins, blowto and calm_limit
+            are taken from the table
+        var : 1D array, optional
+            values of the variable to compute. Typically the wind speeds.
+            Must be None when `direction` is a WindroseTable.
+
+        Other Parameters
+        ----------------
+        nsector : integer, optional
+            number of sectors used to compute the windrose table. If not set,
+            nsector=16, then each sector will be 360/16=22.5°, and the
+            resulting computed table will be aligned with the cardinals points.
+        bins : 1D array or integer, optional
+            number of bins, or a sequence of bins variable. If not set, bins=6
+            between min(`var`) and max(`var`).
+        blowto : bool, optional.
+            if True, the windrose will be pi rotated, to show where the wind
+            blow to (useful for pollutant rose).
+        colors : string or tuple, optional
+            one string color ('k' or 'black'), in this case all bins will be
+            plotted in this color; a tuple of matplotlib color args (string,
+            float, rgb, etc), different levels will be plotted
+            in different colors in the order specified.
+        cmap : a cm Colormap instance from :obj:`matplotlib.cm`, optional.
+            if cmap == None and colors == None, a default Colormap is used.
+        edgecolor : string, optional
+            The string color each edge box will be plotted.
+            Default : no edgecolor
+        opening : float, optional
+            between 0.0 and 1.0, to control the space between each sector (1.0
+            for no space)
+        calm_limit : float, optional
+            Calm limit for the var parameter. If not None, a centered red
+            circle will be draw for representing the calms occurrences and all
+            data below this value will be removed from the computation.
+        collection : bool, optional
+            If True, each var bin is drawn as a single
+            :obj:`matplotlib.collections.PolyCollection` holding all of its
+            sectors instead of one Rectangle patch per sector and bin.
+            Much faster to draw for large nsector or many bins.
+            Default : False
+
+        """
+
+        bins, nbins, nsector, colors, angles, kwargs = self._init_plot(
+            direction, var, **kwargs
+        )
+        kwargs.pop("facecolor", None)
+        edgecolor = kwargs.pop("edgecolor", None)
+        if edgecolor is not None:
+            if not isinstance(edgecolor, str):
+                raise ValueError("edgecolor must be a string color")
+        opening = kwargs.pop("opening", None)
+        if opening is None:
+            opening = 0.8
+        dtheta = 2 * np.pi / nsector
+        opening = dtheta * opening
+
+        collection = kwargs.pop("collection", False)
+
+        self._calm_circle()
+
+        if collection:
+            self._bar_collections(angles, opening, colors, edgecolor, **kwargs)
+            self._update()
+            return
+
+        for j in range(nsector):
+            origin = 0
+            for i in range(nbins):
+                if i > 0:
+                    origin += self._info["table"][i - 1, j]
+                val = self._info["table"][i, j]
+                zorder = ZBASE + nbins - i
+                patch = mpl.patches.Rectangle(
+                    (angles[j] - opening / 2, origin),
+                    opening,
+                    val,
+                    facecolor=colors[i],
+                    edgecolor=edgecolor,
+                    zorder=zorder,
+                    **kwargs,
+                )
+                self.add_patch(patch)
+                if j == 0:
+                    self.patches_list.append(patch)
+        self._update()
+
+    def _bar_collections(self, angles, opening, colors, edgecolor, **kwargs):
+        """
+        Draw the stacked bars of `bar` and `box` with one PolyCollection per
+        var bin.
+
+        The radial offsets of every (bin, sector) cell come from a single
+        cumulative sum over the table. `opening` is either a scalar or one
+        width per bin.
+        """
+        table = self._info["table"]
+        nbins = table.shape[0]
+        top = np.cumsum(table, axis=0)
+        bottom = top - table
+        opening = np.broadcast_to(np.asarray(opening, dtype=float), (nbins,))
+        for i in range(nbins):
+            left = angles - opening[i] / 2
+            right = angles + opening[i] / 2
+            # Same vertex order as a Rectangle path: (x0, y0), (x1, y0),
+            # (x1, y1), (x0, y1)
+            verts = np.empty((len(angles), 4, 2))
+            verts[:, 0, 0] = verts[:, 3, 0] = left
+            verts[:, 1, 0] = verts[:, 2, 0] = right
+            verts[:, 0, 1] = verts[:, 1, 1] = bottom[i]
+            verts[:, 2, 1] = verts[:, 3, 1] = top[i]
+            coll = mpl.collections.PolyCollection(
+                verts,
+                closed=True,
+                facecolor=colors[i],
+                edgecolor=edgecolor,
+                zorder=ZBASE + nbins - i,
+                **kwargs,
+            )
+            self.add_collection(coll)
+            self.patches_list.append(coll)
+
+    def box(self, direction, var=None, **kwargs):
+        """
+        Plot a windrose in proportional box mode. For each var bins and for
+        each sector, a colored box will be draw on the axes.
+
+        Parameters
+        ----------
+        direction : 1D array or WindroseTable
+            directions the wind blows from, North centred, or a precomputed
+            WindroseTable, in which case nsector, bins, blowto and calm_limit
+            are taken from the table
+        var : 1D array, optional
+            values of the variable to compute. Typically the wind speeds.
+            Must be None when `direction` is a WindroseTable.
+
+        Other Parameters
+        ----------------
+        nsector: integer, optional
+            number of sectors used to compute the windrose table. If not set,
+            nsector=16, then each sector will be 360/16=22.5°, and the
+            resulting computed table will be aligned with the cardinals points.
+        bins : 1D array or integer, optional
+            number of bins, or a sequence of bins variable. If not set, bins=6
+            between min(`var`) and max(`var`).
+        blowto : bool, optional
+            If True, the windrose will be pi rotated, to show where the wind
+            blow to (useful for pollutant rose).
+        colors : string or tuple, optional
+            one string color ('k' or 'black'), in this case all bins will be
+            plotted in this color; a tuple of matplotlib color args (string,
+            float, rgb, etc), different levels will be plotted in different
+            colors in the order specified.
+        cmap : a cm Colormap instance from :obj:`matplotlib.cm`, optional
+            if cmap == None and colors == None, a default Colormap is used.
+        edgecolor : string, optional
+            The string color each edge bar will be plotted.  Default : no
+            edgecolor
+        calm_limit : float, optional
+            Calm limit for the var parameter. If not None, a centered red
+            circle will be draw for representing the calms occurrences and all
+            data below this value will be removed from the computation.
+        collection : bool, optional
+            If True, each var bin is drawn as a single
+            :obj:`matplotlib.collections.PolyCollection`, see :meth:`bar`.
+            Default : False
+
+        """
+
+        bins, nbins, nsector, colors, angles, kwargs = self._init_plot(
+            direction, var, **kwargs
+        )
+        kwargs.pop("facecolor", None)
+        edgecolor = kwargs.pop("edgecolor", None)
+        if edgecolor is not None:
+            if not isinstance(edgecolor, str):
+                raise ValueError("edgecolor must be a string color")
+        opening = np.linspace(0.0, np.pi / 16, nbins)
+        collection = kwargs.pop("collection", False)
+
+        self._calm_circle()
+
+        if collection:
+            self._bar_collections(angles, opening, colors, edgecolor, **kwargs)
+            self._update()
+            return
+
+        for j in range(nsector):
+            origin = 0
+            for i in range(nbins):
+                if i > 0:
+                    origin += self._info["table"][i - 1, j]
+                val = self._info["table"][i, j]
+                zorder = ZBASE + nbins - i
+                patch = mpl.patches.Rectangle(
+                    (angles[j] - opening[i] / 2, origin),
+                    opening[i],
+                    val,
+                    facecolor=colors[i],
+                    edgecolor=edgecolor,
+                    zorder=zorder,
+                    **kwargs,
+                )
+                self.add_patch(patch)
+                if j == 0:
+                    self.patches_list.append(patch)
+        self._update()
+
+
+class WindAxes(mpl.axes.Subplot):
+    def __init__(self, *args, **kwargs):
+        """
+        See Axes base class for args and kwargs documentation
+        """
+        super().__init__(*args, **kwargs)
+
+    @staticmethod
+    def from_ax(
+        ax=None, fig=None, figsize=FIGSIZE_DEFAULT, *args, pyplot=True, **kwargs
+    ):
+        """
+        Return a WindAxes object for the figure `fig`, created like in
+        `WindroseAxes.from_ax` if None.
+        """
+        if ax is None:
+            if fig is None:
+                fig = _figure(pyplot, figsize=figsize, dpi=DPI_DEFAULT)
+            ax = WindAxes(fig, 1, 1, 1, *args, **kwargs)
+            fig.add_axes(ax)
+            return ax
+        else:
+            return ax
+
+    def pdf(
+        self,
+        var,
+        bins=None,
+        Nx=100,
+        bar_color="b",
+        plot_color="g",
+        Nbins=10,
+        *args,
+        check=False,
+        **kwargs,
+    ):
+        """
+        Draw probability density function and return Weibull distribution
+        parameters
+
+        The parameters ``(1, shape, 0, scale)`` are the ones of
+        ``scipy.stats.exponweib``, fitted with `weibull_fit`. With
+        ``check=True``, they are checked against
+        ``scipy.stats.exponweib.fit(var, floc=0, f0=1)``, which needs scipy.
+        """
+        if bins is None:
+            bins = np.linspace(0, np.max(var), Nbins)
+        hist, bins = np.histogram(var, bins=bins, density=True)
+        width = 0.7 * (bins[1] - bins[0])
+        center = (bins[:-1] + bins[1:]) / 2
+        self.bar(center, hist, align="center", width=width, color=bar_color)
+        (shape,), (scale,) = weibull_fit(var)
+        params = (1, float(shape), 0, float(scale))
+        if check:
+            import scipy.stats
+
+            var = np.asarray(var, dtype=float)
+            reference = scipy.stats.exponweib.fit(var[var > 0], floc=0, f0=1)
+            np.testing.assert_allclose(params, reference, rtol=WEIBULL_RTOL)
+        x = np.linspace(0, bins[-1], Nx)
+        with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+            density = (
+                shape
+                / scale
+                * (x / scale) ** (shape - 1)
+                * np.exp(-((x / scale) ** shape))
+            )
+        self.plot(x, density, color=plot_color)
+        return (self, params)
+
+
+@_copy_docstring(WindroseAxes.contour)
+def wrcontour(
+    direction,
+    var=None,
+    ax=None,
+    rmax=None,
+    figsize=FIGSIZE_DEFAULT,
+    pyplot=True,
+    **kwargs,
+):
+    """
+    Draw contour probability density function and return Weibull
+    distribution parameters.
+    """
+    ax = WindroseAxes.from_ax(ax, rmax=rmax, figsize=figsize, pyplot=pyplot)
+    ax.contour(direction, var, **kwargs)
+    ax.set_legend()
+    return ax
+
+
+@_copy_docstring(WindroseAxes.contourf)
+def wrcontourf(
+    direction,
+    var=None,
+    ax=None,
+    rmax=None,
+    figsize=FIGSIZE_DEFAULT,
+    pyplot=True,
+    **kwargs,
+):
+    ax = WindroseAxes.from_ax(ax, rmax=rmax, figsize=figsize, pyplot=pyplot)
+    ax.contourf(direction, var, **kwargs)
+    ax.set_legend()
+    return ax
+
+
+@_copy_docstring(WindroseAxes.box)
+def wrbox(
+    direction,
+    var=None,
+    ax=None,
+    rmax=None,
+    figsize=FIGSIZE_DEFAULT,
+    pyplot=True,
+    **kwargs,
+):
+    ax = WindroseAxes.from_ax(ax, rmax=rmax, figsize=figsize, pyplot=pyplot)
+    ax.box(direction, var, **kwargs)
+    ax.set_legend()
+    return ax
+
+
+@_copy_docstring(WindroseAxes.bar)
+def wrbar(
+    direction,
+    var=None,
+    ax=None,
+    rmax=None,
+    figsize=FIGSIZE_DEFAULT,
+    pyplot=True,
+    **kwargs,
+):
+    ax = WindroseAxes.from_ax(ax, rmax=rmax, figsize=figsize, pyplot=pyplot)
+    ax.bar(direction, var, **kwargs)
+    ax.set_legend()
+    return ax
+
+
+@_copy_docstring(WindAxes.pdf)
+def wrpdf(
+    var,
+    bins=None,
+    Nx=100,
+    bar_color="b",
+    plot_color="g",
+    Nbins=10,
+    ax=None,
+    rmax=None,
+    figsize=FIGSIZE_DEFAULT,
+    *args,
+    pyplot=True,
+    **kwargs,
+):
+    """
+    Draw probability density function and return Weitbull distribution
+    parameters
+    """
+    ax = WindAxes.from_ax(ax, figsize=figsize, pyplot=pyplot)
+    ax, params = ax.pdf(var, bins, Nx, bar_color, plot_color, Nbins, *args, **kwargs)
+    return (ax, params)
+
+
+def wrscatter(
+    direction,
+    var,
+    ax=None,
+    rmax=None,
+    figsize=FIGSIZE_DEFAULT,
+    *args,
+    pyplot=True,
+    **kwargs,
+):
+    """
+    Draw scatter plot
+    """
+    ax = WindroseAxes.from_ax(ax, rmax=rmax, figsize=figsize, pyplot=pyplot)
+    direction = -np.array(direction) + np.radians(90)
+    ax.scatter(direction, var, *args, **kwargs)
+    return ax
+
+
+D_KIND_PLOT = {
+    "contour": wrcontour,
+    "contourf": wrcontourf,
+    "box": wrbox,
+    "bar": wrbar,
+    "pdf": wrpdf,
+    "scatter": wrscatter,
+}
+
+
+def plot_windrose(
+    direction_or_df,
+    var=None,
+    kind="contour",
+    var_name=VAR_DEFAULT,
+    direction_name=DIR_DEFAULT,
+    by=None,
+    rmax=None,
+    ax=None,
+    **kwargs,
+):
+    """Plot windrose from a pandas DataFrame or a numpy array."""
+    if var is None:
+        # Assuming direction_or_df is a DataFrame
+        df = direction_or_df
+        var = df[var_name].values
+        direction = df[direction_name].values
+        if isinstance(by, str):
+            by = df[by].values
+    else:
+        direction = direction_or_df
+    return plot_windrose_np(
+        direction, var, kind=kind, by=by, rmax=rmax, ax=ax, **kwargs
+    )
+
+
+def plot_windrose_df(
+    df,
+    kind="contour",
+    var_name=VAR_DEFAULT,
+    direction_name=DIR_DEFAULT,
+    by=None,
+    rmax=None,
+    ax=None,
+    **kwargs,
+):
+    """Plot windrose from a pandas DataFrame."""
+    var = df[var_name].values
+    direction = df[direction_name].values
+    if isinstance(by, str):
+        by = df[by].values
+    return plot_windrose_np(
+        direction, var, kind=kind, by=by, rmax=rmax, ax=ax, **kwargs
+    )
+
+
+def plot_windrose_np(
+    direction,
+    var,
+    kind="contour",
+    clean_flag=True,
+    by=None,
+    rmax=None,
+    ax=None,
+    **kwargs,
+):
+    """
+    Plot windrose from a numpy array.
+
+    With `by`, an array giving the group of each sample, one windrose per
+    group is drawn on a grid of WindroseAxes sharing the same bins, colors
+    and radial scale, and a dict of the axes by group is returned. The tables
+    of all groups come from a single `histogram_by` pass.
+    """
+    if kind in D_KIND_PLOT.keys():
+        f_plot = D_KIND_PLOT[kind]
+    else:
+        raise Exception(f"kind={kind!r} but it must be in {D_KIND_PLOT.keys()!r}")
+    # if f_clean is not None:
+    #     df = f_clean(df)
+    # var = df[var_name].values
+    # direction = df[direction_name].values
+    if by is not None:
+        by = np.asarray(by)
+        if len(by) != len(var):
+            raise ValueError("by and var must have same length")
+    if clean_flag:
+        if by is None:
+            direction, var = clean(direction, var)
+        else:
+            direction, var, by = clean(direction, var, index=by)
+    if by is None:
+        ax = f_plot(direction=direction, var=var, rmax=rmax, ax=ax, **kwargs)
+        if kind not in ["pdf"]:
+            ax.set_legend()
+        return ax
+    elif kind in ["pdf", "scatter"]:
+        raise NotImplementedError(f"'by' keyword not supported for kind={kind!r}")
+    elif ax is not None:
+        raise ValueError("ax cannot be given with 'by', a figure is created")
+    else:
+        return _plot_windrose_by(direction, var, by, kind, rmax=rmax, **kwargs)
+
+
+def _plot_windrose_by(
+    direction,
+    var,
+    by,
+    kind,
+    rmax=None,
+    ncols=None,
+    figsize=None,
+    pyplot=True,
+    **kwargs,
+):
+    """
+    Draw one windrose per group of `by` on a grid of WindroseAxes, with a
+    single legend for the whole figure.
+    """
+    if len(var) == 0:
+        raise ValueError("no samples to draw, e.g. all were removed by clean")
+    bins = kwargs.pop("bins", None)
+    if bins is None:
+        bins = np.linspace(np.min(var), np.max(var), 6)
+    if isinstance(bins, int):
+        bins = np.linspace(np.min(var), np.max(var), bins)
+    nsector = kwargs.pop("nsector", None)
+    if nsector is None:
+        nsector = 16
+    tables = histogram_by(
+        direction,
+        var,
+        by,
+        bins,
+        nsector,
+        blowto=kwargs.pop("blowto", False),
+        calm_limit=kwargs.pop("calm_limit", None),
+    )
+
+    # One radial scale for all the groups
+    if rmax is None:
+        normed = kwargs.get("normed", False)
+        rmax = max(
+            np.max(np.sum(t.normed() if normed else t.table, axis=0))
+            for t in tables.values()
+        )
+
+    if ncols is None:
+        ncols = int(np.ceil(np.sqrt(len(tables))))
+    nrows = int(np.ceil(len(tables) / ncols))
+    if figsize is None:
+        figsize = (3 * ncols, 3 * nrows + 0.4)
+    bottom = 0.4 / figsize[1]  # room for the legend
+    fig = _figure(
+        pyplot, figsize=figsize, dpi=DPI_DEFAULT, facecolor="w", edgecolor="w"
+    )
+    if kind in ["bar", "box"]:
+        kwargs.setdefault("collection", True)
+
+    axes = {}
+    for k, (key, table) in enumerate(tables.items()):
+        row, col = divmod(k, ncols)
+        rect = [
+            (col + 0.1) / ncols,
+            bottom + (1 - bottom) * (1 - (row + 0.9) / nrows),
+            0.8 / ncols,
+            0.8 * (1 - bottom) / nrows,
+        ]
+        ax = WindroseAxes(fig, rect, rmax=rmax)
+        fig.add_axes(ax)
+        getattr(ax, kind)(table, **kwargs)
+        ax.set_title(str(key), loc="left")
+        axes[key] = ax
+    # the bins and colors are shared: one legend below the grid
+    handles, labels = ax._legend_entries()
+    fig.legend(
+        handles, labels, loc="lower center", ncol=len(labels), fontsize=8, frameon=False
+    )
+    return axes
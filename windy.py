@@ -1,32 +1,29 @@
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import streamlit as st
-
-def convert_to_wind_direction(degrees):
-    directions = ['N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW', 'N']
-    index = np.round((degrees % 360) / 45).astype(int)
-    return np.array(directions)[index]
+import glob
+import os
 
-def sort_wind_directions(directions):
-    order = ['N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW']
-    return sorted(directions, key=lambda direction: order.index(direction))
+import streamlit as st
+from plotly.colors import sequential
+
+from pibal_core import SPEED_BINS, SPEED_LABELS, clean, direction_labels, pivot_table
+from pibal_core import frequency_table as core_frequency_table
+from pibal_cache import CACHE
+from pibal_climatology import Climatology
+from pibal_figures import barpolar_figure
+from pibal_io import MONTHS, LazyWorkbook, sheet_names
+import pibal_timing
+from pibal_timing import span
+
+NSECTOR = 8
+DIRECTIONS = direction_labels(NSECTOR)
+# The Climatology page only reads workbooks below this directory
+ARCHIVE_DIR = os.path.realpath(os.environ.get("PIBAL_ARCHIVE_DIR", "."))
 
 def calculate_wind_frequency(df):
     try:
-        df_cleaned = df.dropna().replace([np.inf, -np.inf], np.nan)
-        df_cleaned.columns = [col.split('.')[0] for col in df_cleaned.columns]  # Remove suffix after dot in column names
-        df_cleaned['wind_direction'] = convert_to_wind_direction(df_cleaned['ddd'])
+        df = df.rename(columns=lambda col: col.split('.')[0])  # Remove suffix after dot in column names
 
         # Calculate wind frequency based on wind speed
-        speed_bins = [0, 5, 10, 15, 20, 25, np.inf]
-        speed_labels = ['0-5 knot', '6-10 knot', '11-15 knot', '16-20 knot', '20-25 knot', '>25 knot']
-        frequency_table = df_cleaned.groupby(['wind_direction', pd.cut(df_cleaned['ff'], bins=speed_bins, labels=speed_labels)]).size().reset_index(name='frequency')
-        order = ['N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW']
-        empty_directions = [direction for direction in order if direction not in frequency_table['wind_direction'].tolist()]
-        empty_rows = pd.DataFrame({'wind_direction': empty_directions, 'ff': speed_labels[0], 'frequency': 0})
-        frequency_table = pd.concat([frequency_table, empty_rows], ignore_index=True)
-        frequency_table['wind_direction'] = sort_wind_directions(frequency_table['wind_direction'])
+        frequency_table = core_frequency_table(clean(df), NSECTOR, SPEED_BINS)
 
         # Convert frequency to percentage
         total_count = frequency_table['frequency'].sum()
@@ -36,57 +33,119 @@ def calculate_wind_frequency(df):
     except Exception as e:
         st.error(f"An error occurred: {str(e)}")
 
+def create_pivot_table(table):
+    return pivot_table(table, DIRECTIONS, SPEED_LABELS)
+
+def plot_windrose(table):
+    with span("figure"):
+        fig = barpolar_figure(table, DIRECTIONS, SPEED_LABELS, values="percentage",
+                              colors=sequential.Rainbow_r)
+    with span("plotly_chart"):
+        st.plotly_chart(fig)
+
+def archive_directory(directory):
+    # The directory below ARCHIVE_DIR, or None if it resolves outside of it
+    path = os.path.realpath(os.path.join(ARCHIVE_DIR, directory))
+    if os.path.commonpath([ARCHIVE_DIR, path]) != ARCHIVE_DIR:
+        return None
+    return path
+
+def load_climatology(directory):
+    # The cube is rebuilt only when a workbook of the directory changes, seen
+    # from its size and modification time without reading it
+    files = sorted(glob.glob(os.path.join(directory, "*.xlsx")))
+    stats = [os.stat(file) for file in files]
+    key = ("climatology", NSECTOR, tuple((file, stat.st_size, stat.st_mtime_ns) for file, stat in zip(files, stats)))
+    return CACHE.get_or_compute(key, lambda: Climatology.from_files(files, NSECTOR))
+
 def main():
     st.title("Wind Frequency Analysis")
 
-    option = st.sidebar.selectbox("Select Analysis Type", ("Dynamic Windrose", "Upload Windrose"))
+    option = st.sidebar.selectbox("Select Analysis Type", ("Dynamic Windrose", "Upload Windrose", "Climatology"))
 
     if option == "Dynamic Windrose":
         main_dynamic_windrose()
     elif option == "Upload Windrose":
         main_upload_windrose()
+    elif option == "Climatology":
+        main_climatology()
 
 def main_dynamic_windrose():
     st.subheader("Dynamic Windrose Generator")
     file_path = st.file_uploader("Upload Excel File", type=["xlsx"])
     if file_path is not None:
-        sheet_names = pd.ExcelFile(file_path).sheet_names
-        sheet_name = st.selectbox("Select Sheet", sheet_names)
+        sheet_name = st.selectbox("Select Sheet", sheet_names(file_path))
 
         col_range = st.text_input("Column Range (e.g., A:D)", value="A:D")
 
         if st.button("Calculate"):
             # Calculate wind frequency
-            frequency_tables = calculate_wind_frequency(file_path, col_range)
-            if sheet_name in frequency_tables:
-                table = frequency_tables[sheet_name]
-                fig = px.bar_polar(table, r="percentage", theta="wind_direction",
-                                   color="ff",
-                                   color_discrete_sequence=px.colors.sequential.Rainbow_r,
-                                   start_angle=0,
-                                   direction="clockwise"
-                                  )
-                fig.update_layout(polar_angularaxis_rotation=90)
-                st.plotly_chart(fig)
-
-                pivot_table = create_pivot_table(table, sheet_name)
+            with span("read_excel"):
+                import pandas as pd
+
+                df = pd.read_excel(file_path, sheet_name=sheet_name, usecols=col_range)
+            with span("frequency"):
+                table = calculate_wind_frequency(df)
+            if table is not None:
+                plot_windrose(table)
+
+                pivot_table = create_pivot_table(table)
                 pivot_table_file_name = f"pivot_table_{sheet_name}_{col_range}.xlsx"
                 pivot_table.to_excel(pivot_table_file_name, index=True)
                 st.success(f"Pivot table saved as {pivot_table_file_name}")
-                
+
 def main_upload_windrose():
     st.subheader("Upload Windrose")
     file_key = "upload_file_key"
     file_path = st.file_uploader("Upload Excel File", type=["xlsx"], key=file_key)
 
     if file_path is not None:
-        sheet_names = pd.ExcelFile(file_path).sheet_names
-        sheet_name = st.selectbox("Select Sheet", sheet_names)
-
-        col_range = st.text_input("Column Range (e.g., A:D)", value="A:D")
+        sheet_name = st.selectbox("Select Sheet", sheet_names(file_path))
 
         if st.button("Calculate"):
-            # Your code for upload windrose here
+            # The ddd / ff block of the sheet is located automatically
+            with span("read_sheet"):
+                df = LazyWorkbook(file_path)[sheet_name]
+            with span("frequency"):
+                table = calculate_wind_frequency(df)
+            if table is not None:
+                plot_windrose(table)
+
+def main_climatology():
+    st.subheader("Station Climatology")
+    directory = st.text_input(f"Workbook Directory (in {ARCHIVE_DIR})", value=".")
+    path = archive_directory(directory)
+    if path is None:
+        st.error(f"{directory} is outside of the archive directory {ARCHIVE_DIR}")
+        return
+    if not os.path.isdir(path):
+        st.error(f"{directory} is not a directory")
+        return
+
+    with span("climatology"):
+        climatology = load_climatology(path)
+    if not climatology.stations:
+        st.warning(f"No pibal workbook in {directory}")
+        return
+
+    # None sums the cube over every station, hour or month
+    station = st.selectbox("Station", (None,) + climatology.stations, format_func=lambda value: "All" if value is None else value)
+    hour = st.selectbox("Hour (UTC)", (None,) + climatology.hours, format_func=lambda value: "All" if value is None else f"{value:02d}")
+    month = st.selectbox("Month", (None,) + tuple(range(1, 13)), format_func=lambda value: "All" if value is None else MONTHS[value - 1])
+
+    table = climatology.frequency_table(station, hour, month)
+    total_count = table['frequency'].sum()
+    if total_count == 0:
+        st.warning("No observation for this selection")
+        return
+    table['percentage'] = table['frequency'] / total_count * 100
+    plot_windrose(table)
+    st.dataframe(create_pivot_table(table))
 
 if __name__ == "__main__":
-    main()
+    # Stage timings are logged; the sidebar panel also traces memory
+    show_timings = pibal_timing.panel_enabled()
+    with pibal_timing.run("windy", memory=show_timings) as timings:
+        main()
+    if show_timings:
+        pibal_timing.show_panel(timings)